@@ -0,0 +1,61 @@
+import itertools
+from typing import Iterable, List, Optional, Set
+from rdflib import BNode, Literal, URIRef, Variable
+
+# Au-delà de ce nombre d'ordres possibles, on garde l'ordre stable des formes
+MAX_ORDERINGS = 720
+
+def _format_term(term, renaming) -> str:
+    if isinstance(term, Variable):
+        return renaming.get(str(term), f"?{term}")
+    if isinstance(term, (URIRef, Literal)):
+        return term.n3()
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    return str(term)
+
+def _shape(triple, fixed_vars: Set[str]) -> str:
+    """Forme d'un triplet où les variables renommables sont effacées."""
+    return " ".join(
+        "?" if isinstance(term, Variable) and str(term) not in fixed_vars else _format_term(term, {})
+        for term in triple
+    )
+
+def _render(triples: List[tuple], fixed_vars: Set[str]) -> str:
+    """Renomme les variables par ordre d'apparition puis sérialise les triplets."""
+    renaming = {}
+    parts = []
+    for triple in triples:
+        for term in triple:
+            name = str(term)
+            if isinstance(term, Variable) and name not in fixed_vars and name not in renaming:
+                renaming[name] = f"?v{len(renaming)}"
+        parts.append(" ".join(_format_term(term, renaming) for term in triple))
+    return " . ".join(parts)
+
+def canonical_form(triples: Iterable[tuple], fixed_vars: Optional[Iterable[str]] = None) -> str:
+    """
+    Forme canonique d'un ensemble de triplets, indépendante de l'ordre des
+    triplets et du nom des variables (sauf celles de 'fixed_vars').
+
+    Deux ensembles de même forme sont identiques à un renommage près. Les
+    triplets sont triés par forme ; seuls les ex aequo sont permutés pour
+    retenir la plus petite sérialisation.
+    """
+    fixed = set(fixed_vars or ())
+    triples = sorted(set(triples), key=lambda t: _shape(t, fixed))
+    groups: List[List[tuple]] = [
+        list(group) for _, group in itertools.groupby(triples, key=lambda t: _shape(t, fixed))
+    ]
+    orderings = 1
+    for group in groups:
+        for n in range(2, len(group) + 1):
+            orderings *= n
+    if orderings > MAX_ORDERINGS:
+        return _render(triples, fixed)
+    best = None
+    for choice in itertools.product(*(itertools.permutations(group) for group in groups)):
+        rendered = _render([t for group in choice for t in group], fixed)
+        if best is None or rendered < best:
+            best = rendered
+    return best
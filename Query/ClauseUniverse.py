@@ -0,0 +1,49 @@
+import threading
+from typing import Dict, Iterable
+
+class ClauseUniverse:
+    """
+    Univers des clauses (originales et relaxées) manipulées par une stratégie :
+    chaque triplet distinct reçoit un bit, et une requête est vue comme le
+    masque de ses triplets. Inclusion, union et différence de requêtes
+    deviennent des opérations sur des entiers.
+
+    Deux clauses de même triplet ont le même bit, comme dans
+    ConjunctiveQuery.is_subquery. Comme lui, les masques ignorent les
+    filtres : l'inclusion ne porte que sur les triplets.
+    """
+
+    def __init__(self, clauses: Iterable = ()):
+        self.bits: Dict[tuple, int] = {}  # Code du triplet -> bit
+        self.lock = threading.Lock()
+        for clause in clauses:
+            self.bit(clause)
+
+    def bit(self, clause) -> int:
+        """Bit de la clause, attribué à sa première apparition."""
+        bit = self.bits.get(clause.code)
+        if bit is None:
+            with self.lock:
+                bit = self.bits.get(clause.code)
+                if bit is None:
+                    bit = self.bits[clause.code] = 1 << len(self.bits)
+        return bit
+
+    def mask(self, query) -> int:
+        """Masque d'une requête (ou d'une liste de clauses)."""
+        clauses = getattr(query, "clauses", query)
+        mask = 0
+        for clause in clauses:
+            mask |= self.bit(clause)
+        return mask
+
+    @staticmethod
+    def is_subset(mask: int, other: int) -> bool:
+        """Vrai si la requête de masque 'mask' est incluse dans celle de masque 'other'."""
+        return mask & ~other == 0
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def __repr__(self) -> str:
+        return f"<ClauseUniverse | Clauses: {len(self.bits)}>"
@@ -1,14 +1,32 @@
 from rdflib import Graph
-from typing import List, Set, Optional
+from typing import List, Set, Optional, Tuple
 from rdflib.plugins.sparql.processor import SPARQLResult
 from Query.SimpleLiteral import SimpleLiteral
 from Query.FilterLiteral import FilterLiteral
+from Query.CanonicalForm import canonical_form
 
 class ConjunctiveQuery:
+    __slots__ = ("clauses", "filters", "_selected_vars", "_canonical_state", "_canonical_key")
+
     def __init__(self):
+        # Les clauses restent des SimpleLiteral et non des codes : chacune porte sa
+        # provenance (origin, variant), utilisée par la similarité et la relaxation.
+        # Seuls leurs triplets sont compacts et partagés (TermDictionary.intern_pattern)
         self.clauses: List[SimpleLiteral] = []
         self.filters: List[FilterLiteral] = []
-        self.selected_vars: Set[str] = set()
+        self._selected_vars: Optional[Set[str]] = None  # Créé à la première sélection
+        self._canonical_state = None  # Triplets, filtres et projection pour lesquels _canonical_key est valable
+        self._canonical_key: Optional[str] = None
+
+    @property
+    def selected_vars(self) -> Set[str]:
+        if self._selected_vars is None:
+            self._selected_vars = set()
+        return self._selected_vars
+
+    @selected_vars.setter
+    def selected_vars(self, variables: Set[str]):
+        self._selected_vars = variables
 
     def add_clause(self, clause: SimpleLiteral):
         """Ajoute une clause SimpleLiteral (triplet) à la requête et met à jour les variables sélectionnées."""
@@ -27,7 +45,7 @@ class ConjunctiveQuery:
     @property
     def is_star_query(self) -> bool:
         """Retourne True si aucune variable spécifique n'est sélectionnée."""
-        return len(self.selected_vars) == 0
+        return not self._selected_vars
 
     def to_sparql(self) -> str:
         """
@@ -139,8 +157,9 @@ class ConjunctiveQuery:
     def is_subquery(self, other: 'ConjunctiveQuery') -> bool:
         """Vérifie si cette requête est incluse dans une autre"""
         # Vérification des triplets
+        other_codes = {other_sl.code for other_sl in other.clauses}
         for sl in self.clauses:
-            if not any(sl.triple == other_sl.triple for other_sl in other.clauses):
+            if sl.code not in other_codes:
                 return False
         
         # Vérification des filtres
@@ -166,11 +185,50 @@ class ConjunctiveQuery:
         # On clone 'core' pour éviter de le modifier directement.
         new_query = core.clone()
         # Pour chaque clause présente dans 'query', on l'ajoute à new_query si elle n'y figure pas déjà.
+        present = set(new_query.clauses)
         for clause in query.clauses:
-            if clause not in new_query.clauses:
+            if clause not in present:
+                present.add(clause)
                 new_query.add_clause(clause)
         # new_query.selected_vars = query.selected_vars.copy()
         return new_query
 
+    def codes(self) -> Tuple[Tuple[int, int, int], ...]:
+        """
+        Représentation compacte de la requête : les codes de ses triplets, dans
+        l'ordre. Elle est recalculée à chaque appel (la liste des clauses peut
+        changer) ; chaque code est déjà calculé, il n'y a donc qu'un tuple à construire.
+        """
+        return tuple(clause.code for clause in self.clauses)
+
+    def mask(self, universe) -> int:
+        """Masque de la requête dans 'universe' (ClauseUniverse) : l'inclusion devient un test sur entiers."""
+        return universe.mask(self.clauses)
+
+    def canonical_key(self) -> str:
+        """
+        Forme canonique de la requête, indépendante de l'ordre des clauses et
+        du nom des variables non projetées : deux relaxations qui ne diffèrent
+        que par leurs variables fraîches (?R3 / ?R7) ont la même clé. Les
+        variables projetées (selected_vars) gardent leur nom et font partie de
+        la clé, puisqu'elles déterminent les réponses. Elle n'est recalculée que
+        si les triplets (codes()), les filtres ou la projection ont changé depuis
+        le dernier appel.
+
+        Les ensembles de déduplication (requêtes vues, insérées, testées)
+        contiennent ces clés : l'égalité et le hachage d'une requête restent
+        ceux de l'objet, qui peut donc être modifié sans corrompre un ensemble.
+        """
+        state = (self.codes(), tuple(flt.filter_expr for flt in self.filters),
+                 frozenset(self._selected_vars or ()))
+        if state != self._canonical_state:
+            key = canonical_form((clause.triple for clause in self.clauses), fixed_vars=state[2])
+            if self.filters:
+                key += " FILTER " + " ".join(sorted(state[1]))
+            if state[2]:
+                key = "SELECT " + " ".join(f"?{v}" for v in sorted(state[2])) + " WHERE " + key
+            self._canonical_state, self._canonical_key = state, key
+        return self._canonical_key
+
     def __repr__(self) -> str:
         return f"<ConjunctiveQuery | Clauses: {len(self.clauses)}, Filters: {len(self.filters)}, Vars: {self.selected_vars}>"
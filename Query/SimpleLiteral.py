@@ -1,26 +1,53 @@
 from rdflib import Graph, Variable, URIRef, BNode, Literal
 from rdflib.plugins.sparql import prepareQuery
 from rdflib.plugins.sparql.processor import SPARQLResult
-from typing import List, Set, Optional
+from typing import FrozenSet, List, Set, Optional
+from Query.TermDictionary import intern_pattern
 
 class SimpleLiteral:
+    # Les relaxations créent un très grand nombre de clauses : pas de __dict__,
+    # et le triplet et ses variables sont partagés entre clauses identiques
+    __slots__ = ("triple", "code", "mentioned_vars", "label", "origin", "variant",
+                 "_pattern", "_selected_vars")
     _counter = 0  
     # Compteur statique pour les labels
     
     def __init__(self, triple: tuple, clone:str=None):
-        self.triple = triple
+        self._pattern = intern_pattern(triple)
+        self.triple = self._pattern.triple
+        self.code = self._pattern.code  # Triplet codé par le dictionnaire de termes
         self.label = f"t{SimpleLiteral._counter}"
         SimpleLiteral._counter += 1
         
-        self.mentioned_vars: Set[str] = set()
-        self.selected_vars: Set[str] = set()
-        
-        # Extraction des variables
-        for component in triple:
-            if isinstance(component, Variable):
-                self.mentioned_vars.add(str(component))
+        # Variables extraites du triplet, partagées entre clauses identiques : un
+        # frozenset en lecture seule (et non plus un set), à copier pour le modifier
+        self.mentioned_vars: FrozenSet[str] = self._pattern.mentioned_vars
+        self._selected_vars: Optional[Set[str]] = None  # Créé à la première sélection
+        # Provenance : clause de la requête initiale dont celle-ci est une relaxation
+        self.origin: 'SimpleLiteral' = self
+        self.variant: Optional[int] = None
+
+    @property
+    def selected_vars(self) -> Set[str]:
+        if self._selected_vars is None:
+            self._selected_vars = set()
+        return self._selected_vars
+
+    @selected_vars.setter
+    def selected_vars(self, variables: Set[str]):
+        self._selected_vars = variables
+
     def set_label(self,label,num):
         self.label=f"{label}({num})"
+    def set_origin(self, clause: 'SimpleLiteral', num: int):
+        """Marque cette clause comme la num-ième relaxation de 'clause' (label compris)."""
+        self.origin = clause.origin
+        self.variant = num
+        self.set_label(clause.label, num)
+    @property
+    def is_relaxed(self) -> bool:
+        """Vrai si la clause provient de la relaxation d'une autre clause."""
+        return self.origin is not self
     @property
     def clause_type(self) -> str:
         return "SIMPLE_CLAUSE"
@@ -52,7 +79,7 @@ class SimpleLiteral:
     @property
     def is_star_clause(self) -> bool:
         """Vérifie si aucune variable n'est sélectionnée"""
-        return len(self.selected_vars) == 0
+        return not self._selected_vars
 
     def to_sparql(self) -> str:
         """Génère la requête SPARQL correspondante"""
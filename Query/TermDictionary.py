@@ -0,0 +1,72 @@
+import threading
+import weakref
+from typing import FrozenSet, List, Tuple
+from rdflib import Variable
+
+class TermDictionary:
+    """
+    Dictionnaire global des termes RDF : chaque terme distinct reçoit un
+    entier, et un triplet est codé par trois entiers. Comparer ou hacher des
+    codes est bien moins coûteux que pour des termes rdflib.
+
+    Les termes ne sont jamais retirés : le dictionnaire grandit avec le nombre
+    de termes distincts (les variables fraîches comprises), pas avec le nombre
+    de clauses relaxées.
+    """
+
+    def __init__(self):
+        self.codes = {}
+        self.terms: List = []
+        self.lock = threading.Lock()
+
+    def encode(self, term) -> int:
+        code = self.codes.get(term)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(term)
+                if code is None:
+                    code = self.codes[term] = len(self.terms)
+                    self.terms.append(term)
+        return code
+
+    def decode(self, code: int):
+        return self.terms[code]
+
+    def encode_triple(self, triple: tuple) -> Tuple[int, int, int]:
+        return tuple(self.encode(term) for term in triple)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+
+class TriplePattern:
+    """
+    Données d'un triplet partagées par toutes les clauses qui le portent
+    (poids-mouche) : le triplet lui-même, son code et ses variables.
+    """
+    __slots__ = ("triple", "code", "mentioned_vars", "__weakref__")
+
+    def __init__(self, triple: tuple, code: Tuple[int, int, int]):
+        self.triple = triple
+        self.code = code
+        self.mentioned_vars: FrozenSet[str] = frozenset(
+            str(component) for component in triple if isinstance(component, Variable)
+        )
+
+
+TERMS = TermDictionary()
+
+# Code du triplet -> motif partagé ; une entrée disparaît avec la dernière clause qui l'utilise
+_patterns: "weakref.WeakValueDictionary[Tuple[int, int, int], TriplePattern]" = weakref.WeakValueDictionary()
+_patterns_lock = threading.Lock()
+
+def intern_pattern(triple: tuple) -> TriplePattern:
+    """Motif partagé du triplet : des triplets identiques ont le même objet."""
+    code = TERMS.encode_triple(triple)
+    pattern = _patterns.get(code)
+    if pattern is None:
+        with _patterns_lock:
+            pattern = _patterns.get(code)
+            if pattern is None:
+                pattern = _patterns[code] = TriplePattern(tuple(triple), code)
+    return pattern
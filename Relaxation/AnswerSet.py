@@ -0,0 +1,122 @@
+import threading
+from queue import Queue
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+
+class Answer(NamedTuple):
+    """Réponse d'une stratégie, avec la requête réparée qui l'a produite et sa similarité."""
+    binding: Dict
+    query: ConjunctiveQuery
+    similarity: float
+
+
+def binding_key(binding: Dict, variables: Optional[Set[str]] = None) -> Tuple:
+    """
+    Clé canonique et hachable d'une solution, restreinte aux variables projetées
+    ('variables' vide ou None : toutes). Les solutions rdflib (Variable -> terme)
+    et les solutions JSON d'un endpoint (nom -> {"type", "value", ...}) sont
+    prises en charge ; l'ordre des variables est sans effet.
+    """
+    return tuple(sorted(
+        (str(var), _value_key(value))
+        for var, value in binding.items()
+        if not variables or str(var) in variables
+    ))
+
+def _value_key(value) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    return value
+
+
+class AnswerSet:
+    """
+    Les k réponses distinctes d'une stratégie, dans l'ordre où elles sont trouvées.
+
+    Le dédoublonnage se fait sur les clés canoniques (binding_key) gardées dans
+    un ensemble : chaque ajout est en O(1), au lieu d'un parcours de la liste
+    des réponses. Chaque nouvelle réponse est transmise aux abonnés dès qu'elle
+    est trouvée (rappel 'on_answer' ou itérateur stream()).
+    """
+
+    def __init__(self, k: int, variables: Optional[Set[str]] = None,
+                 on_answer: Optional[Callable[[Answer], None]] = None):
+        """
+        :param k: Nombre de réponses recherchées.
+        :param variables: Variables projetées de la requête initiale (vide ou None : toutes).
+        :param on_answer: Fonction appelée avec chaque nouvelle Answer, depuis le
+                          thread qui l'a trouvée.
+        """
+        self.k = k
+        self.variables = variables
+        self.bindings: List[Dict] = []  # Les réponses, partagées avec Res des stratégies
+        self.keys: Set[Tuple] = set()
+        self.listeners: List[Callable[[Answer], None]] = [on_answer] if on_answer else []
+
+    def __len__(self) -> int:
+        return len(self.bindings)
+
+    @property
+    def full(self) -> bool:
+        return len(self.bindings) >= self.k
+
+    def add(self, binding: Dict, query: ConjunctiveQuery, similarity: float) -> bool:
+        """Ajoute une réponse ; False si elle est déjà connue ou si les k réponses sont atteintes."""
+        if self.full:
+            return False
+        key = binding_key(binding, self.variables)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.bindings.append(binding)
+        answer = Answer(binding, query, similarity)
+        for listener in list(self.listeners):  # stream() peut se désabonner depuis un autre thread
+            listener(answer)
+        return True
+
+    def extend(self, bindings: Iterable[Dict], query: ConjunctiveQuery, similarity: float) -> int:
+        """Ajoute les solutions d'une requête réparée jusqu'aux k réponses ; nombre de réponses nouvelles."""
+        added = 0
+        for binding in bindings:
+            if self.full:
+                break
+            added += self.add(binding, query, similarity)
+        return added
+
+    def clear(self):
+        """Nouveau parcours : la liste est vidée sur place (Res reste partagée)."""
+        self.bindings.clear()
+        self.keys.clear()
+
+    def stream(self, run: Callable[[], object]) -> Iterator[Answer]:
+        """
+        Exécute 'run' (l'algorithme d'une stratégie) dans un thread et produit
+        chaque réponse dès qu'elle est trouvée. Une erreur de 'run' est relevée
+        à la fin de l'itération. Si l'itération est abandonnée, le parcours se
+        termine en arrière-plan.
+        """
+        answers: Queue = Queue()
+        done = object()
+        errors = []
+
+        def target():
+            try:
+                run()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                answers.put(done)
+
+        self.listeners.append(answers.put)
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        try:
+            while True:
+                answer = answers.get()
+                if answer is done:
+                    break
+                yield answer
+        finally:
+            self.listeners.remove(answers.put)
+        if errors:
+            raise errors[0]
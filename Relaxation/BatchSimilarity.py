@@ -0,0 +1,63 @@
+from typing import Dict, List, Sequence
+try:
+    import numpy as np
+except ImportError:  # numpy est facultatif : calcul requête par requête
+    np = None
+from Relaxation.SimilarityMemo import ELEMENT_TYPES, clause_score
+
+def batch_query_similarity(calculator, query: Sequence, candidates: List[Sequence],
+                           per_query_clause: bool = False) -> List[float]:
+    """
+    Similarité de 'query' avec chacune des requêtes de 'candidates', identique
+    à calculator.query_similarity appelée sur chaque candidate.
+
+    Les candidates issues d'une même relaxation partagent leurs clauses : la
+    similarité de chaque clause relaxée distincte est calculée une seule fois
+    (somme des similarités de ses composantes, comparée à sa clause
+    d'origine). Les candidates sont ensuite codées en une matrice d'indices
+    de clauses et toutes les similarités sont obtenues par quelques
+    opérations NumPy.
+
+    :param calculator: Calculateur fournissant triple_score (graphe ou endpoint).
+    :param query: Les clauses de la requête initiale.
+    :param candidates: Les clauses de chaque requête relaxée.
+    :param per_query_clause: Si True, la moyenne porte sur toutes les clauses de
+                             'query' et les candidates de taille différente sont
+                             acceptées (calcul du mode endpoint) ; sinon elle porte
+                             sur les clauses appariées.
+    :return: La liste des similarités, dans l'ordre de 'candidates'.
+    """
+    if np is None:
+        return [calculator.query_similarity(query, relaxed) for relaxed in candidates]
+    # L'indice 0 est réservé au remplissage des candidates plus courtes
+    originals = set(query)
+    clause_index: Dict[int, int] = {}
+    clause_scores = [0.0]
+    clause_matches = [0]
+    rows = []
+    for relaxed in candidates:
+        if not per_query_clause and len(query) != len(relaxed):
+            raise ValueError("Les requêtes doivent contenir le même nombre de patrons de triplet.")
+        row = []
+        for j in relaxed:
+            index = clause_index.get(id(j))
+            if index is None:
+                score = clause_score(calculator, j, originals)
+                matches = 1 if j.origin in originals else 0
+                index = clause_index[id(j)] = len(clause_scores)
+                clause_scores.append(score)
+                clause_matches.append(matches)
+            row.append(index)
+        rows.append(row)
+    if not rows:
+        return []
+    width = max(len(row) for row in rows)
+    codes = np.zeros((len(rows), width), dtype=np.intp)
+    for n, row in enumerate(rows):
+        codes[n, :len(row)] = row
+    scores = np.asarray(clause_scores)[codes].sum(axis=1)
+    matches = np.asarray(clause_matches)[codes].sum(axis=1) * len(ELEMENT_TYPES)
+    if per_query_clause:
+        matches = np.where(matches > 0, len(query) * len(ELEMENT_TYPES), 0)
+    similarities = np.divide(scores, matches, out=np.zeros(len(rows)), where=matches > 0)
+    return similarities.tolist()
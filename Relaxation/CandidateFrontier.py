@@ -0,0 +1,95 @@
+import threading
+import time
+from queue import PriorityQueue
+from typing import Any, List, Optional
+
+class CandidateFrontier(PriorityQueue):
+    """
+    File de priorité bornée des candidats relaxés, partagée par le producteur
+    et le consommateur d'une stratégie XBS.
+
+    - offer() bloque tant que la frontière est pleine (contre-pression sur les
+      workers de relaxation), sauf si le parcours est annulé ;
+    - take() attend le prochain meilleur candidat et renvoie None quand le
+      producteur a terminé et que la frontière est vide, ou après annulation ;
+    - cancel() arrête le producteur et ses workers dès que le consommateur a
+      ses k réponses.
+
+    close() et cancel() réveillent les threads en attente : aucune attente
+    ne dépend d'un délai.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        """
+        :param maxsize: Nombre maximal de candidats en attente (0 : non bornée).
+        """
+        super().__init__(maxsize)
+        self.closed = threading.Event()     # Le producteur n'ajoutera plus de candidats
+        self.cancelled = threading.Event()  # Le consommateur n'en prendra plus
+
+    def offer(self, item: Any) -> bool:
+        """Ajoute un candidat ; False si le parcours a été annulé entre-temps."""
+        with self.not_full:
+            while 0 < self.maxsize <= self._qsize() and not self.cancelled.is_set():
+                self.not_full.wait()
+            if self.cancelled.is_set():
+                return False
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+            return True
+
+    def take(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Meilleur candidat en attente, ou None s'il n'y en aura plus ou
+        qu'aucun n'est arrivé dans les 'timeout' secondes.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self.not_empty:
+            while not self._qsize():
+                if self.cancelled.is_set() or self.closed.is_set():
+                    return None
+                if deadline is None:
+                    self.not_empty.wait()
+                elif not self.not_empty.wait(deadline - time.time()) and time.time() >= deadline:
+                    return None
+            if self.cancelled.is_set():
+                return None
+            item = self._get()
+            self.not_full.notify()
+            return item
+
+    def take_batch(self, size: int, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Jusqu'à 'size' meilleurs candidats, dans l'ordre de la frontière : attend
+        le premier (comme take()), puis prend ceux déjà disponibles. Liste vide
+        s'il n'y en aura plus.
+        """
+        first = self.take(timeout)
+        if first is None:
+            return []
+        batch = [first]
+        with self.mutex:
+            while len(batch) < size and self._qsize():
+                batch.append(self._get())
+            self.not_full.notify(len(batch) - 1)
+        return batch
+
+    def close(self):
+        """Le producteur signale qu'il a terminé."""
+        with self.mutex:
+            self.closed.set()
+            self.not_empty.notify_all()
+
+    def cancel(self):
+        """Le consommateur arrête le parcours : offer() et take() rendent la main."""
+        with self.mutex:
+            self.cancelled.set()
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+    def reopen(self):
+        """Prépare un nouveau parcours (les candidats restants sont conservés)."""
+        with self.mutex:
+            self.closed.clear()
+            self.cancelled.clear()
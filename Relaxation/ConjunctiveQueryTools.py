@@ -1,18 +1,30 @@
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.ClauseUniverse import ClauseUniverse
 from rdflib import Graph, Namespace, Literal, URIRef, RDF
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 
 class ConjunctiveQueryTools:
 
-    def query_contains_in_list(list_query: list[ConjunctiveQuery], query: ConjunctiveQuery) -> bool:
+    def query_contains_in_list(list_query: list[ConjunctiveQuery], query: ConjunctiveQuery,
+                               universe: Optional[ClauseUniverse] = None,
+                               masks: Optional[Iterable[int]] = None) -> bool:
         """
         Vérifie si une requête existe dans la liste par relation de sous-requête
-        Version optimisée avec court-circuit et compréhension de générateur
+        Version optimisée avec court-circuit : les inclusions sont testées sur
+        les masques des requêtes dans 'universe' (celui de la stratégie, à
+        défaut un univers temporaire). 'masks' donne les masques déjà calculés
+        des requêtes de 'list_query', dans le même ordre. Comme is_subquery,
+        seuls les triplets comptent : les filtres sont ignorés.
         """
+        if universe is None:
+            universe = ClauseUniverse(query.clauses)
+        if masks is None:
+            masks = (q.mask(universe) for q in list_query)
+        mask = query.mask(universe)
         return any(
-            q.is_subquery(query) or query.is_subquery(q)
-            for q in list_query
+            ClauseUniverse.is_subset(other, mask) or ClauseUniverse.is_subset(mask, other)
+            for other in masks
         )
 
     def maximal_factorization(query, mfs, graph: Graph) -> List['ConjunctiveQuery']:
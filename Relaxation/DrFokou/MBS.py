@@ -0,0 +1,193 @@
+from typing import Callable, Iterator, List, Optional, Set
+from Query.ConjunctiveQueryClause import ConjunctiveQuery as Query
+from Query.ClauseUniverse import ClauseUniverse
+from Relaxation.EndpointMode.relaxation import ConjunctiveQueryRelaxation
+from Relaxation.EndpointMode.SimilarityEndpoint import SimilarityCalculator
+from Relaxation.EndpointMode.FindMFS import QueryFailureAnalyzer
+from Relaxation.EndpointMode.EndpointEvaluator import EndpointEvaluator
+from Relaxation.RunBudget import RunBudget
+from Relaxation.AnswerSet import Answer, AnswerSet
+from Relaxation.parser2 import expand_sparql
+from Relaxation.parser import SparqlTripletParser
+import itertools
+import time
+from queue import PriorityQueue
+
+class MFSBasedRelaxationStrategy:
+    def __init__(self, Q: Query, D:str, k: int, evaluator: Optional[EndpointEvaluator] = None,
+                 run_budget: Optional[RunBudget] = None,
+                 on_answer: Optional[Callable[[Answer], None]] = None,
+                 prefetch: bool = True, snapshot: Optional[str] = None):
+        """
+        Implémente la stratégie de relaxation MBS (Minimal Failure Sets).
+
+        Args:
+            Q: requête conjunctive échouée (ConjunctiveQuery)
+            D: URL du endpoint SPARQL
+            k: nombre de résultats alternatifs attendus
+            evaluator: évaluateur partagé (par exemple un AsyncEndpointEvaluator)
+            run_budget: durée, nombre d'exécutions et délai par requête de l'exécution
+                (calcul des MFS compris) ; une fois épuisé, les réponses déjà trouvées
+                sont conservées et 'partial' est levé
+            on_answer: fonction appelée avec chaque nouvelle Answer (solution, requête
+                réparée, similarité) dès qu'elle est trouvée
+            prefetch: charge au démarrage les fréquences de toutes les classes et de
+                tous les prédicats (trois requêtes GROUP BY), au lieu de les compter
+                terme par terme pendant le calcul des similarités
+            snapshot: fichier JSON conservant ces fréquences d'une exécution à l'autre
+        """
+        self.Q = Q
+        self.D = D
+        self.k = k
+        self.evaluator = evaluator or EndpointEvaluator(D)
+        self.run_budget = run_budget or RunBudget()
+        self.partial = False  # Budget épuisé (ou délai dépassé) avant les k réponses
+        self.timeouts = self.evaluator.timeouts
+        self.req=[]
+        self.var= Q.selected_vars.copy() if Q.selected_vars else []
+        # Réponses distinctes (clés hachées sur les variables projetées)
+        self.answers = AnswerSet(k, set(self.var), on_answer)
+        self.Res: List = self.answers.bindings
+        # MFS calculées par relax(), dans le budget de l'exécution
+        self.MFS_list: List[Query] = []
+        self.universe = ClauseUniverse(Q.clauses)
+        self.RQ=PriorityQueue()
+        self.counter = itertools.count()
+        self.RQ.put((-1.0, next(self.counter), Q))
+        # # File priorité des requêtes relaxées: (−similarité, requête)
+        # self.heap: List[Tuple[float, Query]] = []
+        # heapq.heappush(self.heap, (-1.0, Q))
+
+        # Marquage des requêtes insérées et échouées (par leur forme canonique)
+        self.inserted: Set[str] = {Q.canonical_key()}
+        self.failed: Set[str] = {Q.canonical_key()}
+        # Calculateur de similarité
+        self.sim_calc = SimilarityCalculator(D, self.evaluator, prefetch=prefetch, snapshot=snapshot)
+        self.query_exec_count = 0  
+        self.execution_time = 0.0
+        self.start_time = time.time()
+
+    def analyze(self) -> None:
+        """
+        Calcule les MFS de Q par l'algorithme LBA (MFS et XSS obtenues ensemble,
+        comme dans les stratégies XBS) puis enfile ses requêtes filles qui n'en
+        contiennent aucune. L'analyse est bornée par le budget de l'exécution :
+        ses requêtes sont comptées dans query_exec_count et limitées par
+        run_budget.timeout().
+        """
+        analyzer = QueryFailureAnalyzer(self.D, evaluator=self.evaluator)
+        lattice = analyzer.lattice(self.Q, budget=self.run_budget, executions=self.query_exec_count)
+        self.MFS_list, _ = analyzer.find_mfs_and_xss(self.Q, lattice)
+        self.query_exec_count += lattice.evaluations
+        self.partial = self.partial or lattice.partial
+        # Masques des MFS : le test « Qc contient une MFS » se fait sur des entiers
+        # (sur les triplets seulement, les filtres sont ignorés comme dans is_subquery)
+        mfs_masks = [mfs.mask(self.universe) for mfs in self.MFS_list]
+        relax=ConjunctiveQueryRelaxation(self.Q, self.D,1, evaluator=self.evaluator)
+        relaxversion = relax.relax_query()
+        # Génération de chaque requête fille en relaxant un triplet
+        for Qc in relaxversion:
+                # Projection fixée avant le calcul de la clé, qui en dépend
+                Qc.selected_vars = set(self.var)
+                key = Qc.canonical_key()
+                if key not in self.inserted:
+                    # print(Qc.to_sparql())
+                    self.inserted.add(key)
+
+                    # Élagage : si un MFS reste intact dans Qc, on marque comme failed
+                    mask = Qc.mask(self.universe)
+                    if any(ClauseUniverse.is_subset(m, mask) for m in mfs_masks):
+                        self.failed.add(key)
+                        # Sinon, on calcule la similarité et on réenfile
+                    else:
+                        # Qc est fille de Q (similarité 1) : seules ses clauses relaxées sont évaluées
+                        sim_qc = self.sim_calc.child_similarity(self.Q.clauses, 1.0, self.Q.clauses, Qc.clauses)
+                        self.RQ.put((-sim_qc, next(self.counter), Qc))
+
+    def relax(self) -> List:
+        """
+        Exécute l'algorithme MBS et renvoie les top-k bindings ('partial' est
+        levé si le budget a interrompu la recherche).
+        """
+        self.run_budget.start()
+        self.start_time = time.time()
+        self.timeouts = self.evaluator.timeouts
+        self.analyze()
+        if not self.MFS_list:
+            if not self.partial:
+                print("Aucune MFS trouvée, la requête initiale est valide.")
+            self.execution_time = time.time() - self.start_time
+            return []
+        while not self.RQ.empty() and len(self.Res) < self.k:
+            if self.run_budget.exhausted(self.query_exec_count):
+                self.partial = True
+                break
+            neg_sim,_,Qi = self.RQ.get()
+            sim_val = -neg_sim
+            # Si Qi n'est pas bloquée, exécution et collecte des résultats
+            if Qi.canonical_key() not in self.failed:
+                # print(Qi.to_sparql())
+                results = self.evaluator.bindings(Qi, limit=self.k + len(self.Res),
+                                                  timeout=self.run_budget.timeout())
+                self.query_exec_count += 1
+                if results:
+                    self.answers.extend(results, Qi, sim_val)
+                    self.req.append((Qi,sim_val))
+            else:
+                print(f"Requête échouée : {Qi.to_sparql()}")
+
+        # Une requête interrompue par son délai a pu masquer des réponses
+        self.partial = self.partial or self.evaluator.timeouts > self.timeouts
+        end_time = time.time()  # End time measurement
+        self.execution_time = end_time - self.start_time
+        return self.Res
+
+    def stream(self) -> Iterator[Answer]:
+        """
+        Exécute relax() en arrière-plan et produit chaque Answer (solution,
+        requête réparée, similarité) dès qu'elle est trouvée.
+        """
+        return self.answers.stream(self.relax)
+
+if __name__ == "__main__":
+    # Exemple d'utilisation
+    sparql_query = """ 
+PREFIX ub: <http://www.lehigh.edu/~zhp2/2004/0401/univ-bench.owl#>
+SELECT *
+WHERE { 
+    <http://www.Department0.University0.edu/UndergraduateStudent33> ub:advisor ?Y1 . 
+    ?Y1 ub:doctoralDegreeFrom ?Y2 .
+    ?Y2 ub:hasAlumnus ?Y3 .
+    ?Y3 ub:title ?Y4 .
+    }
+"""
+
+    devquery=expand_sparql(sparql_query)
+    # print("\nRequête SPARQL développée :")
+    # print(devquery)
+
+    parser = SparqlTripletParser(devquery)
+    parser.parse()
+    query= parser.query
+    print("Requête conjonctive :")
+    print(query.to_sparql())
+    # Create an RDF graph D (can be loaded or built dynamically)
+    D = "http://localhost:3030/ds/query"
+
+    mbs_strategy = MFSBasedRelaxationStrategy(query, D, k=40)
+    results = mbs_strategy.relax()
+    print("\n MFS trouvées :\n")
+    for i, mfs in enumerate(mbs_strategy.MFS_list, 1):
+        print(f"MFS {i} :", [cl.label for cl in mfs.clauses])
+    print("\n")
+    print("Requêtes relaxées valides :")
+    print("\n")
+    for rq in mbs_strategy.req:
+        print(rq[0].to_sparql())
+        print(f"Similarity:{rq[1]}")
+        print("\n")
+  
+    print("Nombre de requêtes exécutées :", mbs_strategy.query_exec_count)
+    print("Temps d'exécution total :", mbs_strategy.execution_time, "s")
+    print("nombre de resultats:",len(mbs_strategy.Res))
+  
\ No newline at end of file
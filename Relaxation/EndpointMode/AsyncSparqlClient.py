@@ -0,0 +1,164 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional, Union
+import aiohttp
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.EndpointMode.EndpointEvaluator import EndpointEvaluator
+
+class AsyncSparqlClient:
+    """
+    Client SPARQL asyncio : connexions HTTP persistantes (keep-alive), nombre
+    de requêtes simultanées borné, délai maximal par requête et nouvelles
+    tentatives avec attente exponentielle en cas d'erreur réseau ou serveur.
+
+    S'utilise comme gestionnaire de contexte asynchrone :
+
+        async with AsyncSparqlClient(url, max_concurrency=16) as client:
+            rows = await client.bindings_many(queries, limit=1)
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, endpoint_url: str, max_concurrency: int = 8, timeout: float = 30.0,
+                 retries: int = 3, backoff: float = 0.5):
+        """
+        :param endpoint_url: URL du endpoint SPARQL (ex. http://localhost:8000/sparql)
+        :param max_concurrency: Nombre maximal de requêtes en cours (et de connexions ouvertes)
+        :param timeout: Délai maximal d'une tentative, en secondes
+        :param retries: Nombre de nouvelles tentatives après un échec
+        :param backoff: Attente avant la première nouvelle tentative, doublée à chaque échec
+        """
+        self.endpoint_url = endpoint_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.requests = 0  # Requêtes HTTP envoyées, nouvelles tentatives comprises
+        self.timeouts = 0  # Requêtes abandonnées après avoir dépassé leur délai
+
+    async def open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Accept": "application/sparql-results+json, application/json"},
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "AsyncSparqlClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def post(self, query_str: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Envoie 'query_str' et retourne la réponse JSON décodée. Lève la
+        dernière erreur si toutes les tentatives échouent.
+        """
+        await self.open()
+        deadline = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.semaphore:
+                    self.requests += 1
+                    async with self.session.post(self.endpoint_url, data={"query": query_str},
+                                                 timeout=deadline) as response:
+                        if response.status in self.RETRY_STATUS and attempt < self.retries:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history, status=response.status
+                            )
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in self.RETRY_STATUS
+                if attempt == self.retries or not retryable:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def bindings(self, query_str: str, limit: Optional[int] = None,
+                       timeout: Optional[float] = None) -> List[Dict]:
+        """Au plus 'limit' solutions de 'query_str'."""
+        if limit is not None:
+            query_str = f"{query_str}\nLIMIT {limit}"
+        results = await self.post(query_str, timeout)
+        return results.get("results", {}).get("bindings", [])
+
+    async def bindings_many(self, query_strs: List[str], limit: Optional[int] = None,
+                            timeout: Optional[float] = None) -> List[List[Dict]]:
+        """
+        Solutions de plusieurs requêtes envoyées simultanément, dans l'ordre
+        de 'query_strs'. Une requête en erreur a une liste vide.
+        """
+        async def safe(query_str):
+            try:
+                return await self.bindings(query_str, limit, timeout)
+            except asyncio.TimeoutError as e:
+                self.timeouts += 1
+                print(f"Délai dépassé pour la requête : {e}")
+                return []
+            except Exception as e:
+                print(f"Erreur endpoint SPARQL : {e}")
+                return []
+        return await asyncio.gather(*(safe(query_str) for query_str in query_strs))
+
+
+class AsyncEndpointEvaluator(EndpointEvaluator):
+    """
+    EndpointEvaluator dont les requêtes passent par un AsyncSparqlClient. La
+    boucle asyncio tourne dans un thread dédié : les stratégies (synchrones,
+    multi-threads) peuvent ainsi avoir de nombreuses évaluations en cours sur
+    le même pool de connexions persistantes.
+    """
+
+    def __init__(self, endpoint_url: str, max_concurrency: int = 8, timeout: float = 30.0,
+                 retries: int = 3, backoff: float = 0.5):
+        super().__init__(endpoint_url, timeout)
+        self.client = AsyncSparqlClient(endpoint_url, max_concurrency, timeout, retries, backoff)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine):
+        """Exécute 'coroutine' dans la boucle du client et attend son résultat."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def post(self, query_str: str, timeout: Optional[float] = None) -> Dict:
+        return self.run(self.client.post(query_str, timeout))
+
+    def select(self, query_str: str, limit: Optional[int] = None,
+               timeout: Optional[float] = None) -> List[Dict]:
+        return self.run(self.client.bindings(query_str, limit, timeout))
+
+    def bindings_many(self, queries: List[Union[ConjunctiveQuery, str]], limit: Optional[int] = None,
+                      timeout: Optional[float] = None) -> List[List[Dict]]:
+        """Solutions de plusieurs requêtes, toutes envoyées simultanément."""
+        self.evaluations += len(queries)
+        timeouts = self.client.timeouts
+        rows = self.run(self.client.bindings_many([self.to_sparql(q) for q in queries], limit, timeout))
+        self.timeouts += self.client.timeouts - timeouts
+        return rows
+
+    def not_k_completed_many(self, queries: List[Union[ConjunctiveQuery, str]], k: int = 0,
+                             workers: int = 1) -> List[bool]:
+        """
+        Toutes les requêtes sont en vol en même temps ; la concurrence est
+        bornée par le client ('workers' est sans effet ici).
+        """
+        return [len(rows) <= k for rows in self.bindings_many(queries, limit=k + 1)]
+
+    def close(self):
+        self.run(self.client.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        super().close()
@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Union
+import requests
+from SPARQLWrapper import SPARQLWrapper, JSON
+from rdflib import BNode, Literal, URIRef
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.QueryEvaluator import QueryEvaluator
+
+DEFAULT_TIMEOUT = 60.0  # Délai par défaut d'une requête HTTP, en secondes
+
+class EndpointEvaluator(QueryEvaluator):
+    """
+    Évaluation sur un endpoint SPARQL. Les requêtes passent par une même
+    session HTTP (connexion réutilisée) et sont bornées par 'timeout'.
+    """
+
+    def __init__(self, endpoint_url: str, timeout: float = DEFAULT_TIMEOUT):
+        """
+        :param endpoint_url: URL du endpoint SPARQL (ex. http://localhost:8000/sparql)
+        :param timeout: Délai maximal (en secondes) d'une requête HTTP
+        """
+        super().__init__()
+        self.endpoint_url = endpoint_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/sparql-results+json, application/json"})
+
+    def post(self, query_str: str, timeout: Optional[float] = None) -> Dict:
+        """
+        Envoie 'query_str' et retourne la réponse JSON décodée. Lève TimeoutError
+        au-delà de 'timeout' secondes (None : self.timeout).
+        """
+        try:
+            response = self.session.post(self.endpoint_url, data={"query": query_str},
+                                         timeout=timeout or self.timeout)
+        except requests.Timeout as e:
+            raise TimeoutError(str(e)) from e
+        response.raise_for_status()
+        return response.json()
+
+    def select(self, query_str: str, limit: Optional[int] = None,
+               timeout: Optional[float] = None) -> List[Dict]:
+        if limit is not None:
+            query_str = f"{query_str}\nLIMIT {limit}"
+        return self.post(query_str, timeout).get("results", {}).get("bindings", [])
+
+    def count(self, query: Union[ConjunctiveQuery, str], limit: Optional[int] = None,
+              timeout: Optional[float] = None) -> int:
+        """
+        Le comptage est fait par l'endpoint (COUNT(*)) : seul le nombre de
+        solutions, plafonné à 'limit', transite sur le réseau. Erreurs et
+        dépassements de délai sont traités comme dans bindings (ils comptent
+        dans 'timeouts') : la requête a alors 0 solution.
+        """
+        inner = self.to_sparql(query)
+        if limit is not None:
+            inner = f"{inner}\nLIMIT {limit}"
+        rows = self.bindings(f"SELECT (COUNT(*) AS ?count) WHERE {{ {{ {inner} }} }}", timeout=timeout)
+        return int(rows[0]["count"]["value"]) if rows else 0
+
+    def close(self):
+        self.session.close()
+
+
+def run_select(endpoint: Union[SPARQLWrapper, QueryEvaluator], query_str: str) -> List[Dict]:
+    """
+    Solutions JSON de 'query_str', que 'endpoint' soit un SPARQLWrapper ou
+    un évaluateur (dont la session HTTP est alors réutilisée).
+    """
+    if isinstance(endpoint, QueryEvaluator):
+        return endpoint.select(query_str)
+    endpoint.setQuery(query_str)
+    endpoint.setReturnFormat(JSON)
+    return endpoint.query().convert()["results"]["bindings"]
+
+def to_term(binding: Dict):
+    """Terme rdflib correspondant à une valeur de résultat SPARQL JSON."""
+    if binding["type"] == "uri":
+        return URIRef(binding["value"])
+    if binding["type"] == "bnode":
+        return BNode(binding["value"])
+    return Literal(binding["value"], lang=binding.get("xml:lang"), datatype=binding.get("datatype"))
@@ -1,93 +1,151 @@
-from typing import List
-from SPARQLWrapper import SPARQLWrapper, JSON
+from typing import List, Optional, Tuple
 from rdflib import Literal, URIRef, Variable
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
 from Query.SimpleLiteral import SimpleLiteral
 from Relaxation.parser import SparqlTripletParser
 from Relaxation.parser2 import expand_sparql
+from Relaxation.EndpointMode.EndpointEvaluator import EndpointEvaluator
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.QueryFailureAnalyzer import bounded_not_k_completed
+from Relaxation.RunBudget import RunBudget
+from Relaxation.SubqueryLattice import SubqueryLattice
 
 class QueryFailureAnalyzer:
-    def __init__(self, endpoint_url: str):
+    def __init__(self, endpoint_url: str, cache: Optional[OutcomeCache] = None,
+                 batch: bool = False, batch_size: int = 64,
+                 evaluator: Optional[EndpointEvaluator] = None, workers: int = 1):
         """
         :param endpoint_url: URL du endpoint SPARQL (ex. http://localhost:8000/sparql)
+        :param cache: Cache persistant des résultats de sous-requêtes, consulté avant l'endpoint
+        :param batch: Si True, toutes les sous-requêtes d'un niveau du treillis sont
+                      testées en une seule requête SPARQL (une branche UNION par sous-requête)
+        :param batch_size: Nombre maximal de branches par requête groupée
+        :param evaluator: Évaluateur partagé avec la stratégie appelante (créé sinon)
+        :param workers: Nombre de requêtes HTTP simultanées pour les sous-requêtes d'un même
+                        niveau (sans effet en mode groupé)
         """
-        self.sparql = SPARQLWrapper(endpoint_url)
-        self.sparql.setReturnFormat(JSON)
+        self.cache = cache
+        self.batch = batch
+        self.batch_size = batch_size
+        self.workers = workers
+        self.evaluator = evaluator or EndpointEvaluator(endpoint_url)
 
-    def _ask(self, query_str: str) -> int:
-        """
-        Exécute count(*) sur le SELECT original pour savoir
-        combien de solutions il renvoie (équivalent de .query() en mémoire).
-        """
-        # On encapsule la requête initiale dans un SELECT COUNT(*) pour limiter le transfert
-        count_query = f"""
-        SELECT (COUNT(*) AS ?c) WHERE {{
-          {{
-            {query_str}
-          }}
-        }}
-        """
-        self.sparql.setQuery(count_query)
-        results = self.sparql.query().convert()
-        return int(results["results"]["bindings"][0]["c"]["value"])
-
-    def not_k_completed(self, query_str: str, k: int = 0) -> bool:
+    def not_k_completed(self, query_str: str, k: int = 0, timeout: Optional[float] = None) -> bool:
         """
-        Vrai si la requête retourne au plus k solutions.
+        Vrai si la requête retourne au plus k solutions. L'endpoint ne compte
+        que les k+1 premières solutions ; une erreur compte comme un échec.
         """
         if not query_str:
             raise ValueError("La requête ne peut être vide")
-        try:
-            nb = self._ask(query_str)
-        except Exception as e:
-            print(f"Erreur endpoint SPARQL : {e}")
-            # On considère que l'exécution a échoué => pas complété
-            return True
-        return nb <= k
+        return self.evaluator.not_k_completed(query_str, k, timeout)
+
+    @staticmethod
+    def batch_query(query_strs: List[str], k: int = 0) -> str:
+        """
+        Construit une seule requête SPARQL qui teste toutes les sous-requêtes :
+        chaque sous-requête devient une branche UNION limitée à k+1 solutions
+        et étiquetée par BIND ; le GROUP BY compte les solutions par branche.
+        """
+        branches = [
+            f"{{\n{{ {query_str}\nLIMIT {k + 1} }}\nBIND({i} AS ?_branch)\n}}"
+            for i, query_str in enumerate(query_strs)
+        ]
+        union = "\nUNION\n".join(branches)
+        return f"SELECT ?_branch (COUNT(*) AS ?c) WHERE {{\n{union}\n}}\nGROUP BY ?_branch"
+
+    def _ask_batch(self, query_strs: List[str], k: int = 0) -> List[int]:
+        """
+        Nombre de solutions (plafonné à k+1) de chaque sous-requête, obtenu
+        en une seule requête HTTP. Les branches sans ligne ont 0 solution.
+        """
+        self.evaluator.evaluations += 1
+        results = self.evaluator.post(self.batch_query(query_strs, k))
+        counts = [0] * len(query_strs)
+        for binding in results["results"]["bindings"]:
+            counts[int(binding["_branch"]["value"])] = int(binding["c"]["value"])
+        return counts
+
+    def not_k_completed_batch(self, query_strs: List[str], k: int = 0) -> List[bool]:
+        """
+        Version groupée de not_k_completed : au plus 'batch_size' sous-requêtes
+        par requête HTTP. En cas d'erreur, on revient au test individuel.
+        """
+        outcomes = []
+        for start in range(0, len(query_strs), self.batch_size):
+            chunk = query_strs[start:start + self.batch_size]
+            try:
+                outcomes.extend(nb <= k for nb in self._ask_batch(chunk, k))
+            except Exception as e:
+                print(f"Erreur endpoint SPARQL (requête groupée) : {e}")
+                outcomes.extend(self.not_k_completed(query_str, k) for query_str in chunk)
+        return outcomes
+
+    def lattice(self, query: ConjunctiveQuery, k: int = 0, budget: Optional[RunBudget] = None,
+                executions: int = 0) -> SubqueryLattice:
+        """
+        Construit le treillis des sous-requêtes de 'query', évaluées sur l'endpoint.
+        En mode groupé, chaque niveau du treillis est testé en une requête ;
+        avec plusieurs workers, ses sous-requêtes sont envoyées en parallèle.
+        Avec 'budget', l'analyse s'arrête quand il est épuisé ('executions' y
+        sont déjà comptées) et chaque sous-requête testée seule est bornée par
+        budget.timeout() ; un délai dépassé rend l'analyse partielle.
+        """
+        fails_batch = None
+        if self.batch:
+            fails_batch = lambda subs: self.not_k_completed_batch([sub.to_sparql() for sub in subs], k)
+        elif self.workers > 1:
+            fails_batch = lambda subs: self.evaluator.not_k_completed_many(subs, k, self.workers)
+        return SubqueryLattice(
+            query, lambda sub: bounded_not_k_completed(self.evaluator, sub, k, budget), cache=self.cache, k=k,
+            fails_batch=fails_batch, budget=budget, executions=executions
+        )
 
     def find_all_failing_causes(
         self,
         query: ConjunctiveQuery,
+        lattice: Optional[SubqueryLattice] = None,
     ) -> List[ConjunctiveQuery]:
         """
-        Recherche exhaustive de toutes les MFS (Minimal Failing Subqueries)
-        en interrogeant l'endpoint SPARQL pour savoir si une sous-requête échoue.
+        Recherche de toutes les MFS (Minimal Failing Subqueries) en interrogeant
+        l'endpoint SPARQL. Chaque sous-requête est envoyée au plus une fois ;
+        les autres statuts sont déduits par monotonie dans le treillis.
         """
-        all_mfs = []
-
-        sparql_str = query.to_sparql()
-        # Si la requête principale renvoie >0 solutions, il n'y a pas d'échec
-        if not self.not_k_completed(sparql_str, k=0):
-            return all_mfs
-
-        # Si un seul clause, c'est minimal
-        if len(query.clauses) == 1:
-            all_mfs.append(query.clone())
-            return all_mfs
+        if lattice is None:
+            lattice = self.lattice(query)
+        return lattice.minimal_failing_subqueries()
 
-        is_mfs = True
-        for clause in list(query.clauses):
-            # Retirer la clause
-            query.remove(clause)
-            # Tester la sous‑requête
-            sub_mfs = self.find_all_failing_causes(query)
-            if sub_mfs:
-                is_mfs = False
-                for mfs in sub_mfs:
-                    if not any(existing.is_subquery(mfs) for existing in all_mfs):
-                        all_mfs.append(mfs)
-            # Remettre la clause à la fin
-            query.add(clause, len(query.clauses))
-        # Si aucune sous-requête ne « casse » l’échec, la requête elle-même est MFS
-        if is_mfs:
-            all_mfs.append(query.clone())
+    def find_a_failing_cause(
+        self,
+        query: ConjunctiveQuery,
+        lattice: Optional[SubqueryLattice] = None,
+    ) -> Optional[ConjunctiveQuery]:
+        """
+        Recherche une seule MFS en O(n) requêtes vers l'endpoint.
+        Retourne None si la requête n'échoue pas.
+        """
+        if lattice is None:
+            lattice = self.lattice(query)
+        if not lattice.fails(lattice.top):
+            return None
+        return lattice.subquery(lattice.find_an_mfs(lattice.top))
 
-        return all_mfs
+    def find_mfs_and_xss(
+        self,
+        query: ConjunctiveQuery,
+        lattice: Optional[SubqueryLattice] = None,
+    ) -> Tuple[List[ConjunctiveQuery], List[ConjunctiveQuery]]:
+        """
+        Calcule toutes les MFS et toutes les XSS avec l'algorithme LBA,
+        en un nombre de requêtes polynomial au lieu d'un parcours exhaustif.
+        """
+        if lattice is None:
+            lattice = self.lattice(query)
+        return lattice.mfs_and_xss()
     
 if __name__ == "__main__":
     # Exemple d'utilisation
     endpoint_url = "http://localhost:8000/sparql"
-    analyzer = QueryFailureAnalyzer(endpoint_url)
+    analyzer = QueryFailureAnalyzer(endpoint_url, batch=True)
 
     sparql_query = """
     prefix ub: <http://www.lehigh.edu/~zhp2/2004/0401/univ-bench.owl#>
@@ -101,8 +159,10 @@ if __name__ == "__main__":
     query= parser.query
     print(query.to_sparql())
     # 4️⃣ Exécution de l'analyse des échecs et extraction des MFS
-    mfs_list = analyzer.find_all_failing_causes(query)
+    lattice = analyzer.lattice(query)
+    mfs_list = analyzer.find_all_failing_causes(query, lattice)
     print(f"Nombre de MFS trouvées : {len(mfs_list)}")
+    print(f"Évaluations : {lattice.evaluations} en {lattice.batches} requêtes, évitées : {lattice.skipped}")
     # 5️⃣ Affichage des résultats
     print("\n🔎 Résultat : Minimal Failing Subqueries (MFS)\n")
     for i, mfs in enumerate(mfs_list, 1):
@@ -1,7 +1,10 @@
-from itertools import product
-from typing import List
+from typing import Iterator, List, Optional
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.EndpointMode.EndpointEvaluator import EndpointEvaluator
 from Relaxation.EndpointMode.FindMFS import QueryFailureAnalyzer
+from Relaxation.HittingSets import iter_minimal_hitting_sets, iter_xss
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.SubqueryLattice import SubqueryLattice
 from Relaxation.parser import SparqlTripletParser
 from Relaxation.parser2 import expand_sparql
 
@@ -9,76 +12,61 @@ class XSSGenerator:
     @staticmethod
     def generate_combinations(queries: List[ConjunctiveQuery]) -> List[ConjunctiveQuery]:
         """
-        Génère toutes les combinaisons non redondantes entre les clauses des requêtes
-        selon les exemples fournis.
+        Génère les ensembles minimaux de clauses contenant au moins une clause
+        de chaque requête (ensembles intersectants minimaux, MMCS).
         """
-        clauses_sets = [q.clauses for q in queries]
-        combinations = product(*clauses_sets)
-
-        seen = set()
-        result = []
-        for combo in combinations:
-            # Fusion en conservant l'ordre
-            merged = []
-            for clause in combo:
-                if clause not in merged:
-                    merged.append(clause)
-
-            key = tuple(merged)
-            if key not in seen:
-                seen.add(key)
-                q = ConjunctiveQuery()
-                q.clauses = merged
-                result.append(q)
-        return result
+        return list(iter_minimal_hitting_sets(queries))
 
     @staticmethod
-    def compute_xss(main_query: ConjunctiveQuery, endpoint_url: str) -> List[ConjunctiveQuery]:
+    def iter_xss(main_query: ConjunctiveQuery, mfs_list: List[ConjunctiveQuery]) -> Iterator[ConjunctiveQuery]:
         """
-        Calcule les XSS (requêtes réparées) pour une requête conjonctive qui échoue,
-        en interrogeant un endpoint SPARQL via QueryFailureAnalyzer.
-
-        :param main_query: la requête initiale (ConjunctiveQuery)
-        :param endpoint_url: URL du endpoint SPARQL (ex. http://localhost:8000/sparql)
+        Produit les XSS une à une à partir des MFS déjà connues.
         """
-        # 1. Instanciation de l'analyseur sur l'endpoint
-        analyzer = QueryFailureAnalyzer(endpoint_url)
+        return iter_xss(main_query, mfs_list)
 
-        # 2. Calcul de toutes les MFS de la requête principale
-        mfs_list = analyzer.find_all_failing_causes(main_query)
+    @staticmethod
+    def stream_xss(main_query: ConjunctiveQuery, endpoint_url: str,
+                   cache: Optional[OutcomeCache] = None, batch: bool = True,
+                   evaluator: Optional[EndpointEvaluator] = None,
+                   lattice: Optional[SubqueryLattice] = None) -> Iterator[ConjunctiveQuery]:
+        """
+        Produit les XSS au fil de l'algorithme LBA, chacune dès que son succès
+        est testé sur l'endpoint (SubqueryLattice.iter_xss), sans attendre la fin
+        de l'analyse. Paramètres : voir compute_xss.
+        """
+        if lattice is None:
+            analyzer = QueryFailureAnalyzer(endpoint_url, cache, batch=batch, evaluator=evaluator)
+            lattice = analyzer.lattice(main_query)
+        yield from lattice.iter_xss()
 
         print("\n MFS trouvées :\n")
-        for i, mfs in enumerate(mfs_list, 1):
-            print(f"MFS {i} :", [cl.label for cl in mfs.clauses])
+        for i, mfs in enumerate(lattice.mfs, 1):
+            print(f"MFS {i} :", [cl.label for cl in lattice.subquery(mfs).clauses])
+        print(f"Sous-requêtes évaluées : {lattice.evaluations} en {lattice.batches} requêtes, "
+              f"évitées : {lattice.skipped} (cache : {lattice.cached})")
         print("\n")
 
-        # 3. Génération des combinaisons de clauses à retirer
-        cand = XSSGenerator.generate_combinations(mfs_list)
-        result_queries = []
-        main_clauses_set = set(main_query.clauses)
-
-        # 4. Pour chaque pattern (combinaison de MFS), on retire ces clauses de la requête
-        for pattern in cand:
-            diff = main_clauses_set - set(pattern.clauses)
-            new_query = ConjunctiveQuery()
-            new_query.clauses = list(diff)
+    @staticmethod
+    def compute_xss(main_query: ConjunctiveQuery, endpoint_url: str,
+                    cache: Optional[OutcomeCache] = None, batch: bool = True,
+                    evaluator: Optional[EndpointEvaluator] = None,
+                    lattice: Optional[SubqueryLattice] = None) -> List[ConjunctiveQuery]:
+        """
+        Calcule les XSS (requêtes réparées) pour une requête conjonctive qui échoue,
+        en interrogeant un endpoint SPARQL via QueryFailureAnalyzer.
 
-            # 5. Filtrage pour éviter les sous-requêtes redondantes
-            is_sub = False
-            to_remove = []
-            for idx, existing in enumerate(result_queries):
-                existing_set = set(existing.clauses)
-                if set(new_query.clauses) <= existing_set:
-                    is_sub = True
-                    break
-                if existing_set <= set(new_query.clauses):
-                    to_remove.append(idx)
-            if not is_sub:
-                for idx in sorted(to_remove, reverse=True):
-                    del result_queries[idx]
-                result_queries.append(new_query)
+        Les MFS et les XSS sont obtenues ensemble par l'algorithme LBA, ce qui
+        évite le parcours exhaustif du treillis (une requête HTTP par test).
 
-        return result_queries
+        :param main_query: la requête initiale (ConjunctiveQuery)
+        :param endpoint_url: URL du endpoint SPARQL (ex. http://localhost:8000/sparql)
+        :param cache: cache persistant des sous-requêtes déjà évaluées sur cet endpoint
+        :param batch: teste les sous-requêtes en attente en une seule requête SPARQL groupée
+        :param evaluator: évaluateur (session HTTP) partagé avec la stratégie appelante
+        :param lattice: treillis déjà construit (par exemple avec le budget de la stratégie),
+                        dont on relit ensuite le nombre d'évaluations et 'partial'
+        """
+        return list(XSSGenerator.stream_xss(main_query, endpoint_url, cache, batch, evaluator, lattice))
 
 
 if __name__ == "__main__":
@@ -1,15 +1,25 @@
 import threading
-from queue import PriorityQueue, Queue
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from typing import Callable, Iterable, Iterator, List, Optional
 from rdflib import URIRef, Literal, RDFS, Variable
 from Query.ConjunctiveQueryClause import ConjunctiveQuery as Query
 from Query.SimpleLiteral import SimpleLiteral
+from Query.ClauseUniverse import ClauseUniverse
 from Relaxation.EndpointMode.FindXss import XSSGenerator
+from Relaxation.EndpointMode.FindMFS import QueryFailureAnalyzer
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.EndpointMode.EndpointEvaluator import EndpointEvaluator
 from Relaxation.EndpointMode.relaxation import ConjunctiveQueryRelaxation, TripleRelaxation
+from Relaxation.RelaxationCache import RelaxationCache
+from Relaxation.RankedProduct import started
+from Relaxation.CandidateFrontier import CandidateFrontier
+from Relaxation.RoundBudget import RoundBudget
+from Relaxation.RunBudget import RunBudget
+from Relaxation.AnswerSet import Answer, AnswerSet
 import itertools
 from Relaxation.EndpointMode.SimilarityEndpoint import SimilarityCalculator as sim
 import time
-import requests
 
 # ---------------------------
 # Constants and Global Counters
@@ -19,12 +29,18 @@ SUPPRESS_NODE_LEVEL = -1    # Relaxation level for node suppression
 LEVEL_ORDER = 0             # Relaxation order by level
 SIM_ORDER = 1               # Relaxation order by similarity
 HYBRID_ORDER = 2            # Hybrid relaxation order
+SCORE_CHUNK = 64            # Relaxations of a candidate scored together by the producer
 
 num_resource_release = 0    # Counter for resource variables
 num_pred_release = 0        # Counter for predicate variables
 
 class ParallelRelaxationStrategy:
-    def __init__(self, Q: Query, D: str, k: int):
+    def __init__(self, Q: Query, D: str, k: int, cache: Optional[OutcomeCache] = None,
+                 evaluator: Optional[EndpointEvaluator] = None, max_workers: Optional[int] = None,
+                 frontier_size: int = 1024, budget: Optional[RoundBudget] = None,
+                 run_budget: Optional[RunBudget] = None,
+                 on_answer: Optional[Callable[[Answer], None]] = None,
+                 prefetch: bool = True, snapshot: Optional[str] = None):
         """
         Constructor for the parallel relaxation strategy.
 
@@ -32,77 +48,164 @@ class ParallelRelaxationStrategy:
             Q (Query): The initial conjunctive query
             D (str): URL du endpoint SPARQL local
             k (int): Minimum number of results required
+            cache (OutcomeCache): Optional persistent cache of sub-query outcomes.
+            evaluator (EndpointEvaluator): Shared evaluator, e.g. an AsyncEndpointEvaluator
+                to keep many evaluations in flight over one connection pool.
+            max_workers (int): Size of the worker pool relaxing candidates
+                (None: the ThreadPoolExecutor default).
+            frontier_size (int): Maximum number of relaxed candidates waiting for the
+                consumer; a full frontier pauses the producer (0: unbounded).
+            budget (RoundBudget): Number of relaxation rounds and per-round budgets
+                (executions, time, candidates produced).
+            run_budget (RunBudget): Wall time, query executions and per-query timeout of
+                the whole run; once spent, the answers found so far are kept and
+                'partial' is set.
+            on_answer (callable): Called with each new Answer (binding, repaired query,
+                similarity) as soon as it is found, from the consumer thread.
+            prefetch (bool): Load every class and predicate frequency up front (three
+                GROUP BY queries) instead of counting terms one by one while scoring.
+            snapshot (str): JSON file keeping the prefetched frequencies between runs.
         """
         self.Q = Q
         self.D = D  # L'URL du endpoint
         self.k = k
+        self.cache = cache
+        self.evaluator = evaluator or EndpointEvaluator(D)  # Keep-alive session, early-terminating evaluation
         self.xss = []  # List of XSS candidates
-        self.Res = []     # List of responses (results)
+        self.answers = AnswerSet(k, Q.selected_vars, on_answer)  # Distinct answers, hashed keys
+        self.Res = self.answers.bindings     # List of responses (results)
         self.Req = []     # List of repaired queries (results)
         self.E = Queue()         # Queue of candidates from Delta (tuples (Q - x, x))
-        self.Cand = PriorityQueue()      # Queue of relaxed candidates
+        self.max_workers = max_workers
+        self.Cand = CandidateFrontier(frontier_size)  # Bounded frontier of relaxed candidates
+        self.budget = budget or RoundBudget()
+        self.run_budget = run_budget or RunBudget()
+        self.partial = False  # The run budget ran out (or an evaluation timed out) before k answers
+        self.round = 0  # Current relaxation round (0: relaxation of the delta candidates)
+        self.round_start = 0.0  # Start time of the current round
+        self.round_executions = 0  # Query executions before the current round
         self.counter = itertools.count()  # Global counter
-        self.similarity = sim(D)
+        self.seen = set()  # Canonical keys of the candidate queries already queued
+        self.relaxations = RelaxationCache()  # Relaxed alternatives per triple, shared by the producers
+        self.similarity = sim(D, self.evaluator, prefetch=prefetch, snapshot=snapshot)
         self.query_exec_count = 0  
         self.execution_time = 0.0  
 
-    def delta(self) -> list:
-        """Generate delta candidates using endpoint"""
-        delta_list = []
-        Xss = XSSGenerator.compute_xss(self.Q, self.D)  # Utilisation directe du endpoint
+    def delta(self) -> Iterator[tuple]:
+        """Generate delta candidates using endpoint, one per XSS as soon as the analysis has tested it"""
+        # MFS/XSS analysis within the run budget: each sub-query is bounded by the
+        # per-query timeout and charged to the run; a cut analysis makes it partial
+        lattice = QueryFailureAnalyzer(self.D, self.cache, batch=True, evaluator=self.evaluator).lattice(
+            self.Q, budget=self.run_budget, executions=self.query_exec_count)
         print(f"\nXSS trouvees\n")
-        for i, xss in enumerate(Xss, 1):
-            print(f"XSS {i}:")
-            print([j.label for j in xss.clauses])
-            print("-"*50)
-        for xss in Xss:
-            sim=self.similarity.query_similarity(self.Q.clauses, xss.clauses)
-            self.xss.append((xss, sim))
-            diff_triples = set(self.Q.clauses) - set(xss.clauses)
-            delta_query = Query()
-            delta_query.clauses = list(diff_triples)
-            delta_list.append((delta_query, xss))
-        return delta_list
+        try:
+            # Each XSS is yielded as soon as LBA has tested it, while the analysis goes on
+            for i, xss in enumerate(XSSGenerator.stream_xss(self.Q, self.D, self.cache, evaluator=self.evaluator,
+                                                            lattice=lattice), 1):  # Utilisation directe du endpoint
+                print(f"XSS {i}:")
+                print([j.label for j in xss.clauses])
+                print("-"*50)
+                sim=self.similarity.query_similarity(self.Q.clauses, xss.clauses)
+                self.xss.append((xss, sim))
+                diff_triples = set(self.Q.clauses) - set(xss.clauses)
+                delta_query = Query()
+                delta_query.clauses = list(diff_triples)
+                yield (delta_query, xss)
+        finally:
+            self.query_exec_count += lattice.evaluations
+            self.partial = self.partial or lattice.partial
 
-    def producer(self):
-        """Parallel relaxation using endpoint"""
-        if not self.E.empty():
-            tmp_results = {}
-
-            def relax_task(candidate):
-                query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1)
-                result = query_relax.relax_query()
-                results = [(i, candidate[1]) for i in result]
-                if results:
-                    results.pop(0)
-                tmp_results[candidate] = results
-
-            threads = []
-            elements = list(self.E.queue)
-            for candidate in elements:
-                thread = threading.Thread(target=relax_task, args=(candidate,))
-                threads.append(thread)
-                thread.start()
-
-            for thread in threads:
-                thread.join()
+    def relax_task(self, candidate) -> Iterable[tuple]:
+        """
+        Relax one candidate of E (run by a worker of the pool).
 
-            req = Query()
-            for candidate in elements:
-                for relaxed_query in tmp_results.get(candidate, []):
-                    request = req.conjunction_query_union(relaxed_query[0], candidate[1])
-                    sim_value = self.similarity.query_similarity(self.Q.clauses, request.clauses)
-                    count = next(self.counter)
-                    self.Cand.put((-sim_value, count, relaxed_query))
+        Returns:
+            iterable: The relaxed candidates (relaxed delta, xss), without the unrelaxed one,
+                      enumerated best-first as the producer pulls them.
+        """
+        if self.Cand.cancelled.is_set():
+            return []
+        query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1, evaluator=self.evaluator,
+                                                 cache=self.relaxations, max_depth=self.budget.depth_step)
+        codes = candidate[0].codes()
+        versions = query_relax.iter_relaxed_queries(self.similarity, accept=lambda q: q.codes() != codes)
+        return ((version, candidate[1]) for _, version in started(versions))
 
-            while not self.E.empty():
-                self.E.get()
+    def producer(self):
+        """
+        Parallel relaxation using endpoint: a bounded pool of workers relaxes the
+        candidates of E, and each candidate's relaxations reach the Cand frontier
+        as soon as they are scored, while the consumer evaluates the best ones.
+        A full frontier pauses the producer; a cancelled one stops it.
+        """
+        elements = []
+        while not self.E.empty():
+            elements.append(self.E.get())
+        req = Query()
+        produced = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.relax_task, candidate): candidate for candidate in elements}
+            unprocessed = dict(futures)
+            for future in as_completed(futures):
+                if self.Cand.cancelled.is_set() or self.budget.frontier_full(produced):
+                    break
+                candidate = unprocessed.pop(future)
+                try:
+                    relaxed = future.result()
+                except Exception as e:
+                    print(f"Relaxation failed for {[c.label for c in candidate[0].clauses]}: {e}")
+                    continue
+                # Relaxations pulled best-first in chunks: those after a cancelled
+                # or full frontier are never built
+                relaxed = iter(relaxed)
+                fresh = set()
+                stopped = False
+                while not stopped:
+                    chunk = list(itertools.islice(relaxed, SCORE_CHUNK))
+                    if not chunk:
+                        break
+                    pending = []
+                    for relaxed_query in chunk:
+                        request = req.conjunction_query_union(relaxed_query[0], candidate[1])
+                        # Keyed with the projection it is evaluated with
+                        request.selected_vars = self.Q.selected_vars.copy()
+                        # Equal up to clause order and names of non-projected variables: queued only once
+                        key = request.canonical_key()
+                        if key not in self.seen and key not in fresh:
+                            fresh.add(key)
+                            pending.append((relaxed_query, request, key))
+                    # The relaxations of a chunk are scored in one batch
+                    sim_values = self.similarity.batch_query_similarity(
+                        self.Q.clauses, [request.clauses for _, request, _ in pending]
+                    )
+                    for (relaxed_query, request, key), sim_value in zip(pending, sim_values):
+                        if (self.budget.frontier_full(produced)
+                                or not self.Cand.offer((-sim_value, next(self.counter), relaxed_query))):
+                            # Its remaining relaxations are produced again at the next round
+                            self.E.put(candidate)
+                            stopped = True
+                            break
+                        # Seen only once offered: an unoffered relaxation is never lost
+                        self.seen.add(key)
+                        produced += 1
+            for future in unprocessed:
+                future.cancel()
+        # Candidates a cancelled or full round did not relax wait for the next round
+        for candidate in unprocessed.values():
+            self.E.put(candidate)
+        self.Cand.close()
 
     def consumer(self):
         """Query evaluation through endpoint"""
         print("\n requetes candidates:\n")
-        while len(self.Res) < self.k and not self.Cand.empty():
-            priority, count, candidate = self.Cand.get()
+        while len(self.Res) < self.k:
+            if self.out_of_budget() or self.budget.round_over(self.query_exec_count - self.round_executions,
+                                                              time.time() - self.round_start):
+                break
+            item = self.Cand.take(timeout=self.run_budget.remaining())
+            if item is None:
+                break
+            priority, count, candidate = item
             print(candidate[0].to_sparql())
             print("\n similarity:")
             print(priority)
@@ -113,57 +216,94 @@ class ParallelRelaxationStrategy:
             simval = priority*-1
             
             # Exécution via endpoint SPARQL
-            def execute_query(request):
-                sparql_query = request.to_sparql()
-                response = requests.post(
-                    self.D,
-                    data={"query": sparql_query},
-                    headers={"Accept": "application/json"}
-                )
-                return response
-            response = execute_query(request)
-            
+            results = self.evaluator.bindings(request, limit=self.k + len(self.Res),
+                                              timeout=self.run_budget.timeout())
             self.query_exec_count += 1
-            if response.status_code == 200:
-                results = response.json()
-                if results.get("results", {}).get("bindings"):
-                    for binding in results.get("results", {}).get("bindings", []):
-                        if len(self.Res) < self.k and binding not in self.Res:
-                            self.Res.append(binding)
-                    self.Req.append((request, simval))
+            if results:
+                self.answers.extend(results, request, simval)
+                self.Req.append((request, simval))
             else:
                 self.E.put(candidate)
-        if len(self.Res) < self.k:
-            for x in self.xss:
-                if len(self.Res) < self.k:
-                    self.Req.append((x[0], x[1]))
-                    response = execute_query(x[0])
-                    self.query_exec_count += 1
-                    if response.status_code == 200:
-                        results = response.json()
-                        if results.get("results", {}).get("bindings"):
-                            for binding in results.get("results", {}).get("bindings", []):
-                                if len(self.Res) < self.k and binding not in self.Res:
-                                    self.Res.append(binding)
-            self.Cand.task_done()
+        # k answers, no candidate left or round budget spent: the producer and its workers stop
+        self.Cand.cancel()
+
+    def complete_with_xss(self):
+        """
+        Once the relaxation rounds are over, complete Res with the answers of the
+        XSS, within the run budget.
+        """
+        for x in self.xss:
+            if len(self.Res) < self.k and not self.out_of_budget():
+                self.Req.append((x[0], x[1]))
+                results = self.evaluator.bindings(x[0], limit=self.k + len(self.Res),
+                                                  timeout=self.run_budget.timeout())
+                self.query_exec_count += 1
+                self.answers.extend(results, x[0], x[1])
+
+    def out_of_budget(self) -> bool:
+        """True once the run budget is spent before k answers: the result is then partial."""
+        if len(self.Res) < self.k and self.run_budget.exhausted(self.query_exec_count):
+            self.partial = True
+            return True
+        return False
+
+    def run_rounds(self):
+        """
+        Relaxation rounds: each round relaxes the candidates of E (at the first
+        round, the delta candidates; then the candidates that failed) one level
+        further, while the consumer evaluates the best relaxed candidates.
+        A new round starts only while fewer than k answers are found, so deep
+        relaxations are reached only when needed, and while the run budget lasts.
+        """
+        self.round = 0
+        while (len(self.Res) < self.k and self.budget.allows_round(self.round)
+               and not (self.E.empty() and self.Cand.empty()) and not self.out_of_budget()):
+            self.round_start = time.time()
+            self.round_executions = self.query_exec_count
+            self.Cand.reopen()
+            # Relaxation and evaluation overlap: the consumer takes the best
+            # candidates already produced while the workers relax the others
+            producer_thread = threading.Thread(target=self.producer)
+            consumer_thread = threading.Thread(target=self.consumer)
+            producer_thread.start()
+            consumer_thread.start()
+            consumer_thread.join()
+            producer_thread.join()
+            self.round += 1
+        self.complete_with_xss()
 
     def parallelxbs(self):
-        """Main algorithm with endpoint integration"""
+        """
+        Main algorithm with endpoint integration; 'partial' tells whether the
+        run budget cut the search short.
+        """
         start_time = time.time()
+        self.run_budget.start()
+        self.partial = False
+        timeouts = self.evaluator.timeouts
         for candidate in self.delta():
             self.E.put(candidate)
-        producer_thread = threading.Thread(target=self.producer)
-        consumer_thread = threading.Thread(target=self.consumer)
-        producer_thread.start()
-        producer_thread.join()
-        consumer_thread.start()
-        consumer_thread.join()
+        self.run_rounds()
+        # A timed-out evaluation may have hidden answers of a better candidate
+        self.partial = self.partial or self.evaluator.timeouts > timeouts
         end_time = time.time()
         self.execution_time = end_time - start_time
         # return self.Res
 
+    def stream(self) -> Iterator[Answer]:
+        """
+        Run the algorithm in the background and yield each Answer (binding,
+        repaired query, similarity) as soon as it is found.
+        """
+        return self.answers.stream(self.parallelxbs)
+
 class ParallelRelaxationSmartStrategy:
-    def __init__(self, Q: Query, D: str, k: int):
+    def __init__(self, Q: Query, D: str, k: int, cache: Optional[OutcomeCache] = None,
+                 evaluator: Optional[EndpointEvaluator] = None, max_workers: Optional[int] = None,
+                 frontier_size: int = 1024, budget: Optional[RoundBudget] = None,
+                 run_budget: Optional[RunBudget] = None,
+                 on_answer: Optional[Callable[[Answer], None]] = None,
+                 prefetch: bool = True, snapshot: Optional[str] = None):
         """
         Constructor for the smart strategy.
 
@@ -171,169 +311,257 @@ class ParallelRelaxationSmartStrategy:
             Q (Query): Initial query
             D (str): Endpoint SPARQL URL
             k (int): Minimum results required
+            cache (OutcomeCache): Optional persistent cache of sub-query outcomes.
+            evaluator (EndpointEvaluator): Shared evaluator, e.g. an AsyncEndpointEvaluator
+                to keep many evaluations in flight over one connection pool.
+            max_workers (int): Size of the worker pool relaxing candidates
+                (None: the ThreadPoolExecutor default).
+            frontier_size (int): Maximum number of relaxed candidates waiting for the
+                consumer; a full frontier pauses the producer (0: unbounded).
+            budget (RoundBudget): Number of relaxation rounds and per-round budgets
+                (executions, time, candidates produced).
+            run_budget (RunBudget): Wall time, query executions and per-query timeout of
+                the whole run; once spent, the answers found so far are kept and
+                'partial' is set.
+            on_answer (callable): Called with each new Answer (binding, repaired query,
+                similarity) as soon as it is found, from the consumer thread.
+            prefetch (bool): Load every class and predicate frequency up front (three
+                GROUP BY queries) instead of counting terms one by one while scoring.
+            snapshot (str): JSON file keeping the prefetched frequencies between runs.
         """
         self.xss=[]
         self.Q = Q
         self.D = D
         self.k = k
-        self.Res = []
+        self.cache = cache
+        self.evaluator = evaluator or EndpointEvaluator(D)  # Keep-alive session, early-terminating evaluation
+        self.answers = AnswerSet(k, Q.selected_vars, on_answer)  # Distinct answers, hashed keys
+        self.Res = self.answers.bindings
         self.Req = []
-        self.listTester = []  # List of tested queries
+        self.listTester = set()  # Canonical keys of the tested queries
         self.F = []       # List of failure sub queries
+        self.universe = ClauseUniverse(Q.clauses)  # One bit per clause seen
+        self.F_masks = []  # Masks of the queries of F, in the same order
         self.E = Queue()
-        self.Cand = PriorityQueue()
+        self.max_workers = max_workers
+        self.Cand = CandidateFrontier(frontier_size)  # Bounded frontier of relaxed candidates
+        self.budget = budget or RoundBudget()
+        self.run_budget = run_budget or RunBudget()
+        self.partial = False  # The run budget ran out (or an evaluation timed out) before k answers
+        self.round = 0  # Current relaxation round (0: relaxation of the delta candidates)
+        self.round_start = 0.0  # Start time of the current round
+        self.round_executions = 0  # Query executions before the current round
         self.counter = itertools.count()
-        self.similarity = sim(D)
+        self.seen = set()  # Canonical keys of the candidate queries already queued
+        self.relaxations = RelaxationCache()  # Relaxed alternatives per triple, shared by the producers
+        self.similarity = sim(D, self.evaluator, prefetch=prefetch, snapshot=snapshot)
         self.query_exec_count = 0  
         self.execution_time = 0.0  
 
     # Les méthodes restantes conservent la même logique avec adaptation du endpoint
     # ... (le reste du code reste similaire avec remplacement des appels Graph par des requêtes SPARQL)
-    def delta(self) -> list:
-        """Generate delta candidates using endpoint"""
-        delta_list = []
-        Xss = XSSGenerator.compute_xss(self.Q, self.D)  # Utilisation directe du endpoint
+    def delta(self) -> Iterator[tuple]:
+        """Generate delta candidates using endpoint, one per XSS as soon as the analysis has tested it"""
+        # MFS/XSS analysis within the run budget: each sub-query is bounded by the
+        # per-query timeout and charged to the run; a cut analysis makes it partial
+        lattice = QueryFailureAnalyzer(self.D, self.cache, batch=True, evaluator=self.evaluator).lattice(
+            self.Q, budget=self.run_budget, executions=self.query_exec_count)
         print(f"\nXSS trouvees\n")
-        for i, xss in enumerate(Xss, 1):
-            print(f"XSS {i}:")
-            print([j.label for j in xss.clauses])
-            print("-"*50)
-        for xss in Xss:
-            sim=self.similarity.query_similarity(self.Q.clauses, xss.clauses)
-            self.xss.append((xss, sim))
-            diff_triples = set(self.Q.clauses) - set(xss.clauses)
-            delta_query = Query()
-            delta_query.clauses = list(diff_triples)
-            delta_list.append((delta_query, xss))
-        return delta_list
-
-    def producer(self):
-        """Parallel relaxation using endpoint"""
-        if not self.E.empty():
-            tmp_results = {}
+        try:
+            # Each XSS is yielded as soon as LBA has tested it, while the analysis goes on
+            for i, xss in enumerate(XSSGenerator.stream_xss(self.Q, self.D, self.cache, evaluator=self.evaluator,
+                                                            lattice=lattice), 1):  # Utilisation directe du endpoint
+                print(f"XSS {i}:")
+                print([j.label for j in xss.clauses])
+                print("-"*50)
+                sim=self.similarity.query_similarity(self.Q.clauses, xss.clauses)
+                self.xss.append((xss, sim))
+                diff_triples = set(self.Q.clauses) - set(xss.clauses)
+                delta_query = Query()
+                delta_query.clauses = list(diff_triples)
+                yield (delta_query, xss)
+        finally:
+            self.query_exec_count += lattice.evaluations
+            self.partial = self.partial or lattice.partial
 
-            def relax_task(candidate):
-                query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1)
-                result = query_relax.relax_query()
-                results=[]
-                for cand in result:
-                    valid = query_relax.is_relaxed_version_valid(cand)
-                    if valid:
-                        results.append((cand, candidate[1]))
-                # results = [(i, candidate[1]) for i in result]
-                # if results:
-                #     results.pop(0)
-                tmp_results[candidate] = results
-
-            threads = []
-            elements = list(self.E.queue)
-            for candidate in elements:
-                thread = threading.Thread(target=relax_task, args=(candidate,))
-                threads.append(thread)
-                thread.start()
-
-            for thread in threads:
-                thread.join()
+    def relax_task(self, candidate) -> Iterable[tuple]:
+        """
+        Relax one candidate of E (run by a worker of the pool).
 
-            req = Query()
-            for candidate in elements:
-                for relaxed_query in tmp_results.get(candidate, []):
-                    request = req.conjunction_query_union(relaxed_query[0], candidate[1])
-                    sim_value = self.similarity.query_similarity(self.Q.clauses, request.clauses)
-                    count = next(self.counter)
-                    self.Cand.put((-sim_value, count, relaxed_query))
+        Returns:
+            iterable: The relaxed candidates (relaxed delta, xss): at the first round, those
+                      whose clauses are all relaxed; then every version but the candidate itself.
+                      They are enumerated best-first as the producer pulls them.
+        """
+        if self.Cand.cancelled.is_set():
+            return []
+        query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1, evaluator=self.evaluator,
+                                                 cache=self.relaxations, max_depth=self.budget.depth_step)
+        if self.round == 0:
+            accept = query_relax.is_relaxed_version_valid
+        else:
+            # A failed candidate goes one level further (up the hierarchy or to a variable)
+            codes = candidate[0].codes()
+            accept = lambda q: q.codes() != codes
+        versions = query_relax.iter_relaxed_queries(self.similarity, accept=accept)
+        return ((version, candidate[1]) for _, version in started(versions))
 
-            while not self.E.empty():
-                self.E.get()
+    def producer(self):
+        """
+        Parallel relaxation using endpoint: a bounded pool of workers relaxes the
+        candidates of E, and each candidate's relaxations reach the Cand frontier
+        as soon as they are scored, while the consumer evaluates the best ones.
+        A full frontier pauses the producer; a cancelled one stops it.
+        """
+        elements = []
+        while not self.E.empty():
+            elements.append(self.E.get())
+        req = Query()
+        produced = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.relax_task, candidate): candidate for candidate in elements}
+            unprocessed = dict(futures)
+            for future in as_completed(futures):
+                if self.Cand.cancelled.is_set() or self.budget.frontier_full(produced):
+                    break
+                candidate = unprocessed.pop(future)
+                try:
+                    relaxed = future.result()
+                except Exception as e:
+                    print(f"Relaxation failed for {[c.label for c in candidate[0].clauses]}: {e}")
+                    continue
+                # Relaxations pulled best-first in chunks: those after a cancelled
+                # or full frontier are never built
+                relaxed = iter(relaxed)
+                fresh = set()
+                stopped = False
+                while not stopped:
+                    chunk = list(itertools.islice(relaxed, SCORE_CHUNK))
+                    if not chunk:
+                        break
+                    pending = []
+                    for relaxed_query in chunk:
+                        request = req.conjunction_query_union(relaxed_query[0], candidate[1])
+                        # Keyed with the projection it is evaluated with
+                        request.selected_vars = self.Q.selected_vars.copy()
+                        # Equal up to clause order and names of non-projected variables: queued only once
+                        key = request.canonical_key()
+                        if key not in self.seen and key not in fresh:
+                            fresh.add(key)
+                            pending.append((relaxed_query, request, key))
+                    # The relaxations of a chunk are scored in one batch
+                    sim_values = self.similarity.batch_query_similarity(
+                        self.Q.clauses, [request.clauses for _, request, _ in pending]
+                    )
+                    for (relaxed_query, request, key), sim_value in zip(pending, sim_values):
+                        if (self.budget.frontier_full(produced)
+                                or not self.Cand.offer((-sim_value, next(self.counter), relaxed_query))):
+                            # Its remaining relaxations are produced again at the next round
+                            self.E.put(candidate)
+                            stopped = True
+                            break
+                        # Seen only once offered: an unoffered relaxation is never lost
+                        self.seen.add(key)
+                        produced += 1
+            for future in unprocessed:
+                future.cancel()
+        # Candidates a cancelled or full round did not relax wait for the next round
+        for candidate in unprocessed.values():
+            self.E.put(candidate)
+        self.Cand.close()
 
     @staticmethod
     def generate_combinations(queries: List[Query]) -> List[Query]:
         """
-        Generate all non-redundant combinations of query clauses.
-        """
-        clauses_sets = [q.clauses for q in queries]
-        combinations = itertools.product(*clauses_sets)
-        seen = set()
-        result = []
-        for combo in combinations:
-            merged = []
-            for clause in combo:
-                if clause not in merged:
-                    merged.append(clause)
-            key = tuple(merged)
-            if key not in seen:
-                seen.add(key)
+        Generate the minimal sets of clauses hitting every query (MMCS),
+        each set exactly once.
+        """
+        return XSSGenerator.generate_combinations(queries)
+
+    @staticmethod
+    def filter_tests(query: Query) -> List[Query]:
+        """
+        Sub-queries of one and two clauses tested by GenFilter, each set once,
+        singletons first so that a failing clause prunes the pairs containing it.
+        """
+        tests = []
+        for size in (1, 2):
+            for combo in itertools.combinations(query.clauses, size):
                 q = Query()
-                q.clauses = merged
-                result.append(q)
-        return result
+                q.clauses = list(combo)
+                tests.append(q)
+        return tests
+
+    def add_failing(self, query: Query):
+        """Record a failing sub-query in F, with its mask (triples only, filters are ignored)."""
+        self.F.append(query)
+        self.F_masks.append(query.mask(self.universe))
 
     def GenFilter(self, candidate):
         """Failing sub-queries detection via endpoint"""
         print("\n Filter")
         if len(candidate[0].clauses)>1:
-            list_candidate = [candidate[0], candidate[0]]
-            test = self.generate_combinations(list_candidate)
-            while test:
-                i = test.pop(0)
-                candidate_union = Query.conjunction_query_union(i, candidate[1])
-                sparql_query = candidate_union.to_sparql()
-                if candidate_union not in self.listTester:
-                    self.listTester.append(candidate_union)
-                    response = requests.post(
-                        self.D,
-                        data={"query": sparql_query},
-                        headers={"Accept": "application/json"}
-                    )
-                    self.query_exec_count += 1
-                    if response.status_code != 200 or not response.json().get("results", {}).get("bindings"):
-                        self.F.append(i)
-                        new_test = [j for j in test if not i.is_subquery(j)]
-                        test = new_test
+            test = self.filter_tests(candidate[0])
+            # Tests of the same size are independent: they are sent together,
+            # then a failing clause prunes the pairs containing it
+            for size in (1, 2):
+                if self.out_of_budget():
+                    break
+                batch = []
+                for i in test:
+                    if len(i.clauses) != size:
+                        continue
+                    mask = i.mask(self.universe)
+                    if any(ClauseUniverse.is_subset(f, mask) for f in self.F_masks):
+                        continue
+                    candidate_union = Query.conjunction_query_union(i, candidate[1])
+                    key = candidate_union.canonical_key()
+                    if key not in self.listTester:
+                        self.listTester.add(key)
+                        batch.append((i, candidate_union))
+                self.query_exec_count += len(batch)
+                rows = self.evaluator.bindings_many([u for _, u in batch], limit=1,
+                                                    timeout=self.run_budget.timeout())
+                for (i, _), found in zip(batch, rows):
+                    if not found:
+                        self.add_failing(i)
         else:
-            self.F.append(candidate[0]) 
+            self.add_failing(candidate[0])
 
     def consumer(self):
         """Modified consumer with endpoint calls"""
         print("\n requetes candidates:\n")
-        while len(self.Res) < self.k and not self.Cand.empty():
-            priority, count, candidate = self.Cand.get()
+        while len(self.Res) < self.k:
+            if self.out_of_budget() or self.budget.round_over(self.query_exec_count - self.round_executions,
+                                                              time.time() - self.round_start):
+                break
+            item = self.Cand.take(timeout=self.run_budget.remaining())
+            if item is None:
+                break
+            priority, count, candidate = item
             print(candidate[0].to_sparql())
             print("\n similarity:")
             print(priority)
             print("\n")
-            elig = True
-            i = 0
-            while i < len(self.F) and elig:
-                j = self.F[i]
-                if j.is_subquery(candidate[0]):
-                    elig = False
-                i += 1
+            # Not eligible if it contains a known failing sub-query (triples only:
+            # filters are ignored, as in is_subquery)
+            mask = candidate[0].mask(self.universe)
+            elig = not any(ClauseUniverse.is_subset(f, mask) for f in self.F_masks)
             if elig:
                 print("Execution de la requete candidate")
                 candidate_query = Query.conjunction_query_union(candidate[1], candidate[0])
                 candidate_query.selected_vars = self.Q.selected_vars.copy()
                 
                 # Exécution via endpoint
-                def execute_query(request):
-                    sparql_query = request.to_sparql()
-                    response = requests.post(
-                        self.D,
-                        data={"query": sparql_query},
-                        headers={"Accept": "application/json"}
-                    )
-                    return response
-                response = execute_query(candidate_query)
+                results = self.evaluator.bindings(candidate_query, limit=self.k + len(self.Res),
+                                                  timeout=self.run_budget.timeout())
                 
                 self.query_exec_count += 1
                 simval = priority*-1
                 
-                if response.status_code == 200 and response.json().get("results", {}).get("bindings"):
-                    results = response.json()
+                if results:
                     print("Requete candidate valide avec des resultats\n")
-                    for binding in results.get("results", {}).get("bindings"):
-                        if len(self.Res) < self.k and binding not in self.Res:
-                            self.Res.append(binding)
+                    self.answers.extend(results, candidate_query, simval)
                     self.Req.append((candidate_query, simval))
                 else:
                     self.E.put(candidate)
@@ -342,35 +570,77 @@ class ParallelRelaxationSmartStrategy:
                 print("Requete candidate non valide")
                 self.E.put(candidate)
             
+        # k answers, no candidate left or round budget spent: the producer and its workers stop
+        self.Cand.cancel()
+
+    def complete_with_xss(self):
+        """
+        Once the relaxation rounds are over, complete Res with the answers of the
+        XSS, within the run budget.
+        """
         for x in self.xss:
-            if len(self.Res) < self.k:
+            if len(self.Res) < self.k and not self.out_of_budget():
                 self.Req.append((x[0], x[1]))
-                response = execute_query(x[0])
-            
+                results = self.evaluator.bindings(x[0], limit=self.k + len(self.Res),
+                                                  timeout=self.run_budget.timeout())
                 self.query_exec_count += 1
-                if response.status_code == 200:
-                    results = response.json()
-                    for binding in results.get("results", {}).get("bindings", []):
-                        if len(self.Res) < self.k and binding not in self.Res:
-                            self.Res.append(binding)
+                self.answers.extend(results, x[0], x[1])
+
+    def out_of_budget(self) -> bool:
+        """True once the run budget is spent before k answers: the result is then partial."""
+        if len(self.Res) < self.k and self.run_budget.exhausted(self.query_exec_count):
+            self.partial = True
+            return True
+        return False
 
-        self.Cand.task_done()
+    def run_rounds(self):
+        """
+        Relaxation rounds: each round relaxes the candidates of E (at the first
+        round, the delta candidates; then the candidates that failed) one level
+        further, while the consumer evaluates the best relaxed candidates.
+        A new round starts only while fewer than k answers are found, so deep
+        relaxations are reached only when needed, and while the run budget lasts.
+        """
+        self.round = 0
+        while (len(self.Res) < self.k and self.budget.allows_round(self.round)
+               and not (self.E.empty() and self.Cand.empty()) and not self.out_of_budget()):
+            self.round_start = time.time()
+            self.round_executions = self.query_exec_count
+            self.Cand.reopen()
+            # Relaxation and evaluation overlap: the consumer takes the best
+            # candidates already produced while the workers relax the others
+            producer_thread = threading.Thread(target=self.producer)
+            consumer_thread = threading.Thread(target=self.consumer)
+            producer_thread.start()
+            consumer_thread.start()
+            consumer_thread.join()
+            producer_thread.join()
+            self.round += 1
+        self.complete_with_xss()
 
     def parallelxbsv2(self):
         """
         Execute the smart parallel relaxation algorithm.
         
         Returns:
-            list: The list of repaired queries (Res) satisfying the criterion.
+            list: The list of repaired queries (Res) satisfying the criterion;
+                  'partial' tells whether the run budget cut the search short.
         """
         start_time = time.time()  # Start time measurement
+        self.run_budget.start()
+        self.partial = False
+        timeouts = self.evaluator.timeouts
         for candidate in self.delta():
             self.E.put(candidate)
-        producer_thread = threading.Thread(target=self.producer)
-        consumer_thread = threading.Thread(target=self.consumer)
-        producer_thread.start()
-        producer_thread.join()
-        consumer_thread.start()
-        consumer_thread.join()
+        self.run_rounds()
+        # A timed-out evaluation may have hidden answers of a better candidate
+        self.partial = self.partial or self.evaluator.timeouts > timeouts
         end_time = time.time()  # End time measurement
-        self.execution_time = end_time - start_time
\ No newline at end of file
+        self.execution_time = end_time - start_time
+
+    def stream(self) -> Iterator[Answer]:
+        """
+        Run the algorithm in the background and yield each Answer (binding,
+        repaired query, similarity) as soon as it is found.
+        """
+        return self.answers.stream(self.parallelxbsv2)
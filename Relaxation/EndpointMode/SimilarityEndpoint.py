@@ -1,19 +1,94 @@
 import math
+from typing import Dict, Optional
 from SPARQLWrapper import SPARQLWrapper, JSON
-from rdflib import BNode, URIRef, Variable
+from rdflib import BNode, Literal, URIRef, Variable
+from Relaxation.EndpointMode.EndpointEvaluator import DEFAULT_TIMEOUT, run_select, to_term
+from Relaxation.QueryEvaluator import QueryEvaluator
+from Relaxation.StatisticsCatalog import StatisticsCatalog
+from Relaxation.BatchSimilarity import batch_query_similarity
+from Relaxation.SimilarityMemo import ELEMENT_TYPES, TripleScoreMemo, delta_similarity
 
 from Relaxation.parser import SparqlTripletParser
 from Relaxation.parser2 import expand_sparql
 
 class SimilarityCalculator:
-    def __init__(self, endpoint_url: str):
+    def __init__(self, endpoint_url: str, evaluator: Optional[QueryEvaluator] = None,
+                 prefetch: bool = False, snapshot: Optional[str] = None, ttl: Optional[float] = 86400,
+                 memo_size: int = 65536):
         """
         Initialise le calculateur avec l'URL d'un endpoint SPARQL.
 
         :param endpoint_url: URL du endpoint SPARQL.
+        :param evaluator: Évaluateur partagé (session HTTP persistante) ; à défaut,
+                          un SPARQLWrapper est utilisé.
+        :param prefetch: Si True, toutes les fréquences de classes et de prédicats sont
+                         chargées au démarrage (requêtes GROUP BY) puis lues en mémoire.
+        :param snapshot: Fichier JSON où les fréquences préchargées sont conservées
+                         d'une exécution à l'autre.
+        :param ttl: Durée de validité de l'instantané, en secondes (None : illimitée).
+        :param memo_size: Nombre de scores de triplets gardés en mémoire (LRU) ; sans
+                          catalogue, chaque score évité économise des requêtes.
         """
-        self.endpoint = SPARQLWrapper(endpoint_url)
-        self.endpoint.setReturnFormat(JSON)
+        self.endpoint_url = endpoint_url
+        if evaluator is not None:
+            self.endpoint = evaluator
+        else:
+            self.endpoint = SPARQLWrapper(endpoint_url)
+            self.endpoint.setReturnFormat(JSON)
+            self.endpoint.setTimeout(int(DEFAULT_TIMEOUT))
+        self.catalog: Optional[StatisticsCatalog] = None
+        self.memo = TripleScoreMemo(memo_size)
+        if prefetch:
+            try:
+                self.catalog = self.load_catalog(snapshot, ttl)
+            except Exception as e:
+                # Sans catalogue, les fréquences sont demandées terme par terme
+                print(f"Préchargement des fréquences impossible : {e}")
+
+    _term = staticmethod(to_term)
+
+    def prefetch_catalog(self) -> StatisticsCatalog:
+        """
+        Charge en trois requêtes le nombre d'instances de chaque classe, le
+        nombre de triplets de chaque prédicat et le nombre total d'instances.
+        """
+        class_counts = {
+            self._term(b["c"]): int(b["n"]["value"])
+            for b in run_select(self.endpoint, """
+        SELECT ?c (COUNT(DISTINCT ?s) AS ?n) WHERE {
+            ?s a ?c .
+        } GROUP BY ?c
+        """)
+        }
+        predicate_counts = {
+            self._term(b["p"]): int(b["n"]["value"])
+            for b in run_select(self.endpoint, """
+        SELECT ?p (COUNT(*) AS ?n) WHERE {
+            ?s ?p ?o .
+        } GROUP BY ?p
+        """)
+        }
+        bindings = run_select(self.endpoint, """
+        SELECT (COUNT(DISTINCT ?s) AS ?total) WHERE {
+            ?s a ?o .
+        }
+        """)
+        total_instances = int(bindings[0]["total"]["value"])
+        return StatisticsCatalog.from_counts(
+            class_counts, predicate_counts, total_instances, sum(predicate_counts.values())
+        )
+
+    def load_catalog(self, snapshot: Optional[str] = None, ttl: Optional[float] = None) -> StatisticsCatalog:
+        """
+        Catalogue lu dans l'instantané s'il est encore valide pour cet endpoint,
+        sinon préchargé depuis l'endpoint puis enregistré.
+        """
+        catalog = StatisticsCatalog.load(snapshot, self.endpoint_url, ttl) if snapshot else None
+        if catalog is None:
+            catalog = self.prefetch_catalog()
+            if snapshot:
+                catalog.save(snapshot, self.endpoint_url)
+        return catalog
 
     def pr_class(self, cls_uri):
         """
@@ -22,18 +97,18 @@ class SimilarityCalculator:
         (# d'instances de la classe) / (nombre total d'instances)
         où une instance est toute ressource apparaissant comme sujet dans un triplet.
         """
+        if self.catalog is not None:
+            return self.catalog.pr_class(cls_uri)
         # 1. Construire la requête SPARQL pour compter distinctement les sujets de type cls_uri
         query = f"""
         SELECT (COUNT(DISTINCT ?s) AS ?count) WHERE {{
             ?s a <{cls_uri}> .
         }}
         """
-        # On envoie cette requête à l'endpoint SPARQL
-        self.endpoint.setQuery(query)
-        # On exécute la requête et récupère le résultat au format JSON
-        results = self.endpoint.query().convert()
+        # On envoie cette requête à l'endpoint SPARQL et on récupère les solutions JSON
+        bindings = run_select(self.endpoint, query)
         # On extrait la valeur du binding "count" (chaîne de caractères) et on la convertit en int
-        count_cls = int(results["results"]["bindings"][0]["count"]["value"])
+        count_cls = int(bindings[0]["count"]["value"])
 
         # 2. Construire la requête SPARQL pour compter le nombre total d'instances
         #    On considère ici qu'une instance est tout sujet ?s apparaissant dans un triplet quelconque.
@@ -42,9 +117,8 @@ class SimilarityCalculator:
             ?s a ?o .
         }
         """
-        self.endpoint.setQuery(total_query)
-        results = self.endpoint.query().convert()
-        total_instances = int(results["results"]["bindings"][0]["total"]["value"])
+        bindings = run_select(self.endpoint, total_query)
+        total_instances = int(bindings[0]["total"]["value"])
 
         # 3. Retourner la fraction : nombre d'instances de la classe / nombre total d'instances
         #    Si le graphe est vide (total_instances == 0), on retourne 0 pour éviter division par zéro.
@@ -52,6 +126,8 @@ class SimilarityCalculator:
 
 
     def ic_class(self, cls):
+        if self.catalog is not None:
+            return self.catalog.ic_class(cls)
         pr = self.pr_class(cls)
         return -math.log(pr) if pr > 0 else 0
 
@@ -62,15 +138,16 @@ class SimilarityCalculator:
         Cette probabilité est estimée par :
         (# de triplets utilisant ce prédicat) / (nombre total de triplets)
         """
+        if self.catalog is not None:
+            return self.catalog.pr_property(prop_uri)
         # 1. Construire la requête SPARQL pour compter tous les triplets où ?s prop_uri ?o
         query = f"""
         SELECT (COUNT(?s) AS ?count) WHERE {{
             ?s <{prop_uri}> ?o .
         }}
         """
-        self.endpoint.setQuery(query)
-        results = self.endpoint.query().convert()
-        count_prop = int(results["results"]["bindings"][0]["count"]["value"])
+        bindings = run_select(self.endpoint, query)
+        count_prop = int(bindings[0]["count"]["value"])
 
         # 2. Construire la requête SPARQL pour compter le nombre total de triplets
         #    COUNT(*) compte toutes les lignes du pattern { ?s ?p ?o }.
@@ -79,9 +156,8 @@ class SimilarityCalculator:
             ?s ?p ?o .
         }
         """
-        self.endpoint.setQuery(total_query)
-        results = self.endpoint.query().convert()
-        total_triples = int(results["results"]["bindings"][0]["total"]["value"])
+        bindings = run_select(self.endpoint, total_query)
+        total_triples = int(bindings[0]["total"]["value"])
 
         # 3. Retourner la fraction : occurrences du prédicat / total des triplets
         #    Si le graphe est vide (total_triples == 0), on retourne 0.
@@ -89,6 +165,8 @@ class SimilarityCalculator:
 
 
     def ic_property(self, prop):
+        if self.catalog is not None:
+            return self.catalog.ic_property(prop)
         pr = self.pr_property(prop)
         return -math.log(pr) if pr > 0 else 0
 
@@ -122,17 +200,19 @@ class SimilarityCalculator:
             return self.sim_r2(original, relaxed)
         return 0
 
+    def triple_score(self, t, t_prime):
+        """Somme des similarités des composantes de t_prime par rapport à t, mémorisée."""
+        return self.memo.get((tuple(t), tuple(t_prime)), lambda: sum(
+            self.sim_element(orig, relax, etype)
+            for orig, relax, etype in zip(t, t_prime, ELEMENT_TYPES)
+        ))
+
     def sim_triple(self, t, t_prime):
         """
         Calcule la similarité globale entre deux triplets en utilisant une approche
         générique qui détermine pour chaque composante la fonction de similarité à appliquer.
         """
-        element_types = ['subject', 'predicate', 'object']
-        sim_values = [
-            self.sim_element(orig, relax, etype)
-            for orig, relax, etype in zip(t, t_prime, element_types)
-        ]
-        return sum(sim_values) / len(sim_values)
+        return self.triple_score(t, t_prime) / len(ELEMENT_TYPES)
     
     def query_similarity(self, query, relaxed_query):
         """
@@ -146,13 +226,11 @@ class SimilarityCalculator:
         :param relaxed_query: La requête relaxée, sous forme d'une liste de triplets correspondants.
         :return: La similarité globale (une valeur entre 0 et 1) entre les deux requêtes.
         """
-        list_match=[]
         # if len(query) != len(relaxed_query):
         #     raise ValueError("Les requêtes doivent contenir le même nombre de patrons de triplet.")
-        for i in query:
-            for j in relaxed_query:
-                if i.label in j.label:
-                    list_match.append((i,j))
+        # Chaque clause relaxée est associée à la clause initiale dont elle provient
+        originals = set(query)
+        list_match = [(j.origin, j) for j in relaxed_query if j.origin in originals]
         # print(list_match)
         sim_values = [
             self.sim_triple(t.triple, t_prime.triple)
@@ -160,6 +238,20 @@ class SimilarityCalculator:
         ]
         return sum(sim_values) / len(query) if sim_values else 0
 
+    def batch_query_similarity(self, query, relaxed_queries):
+        """
+        Similarité de 'query' avec chaque requête de 'relaxed_queries' (listes
+        de clauses), calculée en lot ; même résultat que query_similarity.
+        """
+        return batch_query_similarity(self, query, relaxed_queries, per_query_clause=True)
+
+    def child_similarity(self, query, parent_score, parent, child):
+        """
+        Similarité de la requête 'child' (liste de clauses) obtenue à partir de
+        celle de 'parent' : seules les clauses modifiées sont réévaluées.
+        """
+        return delta_similarity(self, query, parent_score, parent, child)
+
     def query_similarity2(self, query, relaxed_query):
         if len(query) != len(relaxed_query):
             raise ValueError("Les requêtes doivent contenir le même nombre de patrons de triplet.")
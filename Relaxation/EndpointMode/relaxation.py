@@ -1,12 +1,22 @@
 import itertools
 import math
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
 from SPARQLWrapper import SPARQLWrapper, JSON
 from rdflib import BNode, URIRef, Literal, RDFS
 from rdflib.term import Variable
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
 from Query.SimpleLiteral import SimpleLiteral
 from Relaxation.parser import SparqlTripletParser
+from Relaxation.RankedProduct import ranked_product
+from Relaxation.RelaxationCache import RelaxationCache
+from Relaxation.SimilarityMemo import ELEMENT_TYPES
+from Relaxation.EndpointMode.SimilarityEndpoint import SimilarityCalculator as Sim
 from Relaxation.parser2 import expand_sparql
+from Relaxation.EndpointMode.EndpointEvaluator import DEFAULT_TIMEOUT, run_select, to_term
+from Relaxation.HierarchyIndex import HierarchyIndex
+from Relaxation.QueryEvaluator import QueryEvaluator
 # ---------------------------
 # Constants and Global Counters
 # ---------------------------
@@ -48,13 +58,74 @@ def similarity_measure_property(original_node, relaxed_node):
     return 0.9  # Default for superproperty or other relaxations
 
 
-def get_super_classes(uri: URIRef, endpoint: SPARQLWrapper) -> dict:
+HIERARCHY_RETRY_DELAY = 30.0  # Secondes pendant lesquelles un échec de chargement est gardé
+
+_hierarchies: Dict[str, HierarchyIndex] = {}  # URL du endpoint -> hiérarchie chargée
+_hierarchy_failures: Dict[str, Tuple[HierarchyIndex, float]] = {}  # URL -> (hiérarchie vide, date de l'échec)
+_hierarchy_locks: Dict[str, threading.Lock] = {}  # URL -> verrou de son chargement
+_hierarchies_lock = threading.Lock()  # Protège la création des verrous par endpoint
+
+def load_hierarchy(endpoint_url: str, endpoint: Optional[Union[SPARQLWrapper, QueryEvaluator]] = None) -> HierarchyIndex:
+    """
+    Hiérarchie des classes et propriétés du endpoint, chargée en une seule
+    requête au premier appel puis partagée (en lecture seule) par toutes les
+    relaxations et tous les threads. Chaque endpoint a son propre verrou : les
+    chargements de endpoints différents ne s'attendent pas. En cas d'erreur,
+    une hiérarchie vide est renvoyée, et l'est encore sans nouvelle requête
+    pendant HIERARCHY_RETRY_DELAY secondes ; l'appel suivant retente le chargement.
     """
-    Interroge le endpoint SPARQL pour récupérer les superclasses de `uri`.
+    hierarchy = _hierarchies.get(endpoint_url)
+    if hierarchy is not None:
+        return hierarchy
+    with _hierarchies_lock:
+        lock = _hierarchy_locks.setdefault(endpoint_url, threading.Lock())
+    with lock:
+        hierarchy = _hierarchies.get(endpoint_url)
+        if hierarchy is not None:
+            return hierarchy
+        failure = _hierarchy_failures.get(endpoint_url)
+        if failure is not None and time.time() - failure[1] < HIERARCHY_RETRY_DELAY:
+            return failure[0]
+        if endpoint is None:
+            endpoint = SPARQLWrapper(endpoint_url)
+            endpoint.setReturnFormat(JSON)
+            endpoint.setTimeout(int(DEFAULT_TIMEOUT))
+        try:
+            bindings = run_select(endpoint, """
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    SELECT ?child ?rel ?parent WHERE {
+      ?child ?rel ?parent .
+      FILTER(?rel IN (rdfs:subClassOf, rdfs:subPropertyOf))
+    }
+    """)
+        except Exception as e:
+            print(f"Erreur lors du chargement de la hiérarchie : {e}")
+            hierarchy = HierarchyIndex()
+            _hierarchy_failures[endpoint_url] = (hierarchy, time.time())
+            return hierarchy
+        edges = [(to_term(b["child"]), to_term(b["rel"]), to_term(b["parent"])) for b in bindings]
+        hierarchy = HierarchyIndex()
+        hierarchy.add_edges(
+            ((child, parent) for child, rel, parent in edges if rel == RDFS.subClassOf),
+            ((child, parent) for child, rel, parent in edges if rel == RDFS.subPropertyOf),
+        )
+        _hierarchies[endpoint_url] = hierarchy
+        _hierarchy_failures.pop(endpoint_url, None)
+        return hierarchy
+
+
+def get_super_classes(uri: URIRef, endpoint: Union[SPARQLWrapper, QueryEvaluator],
+                      hierarchy: Optional[HierarchyIndex] = None) -> dict:
+    """
+    Récupère les superclasses de `uri` : tous ses ancêtres, niveau = distance,
+    si la hiérarchie préchargée est fournie ; sinon le endpoint SPARQL est
+    interrogé pour les superclasses directes.
     Renvoie un dict {superclass: relaxation_level}.
     """
     if not isinstance(uri, URIRef):
         return {}
+    if hierarchy is not None:
+        return dict(hierarchy.super_classes(uri)) or {uri: 1}
 
     # Construire et exécuter la requête SPARQL
     query = f"""
@@ -63,13 +134,11 @@ def get_super_classes(uri: URIRef, endpoint: SPARQLWrapper) -> dict:
       <{uri}> rdfs:subClassOf ?sup .
     }}
     """
-    endpoint.setQuery(query)
-    endpoint.setReturnFormat(JSON)
-    results = endpoint.query().convert()
+    bindings = run_select(endpoint, query)
 
     super_classes = {}
     # Pour chaque binding, on ajoute la super-classe avec un niveau de relaxation = 1
-    for binding in results["results"]["bindings"]:
+    for binding in bindings:
         if binding["sup"]["type"] == "uri":
             # On vérifie que le type est bien une URI
             # On récupère l'URI de la super-classe
@@ -85,13 +154,18 @@ def get_super_classes(uri: URIRef, endpoint: SPARQLWrapper) -> dict:
     return super_classes
 
 
-def get_super_properties(uri: URIRef, endpoint: SPARQLWrapper) -> dict:
+def get_super_properties(uri: URIRef, endpoint: Union[SPARQLWrapper, QueryEvaluator],
+                         hierarchy: Optional[HierarchyIndex] = None) -> dict:
     """
-    Interroge le endpoint SPARQL pour récupérer les superproperties de `uri`.
+    Récupère les superpropriétés de `uri` : tous ses ancêtres, niveau = distance,
+    si la hiérarchie préchargée est fournie ; sinon le endpoint SPARQL est
+    interrogé pour les superpropriétés directes.
     Renvoie un dict {superproperty: relaxation_level}.
     """
     if not isinstance(uri, URIRef):
         return {}
+    if hierarchy is not None:
+        return dict(hierarchy.super_properties(uri)) or {uri: 1}
 
     query = f"""
     PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
@@ -99,12 +173,10 @@ def get_super_properties(uri: URIRef, endpoint: SPARQLWrapper) -> dict:
       <{uri}> rdfs:subPropertyOf ?sup .
     }}
     """
-    endpoint.setQuery(query)
-    endpoint.setReturnFormat(JSON)
-    results = endpoint.query().convert()
+    bindings = run_select(endpoint, query)
 
     super_properties = {}
-    for binding in results["results"]["bindings"]:
+    for binding in bindings:
         sup_uri = binding["sup"]["value"]
         super_properties[URIRef(sup_uri)] = 1
 
@@ -118,6 +190,8 @@ def get_super_properties(uri: URIRef, endpoint: SPARQLWrapper) -> dict:
 # Relaxed Node Class
 # ---------------------------
 class NodeRelaxed:
+    __slots__ = ("node_1", "node_2", "node_3", "similarity", "relaxation_levels", "_query")
+
     def __init__(self, node_1, node_2, node_3, similarity, relaxation_levels):
         """
         node_1: subject
@@ -129,11 +203,21 @@ class NodeRelaxed:
         self.node_1 = node_1
         self.node_2 = node_2
         self.node_3 = node_3
-        self.query=ConjunctiveQuery()
-        self.query.add_clause(SimpleLiteral((self.node_1,self.node_2,self.node_3)))
+        self._query = None
         self.similarity = similarity
         self.relaxation_levels = relaxation_levels
 
+    @property
+    def query(self):
+        """
+        Single-clause query of the relaxed triple, built on first access: the
+        partial relaxations combined by merge() never need one.
+        """
+        if self._query is None:
+            self._query = ConjunctiveQuery()
+            self._query.add_clause(SimpleLiteral((self.node_1, self.node_2, self.node_3)))
+        return self._query
+
     @staticmethod
     def merge(relax_s, relax_p, relax_o):
         """
@@ -154,15 +238,22 @@ class NodeRelaxed:
 # Triple Relaxation Class
 # ---------------------------
 class TripleRelaxation:
-    def __init__(self, clause, graph:str, order=SIM_ORDER):
+    def __init__(self, clause, graph:str, order=SIM_ORDER, evaluator: Optional[QueryEvaluator] = None,
+                 hierarchy: Optional[HierarchyIndex] = None, max_depth: Optional[int] = None):
         """
         clause: RDF triple as a tuple (subject, predicate, object) using rdflib.
-        graph: RDF graph (rdflib.Graph).
+        graph: SPARQL endpoint URL.
         order: Relaxation order (SIM_ORDER by default).
+        evaluator: Shared evaluator (persistent HTTP session) used to load the hierarchy.
+        hierarchy: Class/property hierarchy (by default, the one loaded once per endpoint):
+                   relaxing a clause then sends no request.
+        max_depth: Keep only the ancestors at most max_depth levels up (None: all of them);
+                   a node is replaced by a variable only once no ancestor is left out.
         """
         global num_resource_release, num_pred_release
-        self.graph = SPARQLWrapper(graph)  # Changed from session to graph for clarity
-        self.graph.setReturnFormat(JSON)
+        self.graph = evaluator if evaluator is not None else graph
+        self.hierarchy = hierarchy or load_hierarchy(graph, evaluator)
+        self.max_depth = max_depth
         self.current_clause = clause
         self.relaxation_order = order
         self.subject_var = None
@@ -176,6 +267,12 @@ class TripleRelaxation:
 
         self.triple_relaxation(clause)
 
+    def within_depth(self, ancestors):
+        """Ancestors {node: level} no more than max_depth levels up."""
+        if self.max_depth is None:
+            return ancestors
+        return {node: level for node, level in ancestors.items() if level <= self.max_depth}
+
     def relax_node(self, original_node):
         """
         Relax a node (subject or object), handling both URIRef and Literal.
@@ -185,11 +282,14 @@ class TripleRelaxation:
         relaxed_node = {}
         if isinstance(original_node, URIRef):
             relaxed_node[original_node] = 0  # Keep original
-            relaxed_node.update(get_super_classes(original_node, self.graph))  # Add superclasses
-            var_name = f"R{num_resource_release}"
-            num_resource_release += 1
-            var_node = Variable(var_name)
-            relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
+            ancestors = get_super_classes(original_node, self.graph, self.hierarchy)
+            kept = self.within_depth(ancestors)
+            relaxed_node.update(kept)  # Add superclasses
+            if len(kept) == len(ancestors):  # The variable comes once the hierarchy is exhausted
+                var_name = f"R{num_resource_release}"
+                num_resource_release += 1
+                var_node = Variable(var_name)
+                relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
         elif isinstance(original_node, Literal):
             relaxed_node[original_node] = 0  # Keep original
             var_name = f"R{num_resource_release}"
@@ -209,11 +309,14 @@ class TripleRelaxation:
         relaxed_node = {}
         if isinstance(original_node, URIRef):
             relaxed_node[original_node] = 0  # Keep original
-            relaxed_node.update(get_super_properties(original_node, self.graph))  # Add superproperties
-            var_name = f"P{num_pred_release}"
-            num_pred_release += 1
-            var_node = Variable(var_name)
-            relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
+            ancestors = get_super_properties(original_node, self.graph, self.hierarchy)
+            kept = self.within_depth(ancestors)
+            relaxed_node.update(kept)  # Add superproperties
+            if len(kept) == len(ancestors):  # The variable comes once the hierarchy is exhausted
+                var_name = f"P{num_pred_release}"
+                num_pred_release += 1
+                var_node = Variable(var_name)
+                relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
         elif isinstance(original_node, Literal):
             relaxed_node[original_node] = 0  # Keep original
             var_name = f"P{num_pred_release}"
@@ -286,7 +389,9 @@ class TripleRelaxation:
         self.current_elt = 1
 
 class ConjunctiveQueryRelaxation:
-    def __init__(self, query: ConjunctiveQuery, graph:str, order=SIM_ORDER):
+    def __init__(self, query: ConjunctiveQuery, graph:str, order=SIM_ORDER,
+                 evaluator: Optional[QueryEvaluator] = None, hierarchy: Optional[HierarchyIndex] = None,
+                 cache: Optional[RelaxationCache] = None, max_depth: Optional[int] = None):
         """
         Initialise la relaxation d'une requête conjonctive.
         
@@ -294,47 +399,122 @@ class ConjunctiveQueryRelaxation:
             query (ConjunctiveQuery): La requête initiale contenant plusieurs clauses.
             graph (Graph): La base de données RDF (un rdflib.Graph).
             order (int): L'ordre de relaxation (par défaut SIM_ORDER).
+            evaluator (QueryEvaluator): Évaluateur partagé pour les requêtes de schéma.
+            hierarchy (HierarchyIndex): Hiérarchie des classes et propriétés (par défaut,
+                                        celle chargée une fois pour le endpoint).
+            cache (RelaxationCache): Relaxations des triplets partagées entre plusieurs
+                                     requêtes (par exemple par les producteurs de ParallelXBS).
+            max_depth (int): Niveaux de hiérarchie remontés en une relaxation (None : tous) ;
+                             une clause déjà relaxée peut l'être de nouveau pour monter plus haut.
         """
         self.query = query
         self.graph = graph
         self.order = order
+        self.evaluator = evaluator
+        self.hierarchy = hierarchy
+        self.cache = cache
+        self.max_depth = max_depth
 
-    def relax_query(self):
+    def triple_alternatives(self, clause):
         """
-        Génère des versions relaxées de la requête conjonctive en relaxant chacune de ses clauses.
-        
+        Versions relaxées du triplet de 'clause', dans l'ordre de TripleRelaxation.
+
         Returns:
-            list: Liste des requêtes (ConjunctiveQuery) relaxées.
+            list: Des tuples (triplet relaxé, niveaux de relaxation, similarité).
+        """
+        triple_relax = TripleRelaxation(clause, self.graph, order=self.order, evaluator=self.evaluator,
+                                       hierarchy=self.hierarchy, max_depth=self.max_depth)
+        alternatives = []
+        while triple_relax.has_next():
+            relaxed_triple = triple_relax.next_relaxed_triple()
+            alternatives.append((
+                (relaxed_triple.node_1, relaxed_triple.node_2, relaxed_triple.node_3),
+                tuple(relaxed_triple.relaxation_levels),
+                relaxed_triple.similarity,
+            ))
+        return alternatives
+
+    def relaxed_clauses(self):
+        """
+        Versions relaxées de chacune des clauses de la requête. Avec un cache,
+        un triplet déjà relaxé (pour une autre requête) n'est pas relaxé de
+        nouveau : seules ses clauses relaxées sont recréées.
+
+        Returns:
+            list: Pour chaque clause, la liste de ses versions relaxées.
         """
         # Pour chaque clause de la requête, on récupère la liste des clauses relaxées
         relaxed_versions_per_clause = []
         for clause in self.query.clauses:
-            num=0
-            # On crée une instance de TripleRelaxation pour la clause
-            triple_relax = TripleRelaxation(clause, self.graph, order=self.order)
+            if self.cache is not None:
+                alternatives = self.cache.alternatives((clause.code, self.order, self.max_depth),
+                                                       lambda: self.triple_alternatives(clause))
+            else:
+                alternatives = self.triple_alternatives(clause)
             # Liste des versions relaxées pour cette clause
             relaxed_clause_list = []
-            while triple_relax.has_next():
-                relaxed_triple = triple_relax.next_relaxed_triple()
-                # On suppose que relaxed_triple.query.clauses[0] contient la clause relaxée
-                relaxed_clause = relaxed_triple.query.clauses[0]
-                relaxed_clause.set_label(clause.label,num)
-                num+=1
+            for num, (triple, _levels, _similarity) in enumerate(alternatives):
+                # Une nouvelle clause par requête : la provenance est propre à chaque clause
+                relaxed_clause = SimpleLiteral(triple)
+                relaxed_clause.set_origin(clause, num)
                 relaxed_clause_list.append(relaxed_clause)
             # Si aucune version relaxée n'a été générée pour une clause, on garde la clause originale
             if not relaxed_clause_list:
                 relaxed_clause_list.append(clause)
             relaxed_versions_per_clause.append(relaxed_clause_list)
+        return relaxed_versions_per_clause
+
+    def relax_query(self):
+        """
+        Génère des versions relaxées de la requête conjonctive en relaxant chacune de ses clauses.
         
+        Returns:
+            list: Liste des requêtes (ConjunctiveQuery) relaxées.
+        """
         # Combiner les relaxations de toutes les clauses par produit cartésien
         all_relaxed_queries = []
-        for combination in itertools.product(*relaxed_versions_per_clause):
+        for combination in itertools.product(*self.relaxed_clauses()):
             new_query = ConjunctiveQuery()
             for clause in combination:
                 new_query.add_clause(clause)
             all_relaxed_queries.append(new_query)
         
         return all_relaxed_queries
+
+    def iter_relaxed_queries(self, similarity=None, accept=None):
+        """
+        Énumère les versions relaxées par similarité décroissante, sans
+        construire le produit cartésien : les versions de chaque clause sont
+        triées par similarité avec leur clause d'origine, puis les combinaisons
+        sont produites à la demande (voir ranked_product). Le consommateur peut
+        s'arrêter dès qu'il a obtenu assez de réponses.
+
+        Args:
+            similarity: Calculateur fournissant triple_score (par défaut, celui de self.graph).
+            accept (callable): Filtre optionnel des versions produites, par exemple
+                               self.is_relaxed_version_valid. Les versions refusées
+                               sont tout de même construites puis écartées.
+
+        Yields:
+            tuple: (similarité, ConjunctiveQuery), la similarité étant la moyenne
+                   des similarités de ses clauses avec leurs clauses d'origine.
+        """
+        similarity = similarity or Sim(self.graph, self.evaluator)
+        ranked_lists = [
+            sorted(
+                ((similarity.triple_score(c.origin.triple, c.triple), c) for c in clauses),
+                key=lambda scored: -scored[0],
+            )
+            for clauses in self.relaxed_clauses()
+        ]
+        norm = len(ranked_lists) * len(ELEMENT_TYPES)
+        for total, combination in ranked_product(ranked_lists):
+            new_query = ConjunctiveQuery()
+            for clause in combination:
+                new_query.add_clause(clause)
+            if accept is None or accept(new_query):
+                yield total / norm, new_query
+
     # @staticmethod
     def is_relaxed_version_valid(self, relaxed_query: ConjunctiveQuery) -> bool:
         """
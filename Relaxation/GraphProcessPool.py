@@ -0,0 +1,211 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from rdflib import Graph, Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation import relaxtools
+from Relaxation.QueryEvaluator import GraphEvaluator
+from Relaxation.RelaxationCache import RelaxationCache
+
+class GraphProcessPool:
+    """
+    Pool de processus pour la relaxation et l'évaluation en mémoire, qui sont
+    du Python pur limité par le GIL : les threads n'utilisent qu'un cœur.
+
+    Les processus sont créés par fork et reçoivent le graphe rdflib par
+    l'initialiseur du pool (copie à l'écriture, sans sérialisation).
+    Sans fork (Windows, macOS par défaut), available() est faux et les
+    stratégies restent sur leurs threads.
+
+    Les requêtes et leurs relaxations circulent sous forme de triplets ; les
+    clauses (et leur provenance) sont recréées dans le processus principal.
+    """
+
+    _pools = weakref.WeakKeyDictionary()  # graphe -> pool partagé, créé par for_graph
+    _lock = threading.Lock()
+
+    def __init__(self, graph: Graph, processes: int):
+        """
+        :param graph: Graphe partagé par les processus.
+        :param processes: Nombre de processus.
+        """
+        self.graph = graph
+        self.processes = processes
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.size = 0  # Taille du graphe copié dans les processus au démarrage
+        self.timeouts = 0  # Évaluations interrompues par leur délai dans les processus
+
+    @staticmethod
+    def available() -> bool:
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    @classmethod
+    def for_graph(cls, graph: Graph, processes: int) -> Optional["GraphProcessPool"]:
+        """
+        Pool partagé de 'graph' (GraphEvaluator.not_k_completed_many), réutilisé
+        tant qu'il a 'processes' processus et que le graphe n'a pas changé de
+        taille depuis son démarrage (ses processus en ont une copie) ; sinon il
+        est arrêté et remplacé. Les pools restants sont arrêtés à la fin du
+        programme. None sans fork.
+
+        Un fork pendant qu'un autre thread tient un verrou le laisserait verrouillé
+        dans le fils : hors du thread principal, aucun pool n'est démarré et None
+        est renvoyé si le pool partagé n'est pas utilisable (évaluation séquentielle).
+        Pour en profiter depuis des threads, l'appeler avant de les lancer.
+        """
+        if not cls.available():
+            return None
+        with cls._lock:
+            pool = cls._pools.get(graph)
+            if pool is not None and pool.pool is not None and pool.processes == processes \
+                    and pool.size == len(graph):
+                return pool
+            if threading.current_thread() is not threading.main_thread():
+                return None
+            if pool is not None:
+                # Les évaluations déjà envoyées à l'ancien pool se terminent
+                pool.shutdown(wait=False)
+            pool = cls._pools[graph] = cls(graph, processes)
+            pool.start()
+            return pool
+
+    def start(self):
+        """
+        Crée les processus. Avec fork, ils le sont tous au premier envoi : on le
+        provoque ici, avant que la stratégie ne lance ses threads (un fork pendant
+        qu'un autre thread tient un verrou le laisserait verrouillé dans le fils).
+        """
+        if self.pool is None:
+            self.size = len(self.graph)
+            self.pool = ProcessPoolExecutor(max_workers=self.processes,
+                                            mp_context=multiprocessing.get_context("fork"),
+                                            initializer=_init_worker, initargs=(self.graph,))
+            self.pool.submit(os.getpid).result()
+
+    def shutdown(self, wait: bool = True):
+        if self.pool is not None:
+            if wait:
+                self.pool.shutdown(cancel_futures=True)
+            else:
+                self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def __enter__(self) -> "GraphProcessPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    @classmethod
+    def shutdown_all(cls):
+        """Arrête les pools partagés (for_graph) ; appelée à la fin du programme."""
+        with cls._lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.shutdown()
+
+    def relax(self, query: ConjunctiveQuery, max_depth: Optional[int] = None,
+              all_relaxed: bool = False) -> List[ConjunctiveQuery]:
+        """
+        Versions relaxées de 'query' calculées dans un processus du pool, sans la
+        version identique à 'query' ; si all_relaxed, seulement celles dont toutes
+        les clauses sont relaxées (ConjunctiveQueryRelaxation.is_relaxed_version_valid).
+        """
+        triples = [clause.triple for clause in query.clauses]
+        versions = self.pool.submit(_relax, triples, max_depth, all_relaxed).result()
+        return self.rebuild(query, versions)
+
+    @staticmethod
+    def rebuild(query: ConjunctiveQuery, versions: Sequence[Sequence]) -> List[ConjunctiveQuery]:
+        """
+        Recrée les requêtes relaxées renvoyées par un processus : la j-ième clause
+        d'une version relaxe la j-ième clause de 'query'. Les variables fraîches du
+        processus sont renommées avec les compteurs du processus principal.
+        """
+        known = {var for clause in query.clauses for var in clause.triple if isinstance(var, Variable)}
+        fresh: Dict[Variable, Variable] = {}
+        relaxed_queries = []
+        for version in versions:
+            relaxed_query = ConjunctiveQuery()
+            for clause, (triple, variant) in zip(query.clauses, version):
+                triple = tuple(_rename(term, known, fresh) for term in triple)
+                relaxed_clause = SimpleLiteral(triple)
+                relaxed_clause.set_origin(clause, variant)
+                relaxed_query.add_clause(relaxed_clause)
+            relaxed_queries.append(relaxed_query)
+        return relaxed_queries
+
+    def bindings_many(self, queries: Sequence[ConjunctiveQuery], limit: Optional[int] = None,
+                      timeout: Optional[float] = None) -> List[List[Dict]]:
+        """Solutions de requêtes indépendantes, évaluées en parallèle ; l'ordre de 'queries' est conservé."""
+        futures: List[Future] = [self.pool.submit(_bindings, query.to_sparql(), limit, timeout) for query in queries]
+        rows = []
+        for future in futures:
+            solutions, timeouts = future.result()
+            self.timeouts += timeouts
+            rows.append(solutions)
+        return rows
+
+    def not_k_completed_many(self, query_strs: Sequence[str], k: int = 0) -> List[bool]:
+        """not_k_completed de requêtes indépendantes, évaluées en parallèle ; l'ordre de 'query_strs' est conservé."""
+        return [future.result() for future in [self.pool.submit(_not_k_completed, q, k) for q in query_strs]]
+
+    def __repr__(self) -> str:
+        return f"<GraphProcessPool | Processes: {self.processes}, Started: {self.pool is not None}>"
+
+
+def _rename(term, known, fresh):
+    """Variable fraîche d'un processus -> variable fraîche du processus principal."""
+    if not isinstance(term, Variable) or term in known:
+        return term
+    if term not in fresh:
+        with _rename_lock:
+            if str(term).startswith("P"):
+                fresh[term] = Variable(f"P{relaxtools.num_pred_release}")
+                relaxtools.num_pred_release += 1
+            else:
+                fresh[term] = Variable(f"R{relaxtools.num_resource_release}")
+                relaxtools.num_resource_release += 1
+    return fresh[term]
+
+_rename_lock = threading.Lock()  # Plusieurs threads du producteur recréent des requêtes en parallèle
+
+atexit.register(GraphProcessPool.shutdown_all)
+
+
+# État propre à chaque processus du pool
+_graph: Optional[Graph] = None
+_relaxations: Optional[RelaxationCache] = None
+
+def _init_worker(graph: Graph):
+    global _graph, _relaxations
+    _graph = graph
+    _relaxations = RelaxationCache()
+    # Variables fraîches disjointes de celles du parent et des autres processus
+    relaxtools.num_resource_release = relaxtools.num_pred_release = os.getpid() << 32
+
+def _relax(triples, max_depth, all_relaxed):
+    query = ConjunctiveQuery()
+    for triple in triples:
+        query.add_clause(SimpleLiteral(triple))
+    cqr = relaxtools.ConjunctiveQueryRelaxation(query, _graph, order=1, cache=_relaxations, max_depth=max_depth)
+    versions = cqr.relax_query()
+    if all_relaxed:
+        versions = [version for version in versions if cqr.is_relaxed_version_valid(version)]
+    else:
+        versions = versions[1:]  # La première version est la requête elle-même
+    return [[(clause.triple, clause.variant) for clause in version.clauses] for version in versions]
+
+def _bindings(query_str: str, limit: Optional[int], timeout: Optional[float]):
+    evaluator = GraphEvaluator(_graph)
+    return evaluator.bindings(query_str, limit, timeout), evaluator.timeouts
+
+def _not_k_completed(query_str: str, k: int) -> bool:
+    return GraphEvaluator(_graph).not_k_completed(query_str, k)
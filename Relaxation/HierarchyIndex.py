@@ -0,0 +1,98 @@
+import threading
+import weakref
+from collections import defaultdict, deque
+from typing import Dict, Iterable, Optional, Set, Tuple
+from rdflib import RDFS, Graph, URIRef
+
+class HierarchyIndex:
+    """
+    Fermeture transitive des hiérarchies rdfs:subClassOf et rdfs:subPropertyOf.
+
+    Les arcs sont lus une seule fois (dans le graphe de données et/ou une
+    ontologie comme Experimentation/univ-bench.owl) ; les ancêtres de chaque
+    classe et de chaque propriété sont ensuite précalculés avec leur distance
+    (1 pour un parent direct, 2 pour un grand-parent, ...). Une recherche
+    d'ancêtres est alors un simple accès à un dictionnaire.
+    """
+
+    _indexes = weakref.WeakKeyDictionary()  # graphe -> index construit par for_graph
+    _lock = threading.Lock()
+
+    def __init__(self, graph: Optional[Graph] = None):
+        """
+        :param graph: Graphe (données ou ontologie) dont la hiérarchie est indexée.
+        """
+        self.class_parents: Dict[URIRef, Set[URIRef]] = defaultdict(set)
+        self.property_parents: Dict[URIRef, Set[URIRef]] = defaultdict(set)
+        self.class_ancestors: Dict[URIRef, Dict[URIRef, int]] = {}
+        self.property_ancestors: Dict[URIRef, Dict[URIRef, int]] = {}
+        if graph is not None:
+            self.add_graph(graph)
+
+    @classmethod
+    def from_file(cls, path: str, format: Optional[str] = None) -> "HierarchyIndex":
+        """Index de la hiérarchie décrite dans un fichier d'ontologie (ex. univ-bench.owl)."""
+        ontology = Graph()
+        ontology.parse(path, format=format)
+        return cls(ontology)
+
+    @classmethod
+    def for_graph(cls, graph: Graph) -> "HierarchyIndex":
+        """
+        Index partagé de 'graph', construit au premier appel. Les relaxations
+        successives d'un même graphe ne relisent donc pas sa hiérarchie.
+        """
+        with cls._lock:
+            index = cls._indexes.get(graph)
+            if index is None:
+                index = cls._indexes[graph] = cls(graph)
+            return index
+
+    def add_graph(self, graph: Graph):
+        """Ajoute les arcs de hiérarchie de 'graph' et recalcule les fermetures."""
+        self.add_edges(
+            ((child, parent) for child, _, parent in graph.triples((None, RDFS.subClassOf, None))),
+            ((child, parent) for child, _, parent in graph.triples((None, RDFS.subPropertyOf, None))),
+        )
+
+    def add_edges(self, class_edges: Iterable[Tuple], property_edges: Iterable[Tuple]):
+        """
+        Ajoute des arcs (enfant, parent) déjà extraits, par exemple d'un
+        endpoint SPARQL, et recalcule les fermetures.
+        """
+        for child, parent in class_edges:
+            if child != parent:
+                self.class_parents[child].add(parent)
+        for child, parent in property_edges:
+            if child != parent:
+                self.property_parents[child].add(parent)
+        self.class_ancestors = self._closure(self.class_parents)
+        self.property_ancestors = self._closure(self.property_parents)
+
+    @staticmethod
+    def _closure(parents: Dict[URIRef, Set[URIRef]]) -> Dict[URIRef, Dict[URIRef, int]]:
+        """Pour chaque noeud, ses ancêtres et la longueur du plus court chemin qui y mène."""
+        closure = {}
+        for node in parents:
+            distances = {}
+            frontier = deque((parent, 1) for parent in parents[node])
+            while frontier:
+                ancestor, depth = frontier.popleft()
+                if ancestor in distances or ancestor == node:
+                    continue
+                distances[ancestor] = depth
+                frontier.extend((parent, depth + 1) for parent in parents.get(ancestor, ()))
+            closure[node] = distances
+        return closure
+
+    def super_classes(self, uri: URIRef) -> Dict[URIRef, int]:
+        """Ancêtres de la classe 'uri' avec leur distance ({} si elle n'en a pas)."""
+        return self.class_ancestors.get(uri, {})
+
+    def super_properties(self, uri: URIRef) -> Dict[URIRef, int]:
+        """Ancêtres de la propriété 'uri' avec leur distance ({} si elle n'en a pas)."""
+        return self.property_ancestors.get(uri, {})
+
+    def __repr__(self) -> str:
+        return (f"<HierarchyIndex | Classes: {len(self.class_ancestors)}, "
+                f"Properties: {len(self.property_ancestors)}>")
@@ -0,0 +1,87 @@
+from typing import Dict, Iterator, List
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+
+def _bits(mask: int) -> Iterator[int]:
+    """Positions des bits à 1 de 'mask', par ordre croissant."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def minimal_hitting_sets(sets: List[int]) -> Iterator[int]:
+    """
+    Énumère les ensembles minimaux intersectant chacun des ensembles de 'sets'
+    (algorithme MMCS sur des masques de bits). Chaque ensemble minimal est
+    produit exactement une fois, au fur et à mesure de son calcul.
+
+    :param sets: Les ensembles à intersecter, codés en masques de bits.
+    :return: Un générateur de masques de bits.
+    """
+    if any(s == 0 for s in sets):
+        return
+    edges_of: Dict[int, int] = {}
+    for i, s in enumerate(sets):
+        for e in _bits(s):
+            edges_of[e] = edges_of.get(e, 0) | (1 << i)
+
+    def search(chosen: List[int], cand: int, crit: Dict[int, int], uncov: int) -> Iterator[int]:
+        if not uncov:
+            mask = 0
+            for e in chosen:
+                mask |= 1 << e
+            yield mask
+            return
+        # L'ensemble non couvert ayant le moins de candidats limite le branchement
+        best = min(_bits(uncov), key=lambda i: bin(sets[i] & cand).count("1"))
+        branch = sets[best] & cand
+        cand &= ~branch
+        for e in _bits(branch):
+            hit = edges_of[e]
+            new_crit = {f: c & ~hit for f, c in crit.items()}
+            # Minimalité : chaque élément déjà choisi doit rester seul à couvrir un ensemble
+            if all(new_crit[f] for f in chosen):
+                new_crit[e] = uncov & hit
+                yield from search(chosen + [e], cand, new_crit, uncov & ~hit)
+            cand |= 1 << e
+
+    all_edges = (1 << len(sets)) - 1
+    all_elements = 0
+    for s in sets:
+        all_elements |= s
+    yield from search([], all_elements, {}, all_edges)
+
+def iter_minimal_hitting_sets(queries: List[ConjunctiveQuery]) -> Iterator[ConjunctiveQuery]:
+    """
+    Pour une liste de requêtes (typiquement les MFS), produit chaque ensemble
+    minimal de clauses qui contient au moins une clause de chaque requête.
+    """
+    clauses = []
+    index = {}
+    for q in queries:
+        for clause in q.clauses:
+            if clause not in index:
+                index[clause] = len(clauses)
+                clauses.append(clause)
+    sets = []
+    for q in queries:
+        mask = 0
+        for clause in q.clauses:
+            mask |= 1 << index[clause]
+        sets.append(mask)
+    for mask in minimal_hitting_sets(sets):
+        q = ConjunctiveQuery()
+        q.clauses = [clauses[i] for i in _bits(mask)]
+        yield q
+
+def iter_xss(main_query: ConjunctiveQuery, mfs_list: List[ConjunctiveQuery]) -> Iterator[ConjunctiveQuery]:
+    """
+    Produit les XSS de 'main_query' à partir de ses MFS : chaque XSS est le
+    complémentaire d'un ensemble minimal intersectant toutes les MFS. Les XSS
+    sont donc toutes maximales et produites une seule fois.
+    """
+    for hitting_set in iter_minimal_hitting_sets(mfs_list):
+        removed = set(hitting_set.clauses)
+        xss = ConjunctiveQuery()
+        xss.clauses = [clause for clause in main_query.clauses if clause not in removed]
+        xss.selected_vars = main_query.selected_vars.copy()
+        yield xss
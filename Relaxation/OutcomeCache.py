@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+from typing import Optional, Tuple
+from Query.CanonicalForm import canonical_form
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+
+class OutcomeCache:
+    """
+    Cache persistant (SQLite) du résultat des sous-requêtes, partagé entre les
+    requêtes utilisateur. Une sous-requête est identifiée par la forme
+    canonique de ses triplets, indépendante du nom des variables, et par le
+    jeu de données interrogé.
+
+    Pour chaque sous-requête on conserve un encadrement du nombre de
+    solutions [min_count, max_count], ce qui permet de répondre pour tout k :
+    la sous-requête échoue si max_count <= k et réussit si min_count > k.
+    """
+
+    def __init__(self, path: str, dataset: str):
+        """
+        :param path: Fichier SQLite (":memory:" pour un cache non persistant).
+        :param dataset: Identifiant du graphe ou de l'endpoint (ex. URL du endpoint).
+        """
+        self.path = path
+        self.dataset = dataset
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS outcomes (
+                dataset TEXT NOT NULL,
+                pattern TEXT NOT NULL,
+                min_count INTEGER NOT NULL,
+                max_count INTEGER,
+                PRIMARY KEY (dataset, pattern)
+            )"""
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(query: ConjunctiveQuery) -> str:
+        """
+        Forme canonique du motif de la sous-requête, où toutes les variables sont
+        renommables, projetées comprises : sans DISTINCT, le nombre de solutions
+        ne dépend pas de la projection. La clé est donc plus large que
+        ConjunctiveQuery.canonical_key(), qui fixe les variables projetées parce
+        qu'elles déterminent les réponses elles-mêmes.
+        """
+        key = canonical_form(clause.triple for clause in query.clauses)
+        if query.filters:
+            key += " FILTER " + " ".join(sorted(flt.filter_expr for flt in query.filters))
+        return key
+
+    def bounds(self, query: ConjunctiveQuery) -> Optional[Tuple[int, Optional[int]]]:
+        """Encadrement (min_count, max_count) connu pour 'query', ou None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT min_count, max_count FROM outcomes WHERE dataset = ? AND pattern = ?",
+                (self.dataset, self.key(query)),
+            ).fetchone()
+        return row
+
+    def lookup(self, query: ConjunctiveQuery, k: int = 0) -> Optional[bool]:
+        """
+        Retourne True si 'query' est connue pour échouer (au plus k solutions),
+        False si elle est connue pour réussir, None si le cache ne permet pas de conclure.
+        """
+        row = self.bounds(query)
+        if row is not None:
+            min_count, max_count = row
+            if max_count is not None and max_count <= k:
+                self.hits += 1
+                return True
+            if min_count > k:
+                self.hits += 1
+                return False
+        self.misses += 1
+        return None
+
+    def record_count(self, query: ConjunctiveQuery, min_count: int, max_count: Optional[int]):
+        """Resserre l'encadrement du nombre de solutions de 'query'."""
+        pattern = self.key(query)
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT min_count, max_count FROM outcomes WHERE dataset = ? AND pattern = ?",
+                (self.dataset, pattern),
+            ).fetchone()
+            if row is not None:
+                min_count = max(min_count, row[0])
+                if row[1] is not None:
+                    max_count = row[1] if max_count is None else min(max_count, row[1])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO outcomes (dataset, pattern, min_count, max_count) VALUES (?, ?, ?, ?)",
+                (self.dataset, pattern, min_count, max_count),
+            )
+            self.conn.commit()
+
+    def store(self, query: ConjunctiveQuery, failed: bool, k: int = 0):
+        """Enregistre le résultat d'un test 'au plus k solutions'."""
+        if failed:
+            self.record_count(query, 0, k)
+        else:
+            self.record_count(query, k + 1, None)
+
+    def close(self):
+        self.conn.close()
+
+    def __repr__(self) -> str:
+        return f"<OutcomeCache {self.path} | Dataset: {self.dataset}, Hits: {self.hits}, Misses: {self.misses}>"
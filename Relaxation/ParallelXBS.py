@@ -1,11 +1,23 @@
 import threading
-from queue import PriorityQueue, Queue
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from typing import Callable, Iterable, Iterator, List, Optional
 from rdflib import Graph, URIRef, Literal, RDFS, Variable
 from Query.ConjunctiveQueryClause import ConjunctiveQuery as Query
 from Query.SimpleLiteral import SimpleLiteral
+from Query.ClauseUniverse import ClauseUniverse
 from Relaxation.XSSGenerator import XSSGenerator
+from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.QueryEvaluator import GraphEvaluator
 from Relaxation.relaxtools import ConjunctiveQueryRelaxation, TripleRelaxation
+from Relaxation.RelaxationCache import RelaxationCache
+from Relaxation.RankedProduct import started
+from Relaxation.CandidateFrontier import CandidateFrontier
+from Relaxation.RoundBudget import RoundBudget
+from Relaxation.RunBudget import RunBudget
+from Relaxation.AnswerSet import Answer, AnswerSet
+from Relaxation.GraphProcessPool import GraphProcessPool
 import itertools
 from Relaxation.similarite import SimilarityCalculator as sim
 import time
@@ -17,12 +29,17 @@ SUPPRESS_NODE_LEVEL = -1    # Relaxation level for node suppression
 LEVEL_ORDER = 0             # Relaxation order by level
 SIM_ORDER = 1               # Relaxation order by similarity
 HYBRID_ORDER = 2            # Hybrid relaxation order
+SCORE_CHUNK = 64            # Relaxations of a candidate scored together by the producer
 
 num_resource_release = 0    # Counter for resource variables
 num_pred_release = 0        # Counter for predicate variables
 
 class ParallelRelaxationStrategy:
-    def __init__(self, Q: Query, D: Graph, k: int):
+    def __init__(self, Q: Query, D: Graph, k: int, cache: Optional[OutcomeCache] = None,
+                 max_workers: Optional[int] = None, frontier_size: int = 1024,
+                 budget: Optional[RoundBudget] = None, processes: Optional[int] = None,
+                 run_budget: Optional[RunBudget] = None,
+                 on_answer: Optional[Callable[[Answer], None]] = None):
         """
         Constructor for the parallel relaxation strategy.
         
@@ -30,126 +47,288 @@ class ParallelRelaxationStrategy:
             Q (Query): The initial conjunctive query.
             D (Graph): The RDF database (an rdflib.Graph).
             k (int): Minimum number of results required for a repaired query.
+            cache (OutcomeCache): Optional persistent cache of sub-query outcomes.
+            max_workers (int): Size of the worker pool relaxing candidates
+                (None: the ThreadPoolExecutor default).
+            frontier_size (int): Maximum number of relaxed candidates waiting for the
+                consumer; a full frontier pauses the producer (0: unbounded).
+            budget (RoundBudget): Number of relaxation rounds and per-round budgets
+                (executions, time, candidates produced).
+            processes (int): Number of forked processes sharing D that relax (and, for
+                this strategy, evaluate) the candidates; None keeps everything in threads.
+            run_budget (RunBudget): Wall time, query executions and per-query timeout of
+                the whole run; once spent, the answers found so far are kept and
+                'partial' is set.
+            on_answer (callable): Called with each new Answer (binding, repaired query,
+                similarity) as soon as it is found, from the consumer thread.
         """
         self.Q = Q
         self.D = D
         self.k = k
-        self.Res = []     # List of responses (results)
+        self.cache = cache
+        self.evaluator = GraphEvaluator(D)  # Early-terminating evaluation on D
+        self.answers = AnswerSet(k, Q.selected_vars, on_answer)  # Distinct answers, hashed keys
+        self.Res = self.answers.bindings     # List of responses (results)
         self.Req = []     # List of repaired queries (results)
         self.E = Queue()         # Queue of candidates from Delta (tuples (Q - x, x))
-        self.Cand = PriorityQueue()      # Queue of relaxed candidates
+        self.max_workers = max_workers
+        self.Cand = CandidateFrontier(frontier_size)  # Bounded frontier of relaxed candidates
+        self.budget = budget or RoundBudget()
+        self.run_budget = run_budget or RunBudget()
+        self.partial = False  # The run budget ran out (or an evaluation timed out) before k answers
+        self.round = 0  # Current relaxation round (0: relaxation of the delta candidates)
+        self.round_start = 0.0  # Start time of the current round
+        self.round_executions = 0  # Query executions before the current round
+        self.processes = processes
+        self.process_pool: Optional[GraphProcessPool] = None  # Started for the duration of a run
         self.counter = itertools.count()  # Global counter
+        self.seen = set()  # Canonical keys of the candidate queries already queued
+        self.relaxations = RelaxationCache()  # Relaxed alternatives per triple, shared by the producers
         self.similarity = sim(D)
         self.query_exec_count = 0  # Counter for query executions
         self.execution_time = 0.0  # Total execution time
 
-    def delta(self) -> list:
+    def delta(self) -> Iterator[tuple]:
         """
         Extract candidate elements (δ) from the query Q.
-        For each candidate clause x, compute the query Q without x.
+        For each XSS x of Q, the candidate is the query Q without x.
         
+        Yields:
+            tuple: (Q - x, x), as soon as the analysis has tested x.
+        """
+        # MFS/XSS analysis within the run budget: each sub-query is bounded by the
+        # per-query timeout and charged to the run; a cut analysis makes it partial
+        lattice = QueryFailureAnalyzer.lattice(self.Q, self.evaluator, cache=self.cache,
+                                               budget=self.run_budget, executions=self.query_exec_count)
+        try:
+            # Each XSS is yielded as soon as LBA has tested it, while the analysis goes on
+            for xss in XSSGenerator.stream_xss(self.Q, self.evaluator, lattice=lattice):
+                print(f"\nXss: {xss}")
+                diff_triples = set(self.Q.clauses) - set(xss.clauses)
+                delta_query = Query()
+                delta_query.clauses = list(diff_triples)
+                yield (delta_query, xss)
+        finally:
+            self.query_exec_count += lattice.evaluations
+            self.partial = self.partial or lattice.partial
+
+    def relax_task(self, candidate) -> Iterable[tuple]:
+        """
+        Relax one candidate of E (run by a worker of the pool).
+
         Returns:
-            list: A list of tuples (Q - x, x).
-        """
-        delta_list = []
-        Xss = XSSGenerator.compute_xss(self.Q, self.D)
-        print(f"\nXss: {Xss}")
-        for xss in Xss:
-            diff_triples = set(self.Q.clauses) - set(xss.clauses)
-            delta_query = Query()
-            delta_query.clauses = list(diff_triples)
-            delta_list.append((delta_query, xss))
-        return delta_list
+            iterable: The relaxed candidates (relaxed delta, xss), without the unrelaxed one;
+                      in threads, they are enumerated best-first as the producer pulls them.
+        """
+        if self.Cand.cancelled.is_set():
+            return []
+        if self.process_pool is not None:
+            return [(i, candidate[1]) for i in self.process_pool.relax(candidate[0], self.budget.depth_step)]
+        query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1, cache=self.relaxations,
+                                                 max_depth=self.budget.depth_step)
+        codes = candidate[0].codes()
+        versions = query_relax.iter_relaxed_queries(self.similarity, accept=lambda q: q.codes() != codes)
+        return ((version, candidate[1]) for _, version in started(versions))
 
     def producer(self):
         """
-        Producer process: For each candidate in the queue E,
-        perform parallel relaxation using TripleRelaxation, and store
-        the relaxed queries in the Cand queue.
+        Producer process: the candidates of E are relaxed by a bounded pool of
+        workers. The relaxations of each candidate are scored and pushed to the
+        Cand frontier as soon as they are ready, so the consumer starts on them
+        while the other candidates are still being relaxed. A full frontier
+        pauses the producer until the consumer takes a candidate; a cancelled
+        one stops it and its pending workers.
         """
-        if not self.E.empty():
-            tmp_results = {}
+        elements = []
+        while not self.E.empty():
+            elements.append(self.E.get())
+        req = Query()
+        produced = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.relax_task, candidate): candidate for candidate in elements}
+            unprocessed = dict(futures)
+            # With processes, results are merged in submission order: the frontier
+            # (and its ties) is the same from one run to the next
+            for future in (as_completed(futures) if self.process_pool is None else list(futures)):
+                if self.Cand.cancelled.is_set() or self.budget.frontier_full(produced):
+                    break
+                candidate = unprocessed.pop(future)
+                try:
+                    relaxed = future.result()
+                except Exception as e:
+                    print(f"Relaxation failed for {[c.label for c in candidate[0].clauses]}: {e}")
+                    continue
+                # Relaxations pulled best-first in chunks: those after a cancelled
+                # or full frontier are never built
+                relaxed = iter(relaxed)
+                fresh = set()
+                stopped = False
+                while not stopped:
+                    chunk = list(itertools.islice(relaxed, SCORE_CHUNK))
+                    if not chunk:
+                        break
+                    pending = []
+                    for relaxed_query in chunk:
+                        request = req.conjunction_query_union(relaxed_query[0], candidate[1])
+                        # Keyed with the projection it is evaluated with
+                        request.selected_vars = self.Q.selected_vars.copy()
+                        # Equal up to clause order and names of non-projected variables: queued only once
+                        key = request.canonical_key()
+                        if key not in self.seen and key not in fresh:
+                            fresh.add(key)
+                            pending.append((relaxed_query, request, key))
+                    # The relaxations of a chunk are scored in one batch
+                    sim_values = self.similarity.batch_query_similarity(
+                        self.Q.clauses, [request.clauses for _, request, _ in pending]
+                    )
+                    for (relaxed_query, request, key), sim_value in zip(pending, sim_values):
+                        if (self.budget.frontier_full(produced)
+                                or not self.Cand.offer((-sim_value, next(self.counter), relaxed_query))):
+                            # Its remaining relaxations are produced again at the next round
+                            self.E.put(candidate)
+                            stopped = True
+                            break
+                        # Seen only once offered: an unoffered relaxation is never lost
+                        self.seen.add(key)
+                        produced += 1
+            for future in unprocessed:
+                future.cancel()
+        # Candidates a cancelled or full round did not relax wait for the next round
+        for candidate in unprocessed.values():
+            self.E.put(candidate)
+        self.Cand.close()
 
-            def relax_task(candidate):
-                query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1)
-                result = query_relax.relax_query()
-                results = [(i, candidate[1]) for i in result]
+    def consumer(self):
+        """
+        Consumer process: Evaluate candidates from Cand queue and build Res.
+        With processes, the best candidates available are evaluated together,
+        one per process, and their answers are merged in similarity order.
+        """
+        print("\n requetes candidates:\n")
+        while len(self.Res) < self.k:
+            if self.out_of_budget() or self.budget.round_over(self.query_exec_count - self.round_executions,
+                                                              time.time() - self.round_start):
+                break
+            size = self.process_pool.processes if self.process_pool is not None else 1
+            left = self.run_budget.executions_left(self.query_exec_count)
+            batch = self.Cand.take_batch(size if left is None else min(size, left),
+                                         timeout=self.run_budget.remaining())
+            if not batch:
+                break
+            requests = []
+            for priority, count, candidate in batch:
+                print(candidate[0].to_sparql())
+                print("\n similarity:")
+                print(priority)
+                print("\n")
+                req = Query()
+                request = req.conjunction_query_union(candidate[0], candidate[1])
+                request.selected_vars = self.Q.selected_vars.copy()
+                requests.append(request)
+            # No more rows than needed to complete Res are fetched
+            limit = self.k + len(self.Res)
+            if self.process_pool is not None:
+                rows = self.process_pool.bindings_many(requests, limit=limit, timeout=self.run_budget.timeout())
+            else:
+                rows = [self.evaluator.bindings(requests[0], limit=limit, timeout=self.run_budget.timeout())]
+            self.query_exec_count += len(batch)  # Increment query execution counter
+            for (priority, count, candidate), request, results in zip(batch, requests, rows):
+                if len(self.Res) >= self.k:
+                    break
+                simval = -priority  # Already computed by the producer
                 if results:
-                    results.pop(0)
-                tmp_results[candidate] = results
-
-            threads = []
-            elements = list(self.E.queue)
-            for candidate in elements:
-                thread = threading.Thread(target=relax_task, args=(candidate,))
-                threads.append(thread)
-                thread.start()
+                    self.answers.extend(results, request, simval)
+                    self.Req.append((request, simval))
+                else:
+                    self.E.put(candidate)
+                
+                self.Cand.task_done()
+        # k answers, no candidate left or round budget spent: the producer and its workers stop
+        self.Cand.cancel()
 
-            for thread in threads:
-                thread.join()
+    def start_processes(self):
+        """Start the process pool, before any thread of the strategy (fork)."""
+        if self.processes and GraphProcessPool.available():
+            self.process_pool = GraphProcessPool(self.D, self.processes)
+            self.process_pool.start()
 
-            req = Query()
-            for candidate in elements:
-                for relaxed_query in tmp_results.get(candidate, []):
-                    request = req.conjunction_query_union(relaxed_query[0], candidate[1])
-                    sim_value = self.similarity.query_similarity(self.Q.clauses, request.clauses)
-                    count = next(self.counter)
-                    self.Cand.put((-sim_value, count, relaxed_query))
+    def stop_processes(self):
+        if self.process_pool is not None:
+            self.evaluator.timeouts += self.process_pool.timeouts
+            self.process_pool.shutdown()
+            self.process_pool = None
 
-            while not self.E.empty():
-                self.E.get()
+    def out_of_budget(self) -> bool:
+        """True once the run budget is spent before k answers: the result is then partial."""
+        if len(self.Res) < self.k and self.run_budget.exhausted(self.query_exec_count):
+            self.partial = True
+            return True
+        return False
 
-    def consumer(self):
+    def run_rounds(self):
         """
-        Consumer process: Evaluate candidates from Cand queue and build Res.
+        Relaxation rounds: each round relaxes the candidates of E (at the first
+        round, the delta candidates; then the candidates that failed) one level
+        further, while the consumer evaluates the best relaxed candidates.
+        A new round starts only while fewer than k answers are found, so deep
+        relaxations are reached only when needed, and while the run budget lasts.
         """
-        print("\n requetes candidates:\n")
-        while len(self.Res) < self.k and not self.Cand.empty():
-            priority, count, candidate = self.Cand.get()
-            print(candidate[0].to_sparql())
-            print("\n similarity:")
-            print(priority)
-            print("\n")
-            req = Query()
-            request = req.conjunction_query_union(candidate[0], candidate[1])
-            request.selected_vars = self.Q.selected_vars.copy()
-            simval = self.similarity.query_similarity(self.Q.clauses, request.clauses)
-            results = request.execute(self.D)
-            self.query_exec_count += 1  # Increment query execution counter
-            if results:
-                for i in results.bindings:
-                    if i not in self.Res and len(self.Res) < self.k:
-                        self.Res.append(i)
-                self.Req.append((request, simval))
-            else:
-                self.E.put(candidate)
-            
-            self.Cand.task_done()
+        self.round = 0
+        while (len(self.Res) < self.k and self.budget.allows_round(self.round)
+               and not (self.E.empty() and self.Cand.empty()) and not self.out_of_budget()):
+            self.round_start = time.time()
+            self.round_executions = self.query_exec_count
+            self.Cand.reopen()
+            # Relaxation and evaluation overlap: the consumer takes the best
+            # candidates already produced while the workers relax the others
+            producer_thread = threading.Thread(target=self.producer)
+            consumer_thread = threading.Thread(target=self.consumer)
+            producer_thread.start()
+            consumer_thread.start()
+            consumer_thread.join()
+            producer_thread.join()
+            self.round += 1
 
     def parallelxbs(self):
         """
         Execute the complete parallel relaxation algorithm.
         
         Returns:
-            list: The list of repaired queries (Res) satisfying the criterion.
+            list: The list of repaired queries (Res) satisfying the criterion;
+                  'partial' tells whether the run budget cut the search short.
         """
         start_time = time.time()  # Start time measurement
-        self.Res = []
+        self.run_budget.start()
+        self.partial = False
+        timeouts = self.evaluator.timeouts
+        self.answers.clear()
         for candidate in self.delta():
             self.E.put(candidate)
-        producer_thread = threading.Thread(target=self.producer)
-        consumer_thread = threading.Thread(target=self.consumer)
-        producer_thread.start()
-        producer_thread.join()
-        consumer_thread.start()
-        consumer_thread.join()
+        self.start_processes()
+        try:
+            self.run_rounds()
+        finally:
+            self.stop_processes()
+        # A timed-out evaluation may have hidden answers of a better candidate
+        self.partial = self.partial or self.evaluator.timeouts > timeouts
         end_time = time.time()  # End time measurement
         self.execution_time = end_time - start_time
         # print(f"Nombre d'exécutions de requêtes : {self.query_exec_count}")
         # print(f"Temps d'exécution : {self.execution_time:.2f} secondes")
 
+    def stream(self) -> Iterator[Answer]:
+        """
+        Run the algorithm in the background and yield each Answer (binding,
+        repaired query, similarity) as soon as it is found.
+        """
+        return self.answers.stream(self.parallelxbs)
+
 class ParallelRelaxationSmartStrategy:
-    def __init__(self, Q: Query, D: Graph, k: int):
+    def __init__(self, Q: Query, D: Graph, k: int, cache: Optional[OutcomeCache] = None,
+                 max_workers: Optional[int] = None, frontier_size: int = 1024,
+                 budget: Optional[RoundBudget] = None, processes: Optional[int] = None,
+                 run_budget: Optional[RunBudget] = None,
+                 on_answer: Optional[Callable[[Answer], None]] = None):
         """
         Constructor for the smart parallel relaxation strategy.
         
@@ -157,16 +336,46 @@ class ParallelRelaxationSmartStrategy:
             Q (Query): The initial conjunctive query.
             D (Graph): The RDF database (an rdflib.Graph).
             k (int): Minimum number of results required for a repaired query.
+            cache (OutcomeCache): Optional persistent cache of sub-query outcomes.
+            max_workers (int): Size of the worker pool relaxing candidates
+                (None: the ThreadPoolExecutor default).
+            frontier_size (int): Maximum number of relaxed candidates waiting for the
+                consumer; a full frontier pauses the producer (0: unbounded).
+            budget (RoundBudget): Number of relaxation rounds and per-round budgets
+                (executions, time, candidates produced).
+            processes (int): Number of forked processes sharing D that relax the
+                candidates; None keeps the relaxation in threads.
+            run_budget (RunBudget): Wall time, query executions and per-query timeout of
+                the whole run; once spent, the answers found so far are kept and
+                'partial' is set.
+            on_answer (callable): Called with each new Answer (binding, repaired query,
+                similarity) as soon as it is found, from the consumer thread.
         """
         self.Q = Q
         self.D = D
         self.k = k
-        self.Res = []
+        self.cache = cache
+        self.evaluator = GraphEvaluator(D)  # Early-terminating evaluation on D
+        self.answers = AnswerSet(k, Q.selected_vars, on_answer)  # Distinct answers, hashed keys
+        self.Res = self.answers.bindings
         self.Req = []
         self.F = []       # List of failure sub queries
+        self.universe = ClauseUniverse(Q.clauses)  # One bit per clause seen
+        self.F_masks = []  # Masks of the queries of F, in the same order
         self.E = Queue()
-        self.Cand = PriorityQueue()
+        self.max_workers = max_workers
+        self.Cand = CandidateFrontier(frontier_size)  # Bounded frontier of relaxed candidates
+        self.budget = budget or RoundBudget()
+        self.run_budget = run_budget or RunBudget()
+        self.partial = False  # The run budget ran out (or an evaluation timed out) before k answers
+        self.round = 0  # Current relaxation round (0: relaxation of the delta candidates)
+        self.round_start = 0.0  # Start time of the current round
+        self.round_executions = 0  # Query executions before the current round
+        self.processes = processes
+        self.process_pool: Optional[GraphProcessPool] = None  # Started for the duration of a run
         self.counter = itertools.count()
+        self.seen = set()  # Canonical keys of the candidate queries already queued
+        self.relaxations = RelaxationCache()  # Relaxed alternatives per triple, shared by the producers
         self.similarity = sim(D)
         self.query_exec_count = 0  # Counter for query executions
         self.execution_time = 0.0  # Total execution time
@@ -174,127 +383,200 @@ class ParallelRelaxationSmartStrategy:
     @staticmethod
     def generate_combinations(queries: List[Query]) -> List[Query]:
         """
-        Generate all non-redundant combinations of query clauses.
-        """
-        clauses_sets = [q.clauses for q in queries]
-        combinations = itertools.product(*clauses_sets)
-        seen = set()
-        result = []
-        for combo in combinations:
-            merged = []
-            for clause in combo:
-                if clause not in merged:
-                    merged.append(clause)
-            key = tuple(merged)
-            if key not in seen:
-                seen.add(key)
+        Generate the minimal sets of clauses hitting every query (MMCS),
+        each set exactly once.
+        """
+        return XSSGenerator.generate_combinations(queries)
+
+    @staticmethod
+    def filter_tests(query: Query) -> List[Query]:
+        """
+        Sub-queries of one and two clauses tested by GenFilter, each set once,
+        singletons first so that a failing clause prunes the pairs containing it.
+        """
+        tests = []
+        for size in (1, 2):
+            for combo in itertools.combinations(query.clauses, size):
                 q = Query()
-                q.clauses = merged
-                result.append(q)
-        return result
+                q.clauses = list(combo)
+                tests.append(q)
+        return tests
 
-    def delta(self) -> list:
+    def delta(self) -> Iterator[tuple]:
         """
         Extract candidate elements (δ) from the query Q.
         
-        Returns:
-            list: A list of tuples (Q - x, x).
+        Yields:
+            tuple: (Q - x, x) for each XSS x of Q, as soon as the analysis has tested x.
         """
-        delta_list = []
-        Xss = XSSGenerator.compute_xss(self.Q, self.D)
+        # MFS/XSS analysis within the run budget: each sub-query is bounded by the
+        # per-query timeout and charged to the run; a cut analysis makes it partial
+        lattice = QueryFailureAnalyzer.lattice(self.Q, self.evaluator, cache=self.cache,
+                                               budget=self.run_budget, executions=self.query_exec_count)
         print(f"\nXSS trouvees\n")
-        for i, xss in enumerate(Xss, 1):
-            print(f"XSS {i}:")
-            print([j.label for j in xss.clauses])
-            print("-"*50)
-        for xss in Xss:
-            diff_triples = set(self.Q.clauses) - set(xss.clauses)
-            delta_query = Query()
-            delta_query.clauses = list(diff_triples)
-            delta_list.append((delta_query, xss))
-        return delta_list
+        try:
+            # Each XSS is yielded as soon as LBA has tested it, while the analysis goes on
+            for i, xss in enumerate(XSSGenerator.stream_xss(self.Q, self.evaluator, lattice=lattice), 1):
+                print(f"XSS {i}:")
+                print([j.label for j in xss.clauses])
+                print("-"*50)
+                diff_triples = set(self.Q.clauses) - set(xss.clauses)
+                delta_query = Query()
+                delta_query.clauses = list(diff_triples)
+                yield (delta_query, xss)
+        finally:
+            self.query_exec_count += lattice.evaluations
+            self.partial = self.partial or lattice.partial
 
-    def producer(self):
+    def relax_task(self, candidate) -> Iterable[tuple]:
         """
-        Producer process: Relax candidates and store in Cand queue.
-        """
-        if not self.E.empty():
-            tmp_results = {}
+        Relax one candidate of E (run by a worker of the pool).
 
-            def relax_task(candidate):
-                query_relax = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1)
-                result = query_relax.relax_query()
-                results = [(i, candidate[1]) for i in result]
-                if results:
-                    results.pop(0)
-                tmp_results[candidate] = results
-
-            threads = []
-            elements = list(self.E.queue)
-            for candidate in elements:
-                thread = threading.Thread(target=relax_task, args=(candidate,))
-                threads.append(thread)
-                thread.start()
-
-            for thread in threads:
-                thread.join()
+        Returns:
+            iterable: The relaxed candidates (relaxed delta, xss): at the first round, those
+                      whose clauses are all relaxed; then every version but the candidate itself.
+                      In threads, they are enumerated best-first as the producer pulls them.
+        """
+        if self.Cand.cancelled.is_set():
+            return []
+        if self.process_pool is not None:
+            relaxed_versions = self.process_pool.relax(candidate[0], self.budget.depth_step,
+                                                       all_relaxed=self.round == 0)
+            return [(cand, candidate[1]) for cand in relaxed_versions]
+        cqr = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1, cache=self.relaxations,
+                                         max_depth=self.budget.depth_step)
+        if self.round == 0:
+            accept = cqr.is_relaxed_version_valid
+        else:
+            # A failed candidate goes one level further (up the hierarchy or to a variable)
+            codes = candidate[0].codes()
+            accept = lambda q: q.codes() != codes
+        versions = cqr.iter_relaxed_queries(self.similarity, accept=accept)
+        return ((version, candidate[1]) for _, version in started(versions))
 
-            req = Query()
-            for candidate in elements:
-                for relaxed_query in tmp_results.get(candidate, []):
-                    request = req.conjunction_query_union(relaxed_query[0], candidate[1])
-                    sim_value = self.similarity.query_similarity(self.Q.clauses, request.clauses)
-                    count = next(self.counter)
-                    self.Cand.put((-sim_value, count, relaxed_query))
+    def producer(self):
+        """
+        Producer process: the candidates of E are relaxed by a bounded pool of
+        workers and pushed to the Cand frontier as soon as each one is ready,
+        while the consumer evaluates the best candidates already produced.
+        """
+        elements = []
+        while not self.E.empty():
+            elements.append(self.E.get())
+        req = Query()
+        produced = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.relax_task, candidate): candidate for candidate in elements}
+            unprocessed = dict(futures)
+            # With processes, results are merged in submission order: the frontier
+            # (and its ties) is the same from one run to the next
+            for future in (as_completed(futures) if self.process_pool is None else list(futures)):
+                if self.Cand.cancelled.is_set() or self.budget.frontier_full(produced):
+                    break
+                candidate = unprocessed.pop(future)
+                try:
+                    relaxed = future.result()
+                except Exception as e:
+                    print(f"Relaxation failed for {[c.label for c in candidate[0].clauses]}: {e}")
+                    continue
+                # Relaxations pulled best-first in chunks: those after a cancelled
+                # or full frontier are never built
+                relaxed = iter(relaxed)
+                fresh = set()
+                stopped = False
+                while not stopped:
+                    chunk = list(itertools.islice(relaxed, SCORE_CHUNK))
+                    if not chunk:
+                        break
+                    pending = []
+                    for relaxed_query in chunk:
+                        request = req.conjunction_query_union(relaxed_query[0], candidate[1])
+                        # Keyed with the projection it is evaluated with
+                        request.selected_vars = self.Q.selected_vars.copy()
+                        # Equal up to clause order and names of non-projected variables: queued only once
+                        key = request.canonical_key()
+                        if key not in self.seen and key not in fresh:
+                            fresh.add(key)
+                            pending.append((relaxed_query, request, key))
+                    if self.round == 0:
+                        # Delta + xss is Q itself (similarity 1): only the relaxed clauses are scored
+                        sim_values = [
+                            self.similarity.child_similarity(self.Q.clauses, 1.0, self.Q.clauses, request.clauses)
+                            for _, request, _ in pending
+                        ]
+                    else:
+                        sim_values = self.similarity.batch_query_similarity(
+                            self.Q.clauses, [request.clauses for _, request, _ in pending]
+                        )
+                    for (relaxed_query, request, key), sim_value in zip(pending, sim_values):
+                        if (self.budget.frontier_full(produced)
+                                or not self.Cand.offer((-sim_value, next(self.counter), relaxed_query))):
+                            # Its remaining relaxations are produced again at the next round
+                            self.E.put(candidate)
+                            stopped = True
+                            break
+                        # Seen only once offered: an unoffered relaxation is never lost
+                        self.seen.add(key)
+                        produced += 1
+            for future in unprocessed:
+                future.cancel()
+        # Candidates a cancelled or full round did not relax wait for the next round
+        for candidate in unprocessed.values():
+            self.E.put(candidate)
+        self.Cand.close()
 
-            while not self.E.empty():
-                self.E.get()
+    def add_failing(self, query: Query):
+        """Record a failing sub-query in F, with its mask (triples only, filters are ignored)."""
+        self.F.append(query)
+        self.F_masks.append(query.mask(self.universe))
 
     def GenFilter(self, candidate):
         """
         Implement GenFilter algorithm to identify failing sub-queries.
         """
         if len(candidate[0].clauses)>1:
-            list_candidate = [candidate[0], candidate[0]]
-            test = self.generate_combinations(list_candidate)
-            while test:
+            test = self.filter_tests(candidate[0])
+            while test and not self.out_of_budget():
                 i = test.pop(0)
                 candidate_union = Query.conjunction_query_union(i, candidate[1])
-                if not candidate_union.execute(self.D):
-                    self.query_exec_count += 1  # Increment query execution counter
-                    self.F.append(i)
-                    new_test = [j for j in test if not i.is_subquery(j)]
+                self.query_exec_count += 1  # Every test is an execution, failing or not
+                if not self.evaluator.exists(candidate_union, timeout=self.run_budget.timeout()):
+                    self.add_failing(i)
+                    failing = self.F_masks[-1]
+                    new_test = [j for j in test if not ClauseUniverse.is_subset(failing, j.mask(self.universe))]
                     test = new_test
         else:
-            self.F.append(candidate[0])
+            self.add_failing(candidate[0])
     def consumer(self):
         """
         Consumer process: Evaluate candidates with eligibility check.
         """
         print("\n requetes candidates:\n")
-        while len(self.Res) < self.k and not self.Cand.empty():
-            priority, count, candidate = self.Cand.get()
+        while len(self.Res) < self.k:
+            if self.out_of_budget() or self.budget.round_over(self.query_exec_count - self.round_executions,
+                                                              time.time() - self.round_start):
+                break
+            item = self.Cand.take(timeout=self.run_budget.remaining())
+            if item is None:
+                break
+            priority, count, candidate = item
             print(candidate[0].to_sparql())
             print("\n similarity:")
             print(priority)
             print("\n")
-            elig = True
-            i = 0
-            while i < len(self.F) and elig:
-                j = self.F[i]
-                if j.is_subquery(candidate[0]):
-                    elig = False
-                i += 1
+            # Not eligible if it contains a known failing sub-query (triples only:
+            # filters are ignored, as in is_subquery)
+            mask = candidate[0].mask(self.universe)
+            elig = not any(ClauseUniverse.is_subset(f, mask) for f in self.F_masks)
             if elig:
                 candidate_query = Query.conjunction_query_union(candidate[1], candidate[0])
                 candidate_query.selected_vars = self.Q.selected_vars.copy()
-                results = candidate_query.execute(self.D)
+                results = self.evaluator.bindings(candidate_query, limit=self.k + len(self.Res),
+                                                  timeout=self.run_budget.timeout())
                 self.query_exec_count += 1  # Increment query execution counter
-                simval = self.similarity.query_similarity(self.Q.clauses, candidate_query.clauses)
+                simval = -priority  # Already computed when the candidate was queued
                 if results:
-                    for i in results.bindings:
-                        if i not in self.Res and len(self.Res) < self.k:
-                            self.Res.append(i)
+                    self.answers.extend(results, candidate_query, simval)
                     self.Req.append((candidate_query, simval))
                 else:
                     self.E.put(candidate)
@@ -302,34 +584,81 @@ class ParallelRelaxationSmartStrategy:
             else:
                 self.E.put(candidate)
             self.Cand.task_done()
+        # k answers, no candidate left or round budget spent: the producer and its workers stop
+        self.Cand.cancel()
+
+    def start_processes(self):
+        """Start the process pool, before any thread of the strategy (fork)."""
+        if self.processes and GraphProcessPool.available():
+            self.process_pool = GraphProcessPool(self.D, self.processes)
+            self.process_pool.start()
+
+    def stop_processes(self):
+        if self.process_pool is not None:
+            self.evaluator.timeouts += self.process_pool.timeouts
+            self.process_pool.shutdown()
+            self.process_pool = None
+
+    def out_of_budget(self) -> bool:
+        """True once the run budget is spent before k answers: the result is then partial."""
+        if len(self.Res) < self.k and self.run_budget.exhausted(self.query_exec_count):
+            self.partial = True
+            return True
+        return False
+
+    def run_rounds(self):
+        """
+        Relaxation rounds: each round relaxes the candidates of E (at the first
+        round, the delta candidates; then the candidates that failed) one level
+        further, while the consumer evaluates the best relaxed candidates.
+        A new round starts only while fewer than k answers are found, so deep
+        relaxations are reached only when needed, and while the run budget lasts.
+        """
+        self.round = 0
+        while (len(self.Res) < self.k and self.budget.allows_round(self.round)
+               and not (self.E.empty() and self.Cand.empty()) and not self.out_of_budget()):
+            self.round_start = time.time()
+            self.round_executions = self.query_exec_count
+            self.Cand.reopen()
+            # Relaxation and evaluation overlap: the consumer takes the best
+            # candidates already produced while the workers relax the others
+            producer_thread = threading.Thread(target=self.producer)
+            consumer_thread = threading.Thread(target=self.consumer)
+            producer_thread.start()
+            consumer_thread.start()
+            consumer_thread.join()
+            producer_thread.join()
+            self.round += 1
 
     def parallelxbsv2(self):
         """
         Execute the smart parallel relaxation algorithm.
         
         Returns:
-            list: The list of repaired queries (Res) satisfying the criterion.
+            list: The list of repaired queries (Res) satisfying the criterion;
+                  'partial' tells whether the run budget cut the search short.
         """
         start_time = time.time()  # Start time measurement
+        self.run_budget.start()
+        self.partial = False
+        timeouts = self.evaluator.timeouts
         while not self.E.empty():
             self.E.get()
         for candidate in self.delta():
-            cqr = ConjunctiveQueryRelaxation(candidate[0], self.D, order=1)
-            relaxed_versions = cqr.relax_query()
-            req = Query()
-            for i, cand in enumerate(relaxed_versions):
-                valid = cqr.is_relaxed_version_valid(cand)
-                if valid:
-                    request = req.conjunction_query_union(cand, candidate[1])
-                    sim_value = self.similarity.query_similarity(self.Q.clauses, request.clauses)
-                    count = next(self.counter)
-                    self.Cand.put((-sim_value, count, (cand, candidate[1])))
-
-        producer_thread = threading.Thread(target=self.producer)
-        consumer_thread = threading.Thread(target=self.consumer)
-        consumer_thread.start()
-        consumer_thread.join()
-        producer_thread.start()
-        producer_thread.join()
+            self.E.put(candidate)
+        self.start_processes()
+        try:
+            self.run_rounds()
+        finally:
+            self.stop_processes()
+        # A timed-out evaluation may have hidden answers of a better candidate
+        self.partial = self.partial or self.evaluator.timeouts > timeouts
         end_time = time.time()  # End time measurement
-        self.execution_time = end_time - start_time
\ No newline at end of file
+        self.execution_time = end_time - start_time
+
+    def stream(self) -> Iterator[Answer]:
+        """
+        Run the algorithm in the background and yield each Answer (binding,
+        repaired query, similarity) as soon as it is found.
+        """
+        return self.answers.stream(self.parallelxbsv2)
@@ -0,0 +1,151 @@
+import itertools
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+from rdflib import Graph
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+
+class QueryEvaluator(ABC):
+    """
+    Interface commune d'évaluation des requêtes, quel que soit le support
+    (graphe rdflib en mémoire ou endpoint SPARQL). Toutes les opérations
+    s'arrêtent dès que le nombre de solutions demandé est atteint.
+
+    Les erreurs d'exécution sont affichées et la requête est alors
+    considérée comme sans solution. Les dépassements de délai sont comptés
+    dans 'timeouts' : sur un endpoint (TimeoutError) la requête est sans
+    solution, en mémoire les solutions déjà produites sont gardées.
+    """
+
+    def __init__(self):
+        self.evaluations = 0  # Requêtes envoyées au support
+        self.timeouts = 0     # Évaluations interrompues par leur délai
+
+    @staticmethod
+    def to_sparql(query: Union[ConjunctiveQuery, str]) -> str:
+        """Texte SPARQL d'une requête conjonctive (ou d'une requête déjà sérialisée)."""
+        return query if isinstance(query, str) else query.to_sparql()
+
+    @abstractmethod
+    def select(self, query_str: str, limit: Optional[int] = None,
+               timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Exécute 'query_str' et retourne au plus 'limit' solutions.
+        Lève une exception si l'exécution échoue. Au-delà de 'timeout' secondes
+        (None : le délai par défaut du support), lève TimeoutError ou rend les
+        solutions déjà produites en comptant le dépassement.
+        """
+
+    def bindings(self, query: Union[ConjunctiveQuery, str], limit: Optional[int] = None,
+                 timeout: Optional[float] = None) -> List[Dict]:
+        """Au plus 'limit' solutions de la requête (toutes si 'limit' est None)."""
+        self.evaluations += 1
+        try:
+            return self.select(self.to_sparql(query), limit, timeout)
+        except TimeoutError as e:
+            self.timeouts += 1
+            print(f"Délai dépassé pour la requête : {e}")
+            return []
+        except Exception as e:
+            print(f"Erreur lors de l'exécution de la requête : {e}")
+            return []
+
+    def bindings_many(self, queries: List[Union[ConjunctiveQuery, str]], limit: Optional[int] = None,
+                      timeout: Optional[float] = None) -> List[List[Dict]]:
+        """Solutions de plusieurs requêtes indépendantes, dans l'ordre de 'queries'."""
+        return [self.bindings(query, limit, timeout) for query in queries]
+
+    def count(self, query: Union[ConjunctiveQuery, str], limit: Optional[int] = None,
+              timeout: Optional[float] = None) -> int:
+        """Nombre de solutions de la requête, plafonné à 'limit'."""
+        return len(self.bindings(query, limit, timeout))
+
+    def at_least_k(self, query: Union[ConjunctiveQuery, str], k: int,
+                   timeout: Optional[float] = None) -> bool:
+        """Vrai si la requête a au moins k solutions ; s'arrête à la k-ième."""
+        if k <= 0:
+            return True
+        return self.count(query, limit=k, timeout=timeout) >= k
+
+    def exists(self, query: Union[ConjunctiveQuery, str], timeout: Optional[float] = None) -> bool:
+        """Vrai si la requête a au moins une solution."""
+        return self.at_least_k(query, 1, timeout)
+
+    def not_k_completed(self, query: Union[ConjunctiveQuery, str], k: int = 0,
+                        timeout: Optional[float] = None) -> bool:
+        """Vrai si la requête a au plus k solutions (test d'échec, LIMIT k+1)."""
+        return not self.at_least_k(query, k + 1, timeout)
+
+    def not_k_completed_many(self, queries: List[Union[ConjunctiveQuery, str]], k: int = 0,
+                             workers: int = 1) -> List[bool]:
+        """
+        not_k_completed pour des requêtes indépendantes, évaluées par 'workers'
+        threads (l'attente réseau domine). Les résultats suivent l'ordre de 'queries'.
+        """
+        if workers <= 1 or len(queries) <= 1:
+            return [self.not_k_completed(query, k) for query in queries]
+        with ThreadPoolExecutor(max_workers=min(workers, len(queries))) as pool:
+            return list(pool.map(lambda query: self.not_k_completed(query, k), queries))
+
+
+class GraphEvaluator(QueryEvaluator):
+    """Évaluation sur un graphe rdflib en mémoire."""
+
+    def __init__(self, graph: Graph, process_pool=None):
+        """
+        :param graph: Graphe interrogé.
+        :param process_pool: GraphProcessPool déjà démarré pour not_k_completed_many
+                             (None : celui partagé par le graphe).
+        """
+        super().__init__()
+        self.graph = graph
+        self.process_pool = process_pool
+
+    def select(self, query_str: str, limit: Optional[int] = None,
+               timeout: Optional[float] = None) -> List[Dict]:
+        # rdflib produit les solutions à la demande : on cesse de les lire au-delà de 'limit'
+        results = self.graph.query(query_str)
+        rows = itertools.islice(results, limit) if limit is not None else results
+        if timeout is None:
+            return [
+                {var: value for var, value in zip(results.vars, row) if value is not None}
+                for row in rows
+            ]
+        # L'évaluation rdflib ne peut pas être interrompue : le délai est vérifié à
+        # chaque solution produite, et une requête sans solution ne l'est jamais.
+        # Au-delà du délai, les solutions déjà trouvées sont rendues (le dépassement
+        # est compté) : la requête n'est pas prise pour un échec
+        deadline = time.time() + timeout
+        solutions = []
+        for row in rows:
+            solutions.append({var: value for var, value in zip(results.vars, row) if value is not None})
+            if time.time() > deadline:
+                self.timeouts += 1
+                print(f"Délai dépassé pour la requête : {len(solutions)} solution(s) gardée(s)")
+                break
+        return solutions
+
+    def not_k_completed_many(self, queries: List[Union[ConjunctiveQuery, str]], k: int = 0,
+                             workers: int = 1) -> List[bool]:
+        """
+        L'évaluation rdflib est limitée par le GIL : les requêtes sont réparties
+        sur le pool de processus 'process_pool', par défaut celui que partagent
+        tous les évaluateurs du graphe (GraphProcessPool.for_graph, 'workers'
+        processus réutilisés tant que le graphe ne change pas). Sans fork
+        (Windows, macOS par défaut), ou appelée depuis un thread sans pool
+        déjà démarré, l'évaluation reste séquentielle.
+        """
+        if workers <= 1 or len(queries) <= 1:
+            return [self.not_k_completed(query, k) for query in queries]
+        from Relaxation.GraphProcessPool import GraphProcessPool  # Import circulaire
+        pool = self.process_pool or GraphProcessPool.for_graph(self.graph, workers)
+        if pool is None:
+            return [self.not_k_completed(query, k) for query in queries]
+        self.evaluations += len(queries)
+        return pool.not_k_completed_many([self.to_sparql(query) for query in queries], k)
+
+
+def as_evaluator(source: Union[Graph, QueryEvaluator]) -> QueryEvaluator:
+    """Retourne 'source' s'il s'agit déjà d'un évaluateur, sinon l'évaluateur de ce graphe."""
+    return source if isinstance(source, QueryEvaluator) else GraphEvaluator(source)
@@ -1,7 +1,22 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from rdflib import Graph
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
 from Relaxation.ConjunctiveQueryTools import ConjunctiveQueryTools
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.QueryEvaluator import QueryEvaluator, as_evaluator
+from Relaxation.RunBudget import RunBudget
+from Relaxation.SubqueryLattice import SubqueryLattice
+
+def bounded_not_k_completed(evaluator: QueryEvaluator, query: ConjunctiveQuery, k: int,
+                            budget: Optional[RunBudget]) -> Optional[bool]:
+    """
+    Test d'échec d'une sous-requête borné par budget.timeout() ; None si son
+    délai est dépassé avant k+1 solutions (SubqueryLattice la prend alors pour
+    un échec sans la mettre en cache). Avec k+1 solutions, le succès est sûr.
+    """
+    timeouts = evaluator.timeouts
+    failed = evaluator.not_k_completed(query, k, budget.timeout() if budget is not None else None)
+    return None if failed and evaluator.timeouts > timeouts else failed
 
 class QueryFailureAnalyzer:
     @staticmethod
@@ -11,97 +26,61 @@ class QueryFailureAnalyzer:
         """
         if query_str is None:
             raise ValueError("La requête ne peut être None")
-        nb_solution = 0
-        try:
-            results = graph.query(query_str)
-            for _ in results:
-                nb_solution += 1
-                if nb_solution > k:
-                    break
-        except Exception as e:
-            print(f"Erreur lors de l'exécution de la requête : {e}")
-        return nb_solution <= k
-    
-    
+        return as_evaluator(graph).not_k_completed(query_str, k)
+
     @staticmethod
-    def find_all_failing_causes(query, graph: Graph) -> List['ConjunctiveQuery']:
+    def lattice(query, graph: Graph, k=0, cache: Optional[OutcomeCache] = None, workers: int = 1,
+                budget: Optional[RunBudget] = None, executions: int = 0) -> SubqueryLattice:
         """
-        Recherche exhaustive de toutes les MFS d'une requête (coût potentiellement 2^n).
+        Construit le treillis des sous-requêtes de 'query', évaluées sur 'graph'.
+        Si 'cache' est fourni, les résultats déjà connus ne sont pas réexécutés.
+        'graph' peut aussi être un QueryEvaluator déjà construit.
+        Avec 'workers' > 1, les sous-requêtes d'un même niveau sont évaluées
+        en parallèle ; le résultat est identique à l'évaluation séquentielle.
+        Avec 'budget', l'analyse s'arrête quand il est épuisé ('executions' y
+        sont déjà comptées) et chaque sous-requête est bornée par budget.timeout().
         """
-        all_mfs = []
-        if not QueryFailureAnalyzer.not_k_completed(query.to_sparql(), graph):
-            return all_mfs
-
-        if len(query.clauses) == 1:
-            all_mfs.append(query.clone())
-            return all_mfs
-
-        is_mfs = True
-        for element in list(query.clauses):
-            query.remove(element)
-            current_all_mfs = QueryFailureAnalyzer.find_all_failing_causes(query, graph)
-            if current_all_mfs:
-                is_mfs = False
-                for one_mfs in current_all_mfs:
-                    if not any(old_mfs.is_subquery(one_mfs) for old_mfs in all_mfs):
-                        all_mfs.append(one_mfs)
-            query.add(element,len(query.clauses))
-        if is_mfs:
-            all_mfs.append(query.clone())
-        return all_mfs
-    # @staticmethod
-    # def find_a_failing_cause(query, graph: Graph) -> Optional['ConjunctiveQuery']:
-    #     """
-    #     Recherche récursivement une sous-requête minimale (MFS) responsable de l'échec.
-    #     """
-    #     if not QueryFailureAnalyzer.not_k_completed(query.to_sparql(), graph):
-    #         return None
-
-    #     if len(query.clauses) == 1:
-    #         return query.clone()
+        evaluator = as_evaluator(graph)
+        fails_batch = None
+        if workers > 1:
+            fails_batch = lambda subs: evaluator.not_k_completed_many(subs, k, workers)
+        return SubqueryLattice(
+            query, lambda sub: bounded_not_k_completed(evaluator, sub, k, budget), cache=cache, k=k,
+            fails_batch=fails_batch, budget=budget, executions=executions
+        )
 
-    #     find_mfs = False
-    #     failing_cause = None
-    #     # Itération sur les clauses littérales (on travaille sur une copie de la liste pour éviter les problèmes d'indexation)
-    #     for i, element in enumerate(query.clauses):
-    #         query.remove(element)
-    #         if QueryFailureAnalyzer.not_k_completed(query.to_sparql(), graph):
-    #             mfs = QueryFailureAnalyzer.find_a_failing_cause(query, graph)
-    #             if mfs is not None:
-    #                 failing_cause = mfs
-    #                 find_mfs = True
-    #         query.add(i, element)
-    #         if find_mfs:
-    #             break
-
-    #     return failing_cause if find_mfs else query.clone()
-
-    # @staticmethod
-    # def find_a_failing_cause_with_core(query, core) -> 'ConjunctiveQuery':
-    #     """
-    #     Version avec accumulateur. Ajoute progressivement les clauses causales dans 'core'.
-    #     """
-    #     if query:
-    #         if core:
-    #             if not QueryFailureAnalyzer.not_k_completed(query.to_sparql(), graph):
-    #                 if QueryFailureAnalyzer.not_k_completed(core.to_sparql(), graph):
-    #                     return core
-    #     else:
-    #         return core
-
-    #     if len(query.clauses) == 1:
-    #         core.add(query.clauses[0])
-    #         return core
+    @staticmethod
+    def find_all_failing_causes(query, graph: Graph, lattice: Optional[SubqueryLattice] = None,
+                                workers: int = 1) -> List['ConjunctiveQuery']:
+        """
+        Recherche de toutes les MFS d'une requête. Chaque sous-requête est
+        exécutée au plus une fois grâce au treillis mémoïsé ; passer 'lattice'
+        permet de récupérer le nombre d'évaluations effectuées et évitées.
+        'workers' > 1 évalue chaque niveau du treillis dans un pool de processus.
+        """
+        if lattice is None:
+            lattice = QueryFailureAnalyzer.lattice(query, graph, workers=workers)
+        return lattice.minimal_failing_subqueries()
 
-    #     # On retire la première clause
-    #     element = query.removepos(0)  # Supposons que remove accepte un index
-    #     temp_query = ConjunctiveQuery.conjunction_query_union(query, core)
-    #     if not QueryFailureAnalyzer.not_k_completed(temp_query.to_sparql(), graph):
-    #         core.add(element)
-    #         core = QueryFailureAnalyzer.find_a_failing_cause_with_core(query, core, graph)
-    #     else:
-    #         core = QueryFailureAnalyzer.find_a_failing_cause_with_core(query, core, graph)
-    #     query.add(0, element)
-    #     return core
+    @staticmethod
+    def find_a_failing_cause(query, graph: Graph, lattice: Optional[SubqueryLattice] = None) -> Optional['ConjunctiveQuery']:
+        """
+        Recherche une seule MFS responsable de l'échec en O(n) évaluations.
+        Retourne None si la requête n'échoue pas.
+        """
+        if lattice is None:
+            lattice = QueryFailureAnalyzer.lattice(query, graph)
+        if not lattice.fails(lattice.top):
+            return None
+        return lattice.subquery(lattice.find_an_mfs(lattice.top))
 
-    
\ No newline at end of file
+    @staticmethod
+    def find_mfs_and_xss(query, graph: Graph, lattice: Optional[SubqueryLattice] = None) -> Tuple[List['ConjunctiveQuery'], List['ConjunctiveQuery']]:
+        """
+        Calcule toutes les MFS et toutes les XSS avec l'algorithme LBA :
+        une MFS est trouvée en O(n), les suivantes ainsi que les XSS sont
+        déduites des sous-treillis factorisés.
+        """
+        if lattice is None:
+            lattice = QueryFailureAnalyzer.lattice(query, graph)
+        return lattice.mfs_and_xss()
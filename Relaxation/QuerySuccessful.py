@@ -4,6 +4,7 @@ from typing import List, Optional, Set
 import itertools
 from abc import ABC, abstractmethod
 from Relaxation.ConjunctiveQueryTools import ConjunctiveQueryTools
+from Query.ClauseUniverse import ClauseUniverse
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
 from Query.SimpleLiteral import SimpleLiteral
 
@@ -31,21 +32,26 @@ class QuerySuccessful:
             return None
         
         queue = [query]
+        universe = ClauseUniverse(query.clauses)
+        masks = [query.mask(universe)]  # Masques des requêtes de 'queue', dans le même ordre
         visited = set()
         
         while queue:
             current = queue.pop(0)
-            if current in visited:
+            masks.pop(0)
+            key = current.canonical_key()
+            if key in visited:
                 continue
-            visited.add(current)
+            visited.add(key)
             
             if QuerySuccessful.has_top_k_answers(current, Graph, nbr_answers):
                 return current
             
             for i in range(len(current.clauses)):
                 new_query = current.remove(i)
-                if not ConjunctiveQueryTools.query_contains_in_list(queue, new_query):
+                if not ConjunctiveQueryTools.query_contains_in_list(queue, new_query, universe, masks):
                     queue.append(new_query)
+                    masks.append(new_query.mask(universe))
         
         return None
 
@@ -0,0 +1,47 @@
+import heapq
+import itertools
+from typing import Any, Iterator, List, Sequence, Tuple
+
+def ranked_product(ranked_lists: Sequence[Sequence[Tuple[float, Any]]]) -> Iterator[Tuple[float, Tuple]]:
+    """
+    Produit cartésien de listes (score, élément) énuméré par score total
+    décroissant, sans le construire : le score d'une combinaison est la somme
+    des scores de ses éléments.
+
+    Chaque liste doit être triée par score décroissant. Les combinaisons sont
+    représentées par leurs indices ; un tas contient la frontière. Une
+    combinaison n'engendre que les successeurs obtenus en avançant une
+    position au moins égale à la dernière avancée, ce qui produit chaque
+    combinaison exactement une fois sans ensemble de combinaisons visitées.
+
+    :param ranked_lists: Pour chaque position, ses éléments triés par score décroissant.
+    :return: Un itérateur de (score total, tuple d'éléments).
+    """
+    if not ranked_lists or any(len(ranked) == 0 for ranked in ranked_lists):
+        return
+    counter = itertools.count()
+    start = (0,) * len(ranked_lists)
+    total = sum(ranked[0][0] for ranked in ranked_lists)
+    heap: List = [(-total, next(counter), start, 0)]
+    while heap:
+        neg_total, _, indices, last = heapq.heappop(heap)
+        yield -neg_total, tuple(ranked_lists[pos][i][1] for pos, i in enumerate(indices))
+        for pos in range(last, len(ranked_lists)):
+            i = indices[pos]
+            if i + 1 < len(ranked_lists[pos]):
+                ranked = ranked_lists[pos]
+                successor = indices[:pos] + (i + 1,) + indices[pos + 1:]
+                successor_total = -neg_total - ranked[i][0] + ranked[i + 1][0]
+                heapq.heappush(heap, (-successor_total, next(counter), successor, pos))
+
+def started(iterator: Iterator) -> Iterator:
+    """
+    Calcule tout de suite le premier élément de 'iterator', les suivants à la
+    demande : appelée dans un worker, elle y fait le travail préalable à la
+    première combinaison (relaxation et tri des clauses), et le thread qui
+    consomme l'itérateur ne construit que les combinaisons qu'il lit.
+    """
+    first = next(iterator, None)
+    if first is None:
+        return iter(())
+    return itertools.chain((first,), iterator)
@@ -0,0 +1,46 @@
+import threading
+from typing import Callable, Dict, Hashable, List, Tuple
+
+# Une alternative : (triplet relaxé, niveaux de relaxation (s, p, o), similarité)
+Alternative = Tuple[tuple, Tuple[int, int, int], float]
+
+class RelaxationCache:
+    """
+    Relaxations déjà calculées de chaque triplet, partagées par les threads
+    producteurs d'une stratégie. Un même triplet de la requête initiale
+    appartient au complément de plusieurs XSS : ses alternatives ordonnées
+    ne sont calculées qu'une fois, puis seulement recombinées.
+
+    Les alternatives sont stockées en tuples immuables ; chaque relaxation
+    crée ses propres clauses à partir d'elles (la provenance reste propre à
+    chaque clause).
+    """
+
+    def __init__(self):
+        self.entries: Dict[Hashable, Tuple[Alternative, ...]] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def alternatives(self, key: Hashable, relax: Callable[[], List[Alternative]]) -> Tuple[Alternative, ...]:
+        """
+        Alternatives de 'key' (triplet, ordre et profondeur de relaxation), calculées par
+        relax() au premier appel. Deux threads qui manquent la même clé au même
+        moment gardent le premier résultat enregistré.
+        """
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        # La relaxation peut interroger le graphe ou le endpoint : hors du verrou
+        computed = tuple(relax())
+        with self.lock:
+            return self.entries.setdefault(key, computed)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"<RelaxationCache | Triples: {len(self.entries)}, Hits: {self.hits}, Misses: {self.misses}>"
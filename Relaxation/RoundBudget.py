@@ -0,0 +1,49 @@
+from typing import Optional
+
+class RoundBudget:
+    """
+    Budgets du parcours par tours des stratégies XBS.
+
+    Chaque tour relaxe de 'depth_step' niveaux de plus les candidats qui ont
+    échoué au tour précédent (remontée dans la hiérarchie ou remplacement par
+    une variable), puis évalue les meilleurs. Par défaut, tous les niveaux
+    sont relaxés dès le premier tour, comme sans approfondissement. Un nouveau tour n'est lancé que si
+    les k réponses ne sont pas encore atteintes ; les budgets d'un tour
+    bornent son coût, et ce qu'il n'a pas traité passe au tour suivant.
+    """
+
+    def __init__(self, max_rounds: Optional[int] = None, max_executions: Optional[int] = None,
+                 max_seconds: Optional[float] = None, max_candidates: Optional[int] = None,
+                 depth_step: Optional[int] = None):
+        """
+        :param max_rounds: Nombre maximal de tours (None : jusqu'aux k réponses ou à l'épuisement
+                           des candidats ; 1 : une seule relaxation, sans approfondissement).
+        :param max_executions: Évaluations de requêtes candidates par tour (None : sans limite).
+        :param max_seconds: Durée d'un tour, en secondes (None : sans limite).
+        :param max_candidates: Candidats relaxés ajoutés à la frontière par tour (None : sans limite).
+        :param depth_step: Niveaux de hiérarchie remontés à chaque tour (None : tous dès le
+                           premier tour, comme sans approfondissement ; 1 : approfondissement
+                           niveau par niveau, les candidats proches étant évalués d'abord).
+        """
+        self.max_rounds = max_rounds
+        self.max_executions = max_executions
+        self.max_seconds = max_seconds
+        self.max_candidates = max_candidates
+        self.depth_step = depth_step
+
+    def allows_round(self, round: int) -> bool:
+        """Vrai si le tour numéro 'round' (à partir de 0) peut être lancé."""
+        return self.max_rounds is None or round < self.max_rounds
+
+    def round_over(self, executions: int, elapsed: float) -> bool:
+        """Vrai si le tour a épuisé son budget d'évaluations ou de temps."""
+        return ((self.max_executions is not None and executions >= self.max_executions)
+                or (self.max_seconds is not None and elapsed >= self.max_seconds))
+
+    def frontier_full(self, produced: int) -> bool:
+        """Vrai si le tour a déjà ajouté assez de candidats à la frontière."""
+        return self.max_candidates is not None and produced >= self.max_candidates
+
+    def __repr__(self) -> str:
+        return (f"<RoundBudget | Rounds: {self.max_rounds}, Executions: {self.max_executions}, "
+                f"Seconds: {self.max_seconds}, Candidates: {self.max_candidates}, Depth step: {self.depth_step}>")
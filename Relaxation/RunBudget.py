@@ -0,0 +1,64 @@
+import time
+from typing import Optional
+
+class RunBudget:
+    """
+    Budget global d'une exécution de stratégie (XBS, XBSv2, MBS), pour répondre
+    avec une latence bornée : durée totale, nombre d'évaluations de requêtes
+    candidates et délai de chaque évaluation.
+
+    Quand le budget est épuisé avant les k réponses, la stratégie s'arrête et
+    garde les réponses et requêtes réparées déjà trouvées, en levant son
+    indicateur 'partial'. Une évaluation qui dépasse son délai rend aussi le
+    résultat partiel : en mémoire, ses solutions déjà produites sont gardées ;
+    sur un endpoint, elle compte comme un échec.
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_executions: Optional[int] = None,
+                 query_timeout: Optional[float] = None):
+        """
+        :param max_seconds: Durée maximale de l'exécution, en secondes (None : sans limite).
+        :param max_executions: Évaluations de requêtes candidates (None : sans limite).
+        :param query_timeout: Délai d'une évaluation, en secondes (None : celui de l'évaluateur) ;
+                              il est toujours borné par le temps restant.
+        """
+        self.max_seconds = max_seconds
+        self.max_executions = max_executions
+        self.query_timeout = query_timeout
+        self.start_time = time.time()
+
+    def start(self):
+        """Début de l'exécution : le temps est compté à partir d'ici."""
+        self.start_time = time.time()
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def remaining(self) -> Optional[float]:
+        """Secondes restantes (None : sans limite de temps)."""
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def exhausted(self, executions: int) -> bool:
+        """Vrai si l'exécution a épuisé son budget d'évaluations ou de temps."""
+        return ((self.max_executions is not None and executions >= self.max_executions)
+                or (self.max_seconds is not None and self.elapsed() >= self.max_seconds))
+
+    def executions_left(self, executions: int) -> Optional[int]:
+        """Évaluations encore permises (None : sans limite)."""
+        if self.max_executions is None:
+            return None
+        return max(0, self.max_executions - executions)
+
+    def timeout(self) -> Optional[float]:
+        """Délai de la prochaine évaluation : query_timeout, borné par le temps restant."""
+        remaining = self.remaining()
+        if remaining is None:
+            return self.query_timeout
+        remaining = max(remaining, 0.01)  # Un délai nul est refusé par les clients HTTP
+        return remaining if self.query_timeout is None else min(self.query_timeout, remaining)
+
+    def __repr__(self) -> str:
+        return (f"<RunBudget | Seconds: {self.max_seconds}, Executions: {self.max_executions}, "
+                f"Query timeout: {self.query_timeout}>")
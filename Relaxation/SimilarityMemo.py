@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Sequence
+
+ELEMENT_TYPES = ['subject', 'predicate', 'object']
+
+class TripleScoreMemo:
+    """
+    Mémoire LRU des scores de triplets, indexée par (triplet original, triplet
+    relaxé). Une même clause relaxée apparaît dans de nombreuses candidates :
+    son score n'est calculé qu'une fois tant qu'il reste parmi les 'maxsize'
+    derniers utilisés. Partagée sans risque entre les threads producteurs.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], float]) -> float:
+        """Score mémorisé pour 'key', calculé par compute() s'il est absent."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        # Le calcul peut interroger un endpoint : il se fait hors du verrou
+        value = compute()
+        with self.lock:
+            self.entries[key] = value
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def clause_score(calculator, clause, originals) -> float:
+    """
+    Somme des similarités des composantes de 'clause' par rapport à sa clause
+    d'origine (0 si elle ne provient d'aucune clause de 'originals').
+    """
+    if clause.origin not in originals:
+        return 0.0
+    return calculator.triple_score(clause.origin.triple, clause.triple)
+
+def delta_similarity(calculator, query: Sequence, parent_score: float,
+                     parent: Sequence, child: Sequence) -> float:
+    """
+    Similarité de 'child' déduite de celle de 'parent' : seules les clauses
+    qui diffèrent entre les deux requêtes sont évaluées, les autres gardent
+    leur contribution au score du parent. Pour un enfant obtenu en relaxant
+    une seule clause, le coût est celui de deux scores de triplets mémorisés.
+
+    La moyenne porte sur les clauses de 'query' (chaque clause relaxée provient
+    d'une clause distincte de la requête initiale).
+    """
+    if not query:
+        return 0.0
+    originals = set(query)
+    parent_clauses, child_clauses = set(parent), set(child)
+    gained = sum(clause_score(calculator, c, originals) for c in child if c not in parent_clauses)
+    lost = sum(clause_score(calculator, c, originals) for c in parent if c not in child_clauses)
+    return parent_score + (gained - lost) / (len(query) * len(ELEMENT_TYPES))
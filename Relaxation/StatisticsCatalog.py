@@ -0,0 +1,151 @@
+import json
+import math
+import os
+import time
+from collections import Counter
+from typing import Dict, Optional
+from rdflib import RDF, Graph
+from rdflib.util import from_n3
+
+class StatisticsCatalog:
+    """
+    Statistiques d'un graphe RDF utilisées par le calcul de similarité,
+    construites en un seul parcours des triplets :
+     - nombre d'instances de chaque classe,
+     - nombre de triplets de chaque prédicat,
+     - nombre total d'instances typées et de triplets.
+
+    Les IC (contenu informationnel) sont mémorisés au premier calcul. Le
+    catalogue suit les ajouts et suppressions faits par add() et remove().
+    """
+
+    def __init__(self, graph: Optional[Graph] = None):
+        """
+        :param graph: Le graphe à analyser (un catalogue vide si None).
+        """
+        self.graph = graph
+        self.class_counts: Counter = Counter()      # classe -> nombre d'instances
+        self.predicate_counts: Counter = Counter()  # prédicat -> nombre de triplets
+        self.type_counts: Counter = Counter()       # sujet -> nombre de types déclarés
+        self.total_triples = 0
+        self.instances: Optional[int] = None        # Total fixé (catalogue chargé sans graphe)
+        self.version = 0                            # Incrémenté à chaque modification
+        self._ic_class: Dict = {}
+        self._ic_property: Dict = {}
+        if graph is not None:
+            for triple in graph:
+                self._count(triple, 1)
+
+    @property
+    def total_instances(self) -> int:
+        """Nombre de sujets distincts ayant au moins un rdf:type."""
+        return self.instances if self.instances is not None else len(self.type_counts)
+
+    def _count(self, triple, delta: int):
+        s, p, o = triple
+        self.total_triples += delta
+        self.predicate_counts[p] += delta
+        if self.predicate_counts[p] <= 0:
+            del self.predicate_counts[p]
+        if p == RDF.type:
+            self.class_counts[o] += delta
+            if self.class_counts[o] <= 0:
+                del self.class_counts[o]
+            self.type_counts[s] += delta
+            if self.type_counts[s] <= 0:
+                del self.type_counts[s]
+        # Les totaux ont changé : tous les IC sont à recalculer
+        self.version += 1
+        self._ic_class.clear()
+        self._ic_property.clear()
+
+    def add(self, triple):
+        """Ajoute 'triple' au graphe et met à jour les statistiques s'il est nouveau."""
+        if self.graph is not None:
+            if triple in self.graph:
+                return
+            self.graph.add(triple)
+        self._count(triple, 1)
+
+    def remove(self, triple):
+        """Retire 'triple' du graphe et met à jour les statistiques s'il était présent."""
+        if self.graph is not None:
+            if triple not in self.graph:
+                return
+            self.graph.remove(triple)
+        self._count(triple, -1)
+
+    @classmethod
+    def from_counts(cls, class_counts: Dict, predicate_counts: Dict,
+                    total_instances: int, total_triples: int) -> "StatisticsCatalog":
+        """
+        Catalogue construit à partir de comptes déjà agrégés (par exemple
+        obtenus d'un endpoint). Sans le détail des types par sujet, le
+        nombre total d'instances n'y est pas mis à jour par add() et remove().
+        """
+        catalog = cls()
+        catalog.class_counts.update(class_counts)
+        catalog.predicate_counts.update(predicate_counts)
+        catalog.instances = total_instances
+        catalog.total_triples = total_triples
+        return catalog
+
+    def save(self, path: str, source: str = ""):
+        """Enregistre les comptes dans un fichier JSON ('source' identifie les données)."""
+        snapshot = {
+            "source": source,
+            "created": time.time(),
+            "classes": {term.n3(): n for term, n in self.class_counts.items()},
+            "predicates": {term.n3(): n for term, n in self.predicate_counts.items()},
+            "total_instances": self.total_instances,
+            "total_triples": self.total_triples,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+
+    @classmethod
+    def load(cls, path: str, source: str = "", ttl: Optional[float] = None) -> Optional["StatisticsCatalog"]:
+        """
+        Recharge un catalogue enregistré par save(). Retourne None si le
+        fichier n'existe pas, concerne une autre source ou a plus de 'ttl' secondes.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Instantané de statistiques illisible : {e}")
+            return None
+        if snapshot.get("source") != source:
+            return None
+        if ttl is not None and time.time() - snapshot.get("created", 0) > ttl:
+            return None
+        return cls.from_counts(
+            {from_n3(term): n for term, n in snapshot["classes"].items()},
+            {from_n3(term): n for term, n in snapshot["predicates"].items()},
+            snapshot["total_instances"], snapshot["total_triples"],
+        )
+
+    def pr_class(self, cls) -> float:
+        total = self.total_instances
+        return self.class_counts.get(cls, 0) / total if total else 0
+
+    def pr_property(self, prop) -> float:
+        return self.predicate_counts.get(prop, 0) / self.total_triples if self.total_triples else 0
+
+    def ic_class(self, cls) -> float:
+        if cls not in self._ic_class:
+            pr = self.pr_class(cls)
+            self._ic_class[cls] = -math.log(pr) if pr > 0 else 0
+        return self._ic_class[cls]
+
+    def ic_property(self, prop) -> float:
+        if prop not in self._ic_property:
+            pr = self.pr_property(prop)
+            self._ic_property[prop] = -math.log(pr) if pr > 0 else 0
+        return self._ic_property[prop]
+
+    def __repr__(self) -> str:
+        return (f"<StatisticsCatalog | Classes: {len(self.class_counts)}, Predicates: {len(self.predicate_counts)}, "
+                f"Instances: {self.total_instances}, Triples: {self.total_triples}>")
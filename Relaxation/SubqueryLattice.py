@@ -0,0 +1,291 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.RunBudget import RunBudget
+
+class BudgetExhausted(Exception):
+    """Levée par SubqueryLattice.fails quand le budget d'exécution est épuisé."""
+
+
+class SubqueryLattice:
+    """
+    Treillis des sous-requêtes d'une requête conjonctive.
+
+    Chaque sous-requête est identifiée par le masque de ses clauses (le bit i
+    correspond à la i-ième clause) : inclusion, union et différence sont des
+    opérations sur des entiers. Une sous-requête est évaluée au plus une
+    fois ; les autres résultats sont déduits par monotonie :
+     - tout sur-ensemble d'une sous-requête qui échoue échoue,
+     - tout sous-ensemble d'une sous-requête qui réussit réussit.
+
+    Avec un budget (RunBudget), aucune sous-requête n'est exécutée une fois
+    le budget épuisé : minimal_failing_subqueries et mfs_and_xss rendent
+    alors ce qu'elles ont déjà trouvé et lèvent 'partial'.
+    """
+
+    def __init__(self, query: ConjunctiveQuery, fails: Callable[[ConjunctiveQuery], bool],
+                 cache: Optional[OutcomeCache] = None, k: int = 0,
+                 fails_batch: Optional[Callable[[List[ConjunctiveQuery]], List[bool]]] = None,
+                 budget: Optional[RunBudget] = None, executions: int = 0):
+        """
+        :param query: La requête initiale (sommet du treillis).
+        :param fails: Fonction qui exécute une sous-requête et retourne True si elle échoue
+                      (None si son délai est dépassé : elle est alors prise pour un
+                      échec, sans être mise en cache).
+        :param cache: Cache persistant consulté avant toute exécution.
+        :param k: Seuil du test d'échec (au plus k solutions), utilisé pour le cache.
+        :param fails_batch: Fonction optionnelle qui teste plusieurs sous-requêtes en
+                            un seul appel (par exemple une requête SPARQL groupée).
+        :param budget: Budget de l'exécution dont l'analyse fait partie (None : sans limite).
+        :param executions: Exécutions déjà comptées dans ce budget avant l'analyse.
+        """
+        self.query = query
+        self.clauses = list(query.clauses)
+        self.bits = [1 << i for i in range(len(self.clauses))]
+        self.top: int = (1 << len(self.clauses)) - 1
+        self._fails = fails
+        self._fails_batch = fails_batch
+        self.cache = cache
+        self.k = k
+        self.known: Dict[int, bool] = {}
+        self.failing: List[int] = []     # Échecs minimaux connus
+        self.succeeding: List[int] = []  # Succès maximaux connus
+        self.mfs: List[int] = []         # MFS trouvées par iter_xss (masques)
+        self.evaluations = 0  # Sous-requêtes réellement exécutées
+        self.skipped = 0      # Sous-requêtes résolues sans exécution
+        self.cached = 0       # Dont résolues par le cache persistant
+        self.batches = 0      # Appels d'évaluation (un appel groupé compte pour un)
+        self.timeouts = 0     # Sous-requêtes dont le délai a été dépassé
+        self.budget = budget
+        self.executions = executions
+        self.partial = False  # Le budget ou un délai a interrompu l'analyse
+
+    def subquery(self, key: int) -> ConjunctiveQuery:
+        """Construit la sous-requête correspondant à 'key' en conservant l'ordre des clauses."""
+        sub = ConjunctiveQuery()
+        sub.clauses = [clause for clause, bit in zip(self.clauses, self.bits) if key & bit]
+        sub.selected_vars = self.query.selected_vars.copy()
+        return sub
+
+    def infer(self, key: int):
+        """
+        Retourne True (échec), False (succès) ou None si le statut de 'key'
+        ne peut pas être déduit des sous-requêtes déjà évaluées.
+        """
+        if key in self.known:
+            return self.known[key]
+        if any(f & ~key == 0 for f in self.failing):
+            return True
+        if any(key & ~s == 0 for s in self.succeeding):
+            return False
+        return None
+
+    def record(self, key: int, failed: bool):
+        """Enregistre le statut de 'key' et met à jour les antichaînes de déduction."""
+        self.known[key] = failed
+        if failed:
+            if not any(f & ~key == 0 for f in self.failing):
+                self.failing = [f for f in self.failing if key & ~f != 0]
+                self.failing.append(key)
+        elif not any(key & ~s == 0 for s in self.succeeding):
+            self.succeeding = [s for s in self.succeeding if s & ~key != 0]
+            self.succeeding.append(key)
+
+    def fails(self, key: int) -> bool:
+        """
+        Vrai si la sous-requête 'key' échoue ; l'exécute seulement si nécessaire.
+        La sous-requête vide est considérée comme satisfaite, comme dans la
+        recherche exhaustive qui s'arrête aux clauses seules.
+        """
+        status = self.resolve(key)
+        if status is not None:
+            return status
+        self.check_budget()
+        sub = self.subquery(key)
+        self.evaluations += 1
+        self.batches += 1
+        failed = self._fails(sub)
+        if failed is None:
+            # Délai dépassé : statut inconnu, pris pour un échec mais pas mis en cache
+            self.timeouts += 1
+            self.partial = True
+            self.record(key, True)
+            return True
+        self.store(key, sub, failed)
+        return failed
+
+    def check_budget(self):
+        """Lève BudgetExhausted si le budget ne permet plus d'exécuter de sous-requête."""
+        if self.budget is not None and self.budget.exhausted(self.executions + self.evaluations):
+            self.partial = True
+            raise BudgetExhausted()
+
+    def resolve(self, key: int):
+        """
+        Statut de 'key' sans exécution (déduction ou cache persistant),
+        ou None s'il faut l'exécuter.
+        """
+        if not key:
+            return False
+        status = self.infer(key)
+        if status is not None:
+            self.skipped += 1
+            self.known[key] = status
+            return status
+        if self.cache is not None:
+            status = self.cache.lookup(self.subquery(key), self.k)
+            if status is not None:
+                self.skipped += 1
+                self.cached += 1
+                self.record(key, status)
+                return status
+        return None
+
+    def store(self, key: int, sub: ConjunctiveQuery, failed: bool):
+        """Enregistre le résultat d'une exécution dans le treillis et dans le cache."""
+        self.record(key, failed)
+        if self.cache is not None:
+            self.cache.store(sub, failed, self.k)
+
+    def fails_many(self, keys: List[int]) -> List[bool]:
+        """
+        Statut de plusieurs sous-requêtes, dans l'ordre de 'keys'. Si une
+        évaluation groupée est disponible, toutes les sous-requêtes qui ne
+        peuvent pas être déduites sont testées en un seul appel.
+        """
+        if self._fails_batch is None:
+            return [self.fails(key) for key in keys]
+        pending = []
+        for key in keys:
+            if key not in pending and self.resolve(key) is None:
+                pending.append(key)
+        if pending:
+            self.check_budget()
+            left = self.budget.executions_left(self.executions + self.evaluations) if self.budget else None
+            if left is not None and left < len(pending):
+                pending = pending[:left]  # Le reste est refusé à l'appel suivant
+            subs = [self.subquery(key) for key in pending]
+            self.evaluations += len(pending)
+            self.batches += 1
+            for key, sub, failed in zip(pending, subs, self._fails_batch(subs)):
+                self.store(key, sub, failed)
+        if any(key and key not in self.known for key in keys):
+            self.check_budget()
+        return [self.known[key] if key else False for key in keys]
+
+    def children(self, key: int) -> List[int]:
+        """Sous-requêtes obtenues en retirant une seule clause de 'key'."""
+        if key.bit_count() <= 1:
+            return []
+        return [key & ~bit for bit in self.bits if key & bit]
+
+    def minimal_failing_subqueries(self) -> List[ConjunctiveQuery]:
+        """
+        Parcourt le treillis niveau par niveau à partir du sommet et retourne
+        toutes les MFS. Une sous-requête est une MFS si elle échoue et si toutes
+        ses sous-requêtes immédiates réussissent. Si le budget s'épuise, seules
+        les MFS déjà trouvées sont rendues.
+        """
+        all_mfs = []
+        try:
+            if not self.fails(self.top):
+                return []
+            level = [self.top]
+            while level:
+                candidates = {}
+                for key in level:
+                    for child in self.children(key):
+                        candidates.setdefault(child, None)
+                keys = list(candidates)
+                outcomes = dict(zip(keys, self.fails_many(keys)))
+                for key in level:
+                    if not any(outcomes[child] for child in self.children(key)):
+                        all_mfs.append(key)
+                level = [key for key in keys if outcomes[key]]
+        except BudgetExhausted:
+            pass
+        return [self.subquery(key) for key in all_mfs]
+
+    def find_an_mfs(self, key: int) -> int:
+        """
+        Extrait une MFS d'une sous-requête qui échoue en O(n) évaluations :
+        chaque clause est retirée tant que la sous-requête restante échoue encore.
+        """
+        mfs = key
+        for bit in self.bits:
+            if mfs & bit and self.fails(mfs & ~bit):
+                mfs &= ~bit
+        return mfs
+
+    def factorize(self, keys: List[int], mfs: int, xss: List[int]) -> List[int]:
+        """
+        Factorisation maximale : remplace chaque sous-requête de 'keys' qui
+        contient 'mfs' par ses sous-requêtes maximales qui ne la contiennent
+        plus, puis ne garde que les sous-requêtes maximales non couvertes par
+        une XSS déjà trouvée.
+        """
+        factors = {}
+        for key in keys:
+            if mfs & ~key == 0:
+                for bit in self.bits:
+                    if mfs & bit:
+                        factors.setdefault(key & ~bit, None)
+            else:
+                factors.setdefault(key, None)
+        candidates = list(factors)
+        return [
+            key for key in candidates
+            if not any(key != other and key & ~other == 0 for other in candidates)
+            and not any(key & ~s == 0 for s in xss)
+        ]
+
+    def iter_xss(self) -> Iterator[ConjunctiveQuery]:
+        """
+        Algorithme LBA : trouve une MFS en O(n) évaluations, factorise le
+        treillis en sous-requêtes maximales qui l'évitent, puis teste chacune :
+        si elle réussit c'est une XSS, sinon elle contient une nouvelle MFS.
+        Le nombre d'évaluations est polynomial en nombre de MFS et de XSS.
+
+        Chaque XSS est produite dès que son succès est testé, avant la fin de
+        l'analyse ; les MFS trouvées s'ajoutent à self.mfs au fil de l'analyse.
+        Si le budget s'épuise, la génération s'arrête.
+        """
+        self.mfs = []
+        all_xss = []
+        try:
+            if not self.fails(self.top):
+                yield self.subquery(self.top)
+                return
+            first = self.find_an_mfs(self.top)
+            self.mfs.append(first)
+            pxss = self.factorize([self.top], first, all_xss)
+            while pxss:
+                if self._fails_batch is not None:
+                    # Toutes les sous-requêtes maximales en attente sont testées en un appel
+                    self.fails_many([key for key in pxss if key not in self.known])
+                key = pxss.pop(0)
+                if not self.fails(key):
+                    all_xss.append(key)
+                    yield self.subquery(key)
+                    continue
+                mfs = self.find_an_mfs(key)
+                self.mfs.append(mfs)
+                pxss = self.factorize([key] + pxss, mfs, all_xss)
+        except BudgetExhausted:
+            pass
+
+    def mfs_and_xss(self) -> Tuple[List[ConjunctiveQuery], List[ConjunctiveQuery]]:
+        """
+        Toutes les MFS et toutes les XSS (algorithme LBA, voir iter_xss).
+        Si le budget s'épuise, les MFS et XSS déjà trouvées sont rendues.
+        """
+        xss_list = list(self.iter_xss())
+        return [self.subquery(k) for k in self.mfs], xss_list
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre d'évaluations effectuées, évitées, résolues par le cache, et d'appels."""
+        return {"evaluations": self.evaluations, "skipped": self.skipped,
+                "cached": self.cached, "batches": self.batches, "timeouts": self.timeouts}
+
+    def __repr__(self) -> str:
+        return f"<SubqueryLattice | Clauses: {len(self.clauses)}, Evaluations: {self.evaluations}, Skipped: {self.skipped}>"
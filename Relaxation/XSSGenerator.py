@@ -1,77 +1,62 @@
-from itertools import product
-from typing import List, Set
+from typing import Iterator, List, Optional, Set, Union
 from rdflib import Graph, Literal, URIRef
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
 from Query.SimpleLiteral import SimpleLiteral
 from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Relaxation.HittingSets import iter_minimal_hitting_sets, iter_xss
+from Relaxation.OutcomeCache import OutcomeCache
+from Relaxation.QueryEvaluator import QueryEvaluator
+from Relaxation.SubqueryLattice import SubqueryLattice
 
 class XSSGenerator:
+    @staticmethod
     def generate_combinations(queries: List[ConjunctiveQuery]) -> List[ConjunctiveQuery]:
         """
-        Génère toutes les combinaisons non redondantes entre les clauses des requêtes
-        selon les exemples fournis
+        Génère les ensembles minimaux de clauses contenant au moins une clause
+        de chaque requête (ensembles intersectants minimaux, MMCS). Chaque
+        ensemble n'apparaît qu'une fois, quel que soit l'ordre des clauses.
+        """
+        return list(iter_minimal_hitting_sets(queries))
+
+    @staticmethod
+    def iter_xss(main_query: ConjunctiveQuery, mfs_list: List[ConjunctiveQuery]) -> Iterator[ConjunctiveQuery]:
+        """
+        Produit les XSS une à une à partir des MFS déjà connues, sans
+        comparaison deux à deux : chaque XSS produite est maximale et unique.
         """
-        # Extraction des clauses uniques de chaque requête
-        clauses_sets = [q.clauses for q in queries]
-        
-        # Génération du produit cartésien
-        combinations = product(*clauses_sets)
-        
-        # Création des combinaisons uniques
-        seen = set()
-        result = []
-        
-        for combo in combinations:
-            # Fusion des clauses en gardant l'ordre d'apparition
-            merged = []
-            for clause in combo:
-                if clause not in merged:
-                    merged.append(clause)
-            
-            # Vérification de l'unicité
-            key = tuple(merged)
-            if key not in seen:
-                seen.add(key)
-                q=ConjunctiveQuery()
-                q.clauses=merged
-                result.append(q)
-        
-        return result
+        return iter_xss(main_query, mfs_list)
 
     @staticmethod
-    def compute_xss(main_query: ConjunctiveQuery,g:Graph) -> List[ConjunctiveQuery]:
-        mfs_list = QueryFailureAnalyzer.find_all_failing_causes(main_query, g)
+    def stream_xss(main_query: ConjunctiveQuery, g: Union[Graph, QueryEvaluator], cache: Optional[OutcomeCache] = None,
+                   lattice: Optional[SubqueryLattice] = None) -> Iterator[ConjunctiveQuery]:
+        """
+        Produit les XSS de la requête au fil de l'algorithme LBA, chacune dès que
+        son succès est testé (SubqueryLattice.iter_xss) : l'appelant peut traiter
+        les premières pendant que l'analyse continue. Contrairement à iter_xss,
+        les MFS n'ont pas à être connues d'avance. Les MFS trouvées sont
+        affichées à la fin de l'analyse.
+        """
+        if lattice is None:
+            lattice = QueryFailureAnalyzer.lattice(main_query, g, cache=cache)
+        yield from lattice.iter_xss()
         print(f"\n MFS trouvees:\n")
-        for i, mfs in enumerate(mfs_list, 1):
+        for i, mfs in enumerate(lattice.mfs, 1):
             print(f"MFS {i}:")
-            print([j.label for j in mfs.clauses])
+            print([j.label for j in lattice.subquery(mfs).clauses])
             print("-"*50)
+        print(f"Evaluations: {lattice.evaluations}, evitees: {lattice.skipped} (cache: {lattice.cached})")
         print("\n")
-        cand=XSSGenerator.generate_combinations(mfs_list)
-        result_queries = []
-        main_triples = main_query.clauses
-
-        for pattern in cand:
-            # Calcul de la différence : Q \ (ensemble des triplets de pattern)
-            diff_triples = set(main_triples) - set(pattern.clauses)
-            new_query = ConjunctiveQuery()
-            new_query.clauses = diff_triples  # Affectation directe de l'ensemble résultant
 
-            # Vérification pour s'assurer que new_query n'est pas une sous-requête
-            # d'une autre déjà présente dans result_queries.
-            is_subquery = False
-            indices_to_remove = []
-            for idx, existing_query in enumerate(result_queries):
-                # Si new_query est inclus dans existing_query, on ne l'ajoute pas.
-                if new_query.clauses <= set(existing_query.clauses):
-                    is_subquery = True
-                    break
-                # Si l'existant est inclus dans new_query, on le retire.
-                elif set(existing_query.clauses) <= new_query.clauses:
-                    indices_to_remove.append(idx)
-            if not is_subquery:
-                # Supprimez les requêtes qui sont des sous-requêtes de new_query.
-                for idx in sorted(indices_to_remove, reverse=True):
-                    del result_queries[idx]
-                result_queries.append(new_query)
-        return result_queries
+    @staticmethod
+    def compute_xss(main_query: ConjunctiveQuery, g: Union[Graph, QueryEvaluator], cache: Optional[OutcomeCache] = None,
+                    lattice: Optional[SubqueryLattice] = None) -> List[ConjunctiveQuery]:
+        """
+        Calcule les XSS de la requête avec l'algorithme LBA : les MFS et les XSS
+        sont obtenues ensemble, chaque sous-requête étant exécutée au plus une fois.
+        Le cache persistant optionnel évite de réexécuter les sous-requêtes
+        déjà rencontrées dans d'autres requêtes. 'g' peut être le graphe ou
+        l'évaluateur de la stratégie appelante. Passer 'lattice' (par exemple
+        construit avec le budget de la stratégie) permet d'en relire ensuite
+        le nombre d'évaluations et l'indicateur 'partial'.
+        """
+        return list(XSSGenerator.stream_xss(main_query, g, cache, lattice))
@@ -6,6 +6,9 @@ from Query.SimpleLiteral import SimpleLiteral
 from rdflib import RDFS
 
 from Relaxation.parser import SparqlTripletParser
+from Relaxation.HierarchyIndex import HierarchyIndex
+from Relaxation.RankedProduct import ranked_product
+from Relaxation.SimilarityMemo import ELEMENT_TYPES
 from Relaxation.parser2 import expand_sparql
 from Relaxation.similarite import SimilarityCalculator as Sim
 # ---------------------------
@@ -48,31 +51,31 @@ def similarity_measure_property(original_node, relaxed_node):
         return 0.9
     return 0.9  # Default for superproperty or other relaxations
 
-def get_super_classes(uri, graph):
+def get_super_classes(uri, graph, hierarchy=None):
     """
-    Retrieve superclasses for a URIRef from the graph.
-    Returns a dict {superclass: relaxation_level}.
+    Retrieve all superclasses of a URIRef, from the hierarchy index of the graph.
+    Returns a dict {superclass: relaxation_level}, the level being the
+    distance to the superclass in the rdfs:subClassOf hierarchy.
     """
     if not isinstance(uri, URIRef):
         return {}
-    super_classes = {}
-    for _, _, super_class in graph.triples((uri, RDFS.subClassOf, None)):
-        super_classes[super_class] = 1
+    hierarchy = hierarchy or HierarchyIndex.for_graph(graph)
+    super_classes = dict(hierarchy.super_classes(uri))
     if not super_classes:
         default_super = URIRef(str(uri))
         super_classes[default_super] = 1
     return super_classes
 
-def get_super_properties(uri, graph):
+def get_super_properties(uri, graph, hierarchy=None):
     """
-    Retrieve superproperties for a URIRef from the graph.
-    Returns a dict {superproperty: relaxation_level}.
+    Retrieve all superproperties of a URIRef, from the hierarchy index of the graph.
+    Returns a dict {superproperty: relaxation_level}, the level being the
+    distance to the superproperty in the rdfs:subPropertyOf hierarchy.
     """
     if not isinstance(uri, URIRef):
         return {}
-    super_properties = {}
-    for _, _, super_property in graph.triples((uri, RDFS.subPropertyOf, None)):
-        super_properties[super_property] = 1
+    hierarchy = hierarchy or HierarchyIndex.for_graph(graph)
+    super_properties = dict(hierarchy.super_properties(uri))
     if not super_properties:
         default_super = URIRef(uri)
         super_properties[default_super] = 1
@@ -82,6 +85,8 @@ def get_super_properties(uri, graph):
 # Relaxed Node Class
 # ---------------------------
 class NodeRelaxed:
+    __slots__ = ("node_1", "node_2", "node_3", "similarity", "relaxation_levels", "_query")
+
     def __init__(self, node_1, node_2, node_3, similarity, relaxation_levels):
         """
         node_1: subject
@@ -93,11 +98,21 @@ class NodeRelaxed:
         self.node_1 = node_1
         self.node_2 = node_2
         self.node_3 = node_3
-        self.query=ConjunctiveQuery()
-        self.query.add_clause(SimpleLiteral((self.node_1,self.node_2,self.node_3)))
+        self._query = None
         self.similarity = similarity
         self.relaxation_levels = relaxation_levels
 
+    @property
+    def query(self):
+        """
+        Single-clause query of the relaxed triple, built on first access: the
+        partial relaxations combined by merge() never need one.
+        """
+        if self._query is None:
+            self._query = ConjunctiveQuery()
+            self._query.add_clause(SimpleLiteral((self.node_1, self.node_2, self.node_3)))
+        return self._query
+
     @staticmethod
     def merge(relax_s, relax_p, relax_o):
         """
@@ -118,14 +133,19 @@ class NodeRelaxed:
 # Triple Relaxation Class
 # ---------------------------
 class TripleRelaxation:
-    def __init__(self, clause, graph, order=SIM_ORDER):
+    def __init__(self, clause, graph, order=SIM_ORDER, hierarchy=None, max_depth=None):
         """
         clause: RDF triple as a tuple (subject, predicate, object) using rdflib.
         graph: RDF graph (rdflib.Graph).
         order: Relaxation order (SIM_ORDER by default).
+        hierarchy: HierarchyIndex giving the ancestors (by default, the shared index of graph).
+        max_depth: Keep only the ancestors at most max_depth levels up (None: all of them);
+                   a node is replaced by a variable only once no ancestor is left out.
         """
         global num_resource_release, num_pred_release
         self.graph = graph  # Changed from session to graph for clarity
+        self.hierarchy = hierarchy or HierarchyIndex.for_graph(graph)
+        self.max_depth = max_depth
         self.current_clause = clause
         self.relaxation_order = order
         self.subject_var = None
@@ -139,6 +159,12 @@ class TripleRelaxation:
 
         self.triple_relaxation(clause)
 
+    def within_depth(self, ancestors):
+        """Ancestors {node: level} no more than max_depth levels up."""
+        if self.max_depth is None:
+            return ancestors
+        return {node: level for node, level in ancestors.items() if level <= self.max_depth}
+
     def relax_node(self, original_node):
         """
         Relax a node (subject or object), handling both URIRef and Literal.
@@ -148,11 +174,14 @@ class TripleRelaxation:
         relaxed_node = {}
         if isinstance(original_node, URIRef):
             relaxed_node[original_node] = 0  # Keep original
-            relaxed_node.update(get_super_classes(original_node, self.graph))  # Add superclasses
-            var_name = f"R{num_resource_release}"
-            num_resource_release += 1
-            var_node = Variable(var_name)
-            relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
+            ancestors = get_super_classes(original_node, self.graph, self.hierarchy)
+            kept = self.within_depth(ancestors)
+            relaxed_node.update(kept)  # Add superclasses
+            if len(kept) == len(ancestors):  # The variable comes once the hierarchy is exhausted
+                var_name = f"R{num_resource_release}"
+                num_resource_release += 1
+                var_node = Variable(var_name)
+                relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
         elif isinstance(original_node, Literal):
             relaxed_node[original_node] = 0  # Keep original
             var_name = f"R{num_resource_release}"
@@ -172,11 +201,14 @@ class TripleRelaxation:
         relaxed_node = {}
         if isinstance(original_node, URIRef):
             relaxed_node[original_node] = 0  # Keep original
-            relaxed_node.update(get_super_properties(original_node, self.graph))  # Add superproperties
-            var_name = f"P{num_pred_release}"
-            num_pred_release += 1
-            var_node = Variable(var_name)
-            relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
+            ancestors = get_super_properties(original_node, self.graph, self.hierarchy)
+            kept = self.within_depth(ancestors)
+            relaxed_node.update(kept)  # Add superproperties
+            if len(kept) == len(ancestors):  # The variable comes once the hierarchy is exhausted
+                var_name = f"P{num_pred_release}"
+                num_pred_release += 1
+                var_node = Variable(var_name)
+                relaxed_node[var_node] = SUPPRESS_NODE_LEVEL  # Replace with variable
         elif isinstance(original_node, Literal):
             relaxed_node[original_node] = 0  # Keep original
             var_name = f"P{num_pred_release}"
@@ -249,7 +281,8 @@ class TripleRelaxation:
         self.current_elt = 1
 
 class ConjunctiveQueryRelaxation:
-    def __init__(self, query: ConjunctiveQuery, graph: Graph, order=SIM_ORDER):
+    def __init__(self, query: ConjunctiveQuery, graph: Graph, order=SIM_ORDER, hierarchy=None, cache=None,
+                 max_depth=None):
         """
         Initialise la relaxation d'une requête conjonctive.
         
@@ -257,47 +290,121 @@ class ConjunctiveQueryRelaxation:
             query (ConjunctiveQuery): La requête initiale contenant plusieurs clauses.
             graph (Graph): La base de données RDF (un rdflib.Graph).
             order (int): L'ordre de relaxation (par défaut SIM_ORDER).
+            hierarchy (HierarchyIndex): Hiérarchie des classes et propriétés (par défaut,
+                                        l'index partagé de graph ; voir HierarchyIndex.from_file
+                                        pour une ontologie comme univ-bench.owl).
+            cache (RelaxationCache): Relaxations des triplets partagées entre plusieurs
+                                     requêtes (par exemple par les producteurs de ParallelXBS).
+            max_depth (int): Niveaux de hiérarchie remontés en une relaxation (None : tous) ;
+                             une clause déjà relaxée peut l'être de nouveau pour monter plus haut.
         """
         self.query = query
         self.graph = graph
         self.order = order
+        self.hierarchy = hierarchy
+        self.cache = cache
+        self.max_depth = max_depth
 
-    def relax_query(self):
+    def triple_alternatives(self, clause):
         """
-        Génère des versions relaxées de la requête conjonctive en relaxant chacune de ses clauses.
-        
+        Versions relaxées du triplet de 'clause', dans l'ordre de TripleRelaxation.
+
         Returns:
-            list: Liste des requêtes (ConjunctiveQuery) relaxées.
+            list: Des tuples (triplet relaxé, niveaux de relaxation, similarité).
+        """
+        triple_relax = TripleRelaxation(clause, self.graph, order=self.order, hierarchy=self.hierarchy,
+                                       max_depth=self.max_depth)
+        alternatives = []
+        while triple_relax.has_next():
+            relaxed_triple = triple_relax.next_relaxed_triple()
+            alternatives.append((
+                (relaxed_triple.node_1, relaxed_triple.node_2, relaxed_triple.node_3),
+                tuple(relaxed_triple.relaxation_levels),
+                relaxed_triple.similarity,
+            ))
+        return alternatives
+
+    def relaxed_clauses(self):
+        """
+        Versions relaxées de chacune des clauses de la requête. Avec un cache,
+        un triplet déjà relaxé (pour une autre requête) n'est pas relaxé de
+        nouveau : seules ses clauses relaxées sont recréées.
+
+        Returns:
+            list: Pour chaque clause, la liste de ses versions relaxées.
         """
         # Pour chaque clause de la requête, on récupère la liste des clauses relaxées
         relaxed_versions_per_clause = []
         for clause in self.query.clauses:
-            num=0
-            # On crée une instance de TripleRelaxation pour la clause
-            triple_relax = TripleRelaxation(clause, self.graph, order=self.order)
+            if self.cache is not None:
+                alternatives = self.cache.alternatives((clause.code, self.order, self.max_depth),
+                                                       lambda: self.triple_alternatives(clause))
+            else:
+                alternatives = self.triple_alternatives(clause)
             # Liste des versions relaxées pour cette clause
             relaxed_clause_list = []
-            while triple_relax.has_next():
-                relaxed_triple = triple_relax.next_relaxed_triple()
-                # On suppose que relaxed_triple.query.clauses[0] contient la clause relaxée
-                relaxed_clause = relaxed_triple.query.clauses[0]
-                relaxed_clause.set_label(clause.label,num)
-                num+=1
+            for num, (triple, _levels, _similarity) in enumerate(alternatives):
+                # Une nouvelle clause par requête : la provenance est propre à chaque clause
+                relaxed_clause = SimpleLiteral(triple)
+                relaxed_clause.set_origin(clause, num)
                 relaxed_clause_list.append(relaxed_clause)
             # Si aucune version relaxée n'a été générée pour une clause, on garde la clause originale
             if not relaxed_clause_list:
                 relaxed_clause_list.append(clause)
             relaxed_versions_per_clause.append(relaxed_clause_list)
+        return relaxed_versions_per_clause
+
+    def relax_query(self):
+        """
+        Génère des versions relaxées de la requête conjonctive en relaxant chacune de ses clauses.
         
+        Returns:
+            list: Liste des requêtes (ConjunctiveQuery) relaxées.
+        """
         # Combiner les relaxations de toutes les clauses par produit cartésien
         all_relaxed_queries = []
-        for combination in itertools.product(*relaxed_versions_per_clause):
+        for combination in itertools.product(*self.relaxed_clauses()):
             new_query = ConjunctiveQuery()
             for clause in combination:
                 new_query.add_clause(clause)
             all_relaxed_queries.append(new_query)
         
         return all_relaxed_queries
+
+    def iter_relaxed_queries(self, similarity=None, accept=None):
+        """
+        Énumère les versions relaxées par similarité décroissante, sans
+        construire le produit cartésien : les versions de chaque clause sont
+        triées par similarité avec leur clause d'origine, puis les combinaisons
+        sont produites à la demande (voir ranked_product). Le consommateur peut
+        s'arrêter dès qu'il a obtenu assez de réponses.
+
+        Args:
+            similarity: Calculateur fournissant triple_score (par défaut, celui partagé par self.graph).
+            accept (callable): Filtre optionnel des versions produites, par exemple
+                               self.is_relaxed_version_valid. Les versions refusées
+                               sont tout de même construites puis écartées.
+
+        Yields:
+            tuple: (similarité, ConjunctiveQuery), la similarité étant la moyenne
+                   des similarités de ses clauses avec leurs clauses d'origine.
+        """
+        similarity = similarity or Sim.for_graph(self.graph)
+        ranked_lists = [
+            sorted(
+                ((similarity.triple_score(c.origin.triple, c.triple), c) for c in clauses),
+                key=lambda scored: -scored[0],
+            )
+            for clauses in self.relaxed_clauses()
+        ]
+        norm = len(ranked_lists) * len(ELEMENT_TYPES)
+        for total, combination in ranked_product(ranked_lists):
+            new_query = ConjunctiveQuery()
+            for clause in combination:
+                new_query.add_clause(clause)
+            if accept is None or accept(new_query):
+                yield total / norm, new_query
+
     # @staticmethod
     def is_relaxed_version_valid(self, relaxed_query: ConjunctiveQuery) -> bool:
         """
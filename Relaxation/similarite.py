@@ -1,35 +1,57 @@
 import math
+import threading
+import weakref
+from typing import Optional
 from rdflib import RDF, BNode, Graph, Literal, URIRef, Variable
 from Query.ConjunctiveQueryClause import ConjunctiveQuery
 from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.StatisticsCatalog import StatisticsCatalog
+from Relaxation.BatchSimilarity import batch_query_similarity
+from Relaxation.SimilarityMemo import ELEMENT_TYPES, TripleScoreMemo, delta_similarity
 # from Relaxation.relaxtools import ConjunctiveQueryRelaxation
 
 class SimilarityCalculator:
-    def __init__(self, graph: Graph):
+    _calculators = weakref.WeakKeyDictionary()  # graphe -> calculateur construit par for_graph
+    _lock = threading.Lock()
+
+    def __init__(self, graph: Graph, catalog: Optional[StatisticsCatalog] = None, memo_size: int = 65536):
         """
         Initialise le calculateur avec un graphe RDF.
         
         :param graph: Un objet rdflib.Graph contenant les données RDF.
+        :param catalog: Statistiques du graphe déjà construites ; à défaut,
+                        elles sont calculées en un parcours du graphe.
+        :param memo_size: Nombre de scores de triplets gardés en mémoire (LRU).
         """
         self.g = graph
+        self.catalog = catalog if catalog is not None else StatisticsCatalog(graph)
+        self.memo = TripleScoreMemo(memo_size)
+        self._catalog_version = self.catalog.version
+
+    @classmethod
+    def for_graph(cls, graph: Graph) -> "SimilarityCalculator":
+        """
+        Calculateur partagé de 'graph', construit au premier appel : ses
+        statistiques ne sont calculées qu'une fois et ses scores de triplets
+        mémorisés servent à toutes les relaxations du graphe.
+        """
+        with cls._lock:
+            calculator = cls._calculators.get(graph)
+            if calculator is None:
+                calculator = cls._calculators[graph] = cls(graph)
+            return calculator
 
     def pr_class(self, cls):
-        count_cls = len(list(self.g.subjects(predicate=RDF.type, object=cls)))
-        total_instances = len(set(self.g.subjects(predicate=RDF.type)))
-        return count_cls / total_instances if total_instances else 0
+        return self.catalog.pr_class(cls)
 
     def ic_class(self, cls):
-        pr = self.pr_class(cls)
-        return -math.log(pr) if pr > 0 else 0
+        return self.catalog.ic_class(cls)
 
     def pr_property(self, prop):
-        count_prop = len(list(self.g.triples((None, prop, None))))
-        total_triples = len(self.g)
-        return count_prop / total_triples if total_triples else 0
+        return self.catalog.pr_property(prop)
 
     def ic_property(self, prop):
-        pr = self.pr_property(prop)
-        return -math.log(pr) if pr > 0 else 0
+        return self.catalog.ic_property(prop)
 
     def sim_r1(self, c, c_prime):
         ic_c = self.ic_class(c)
@@ -61,18 +83,26 @@ class SimilarityCalculator:
             return self.sim_r2(original, relaxed)
         return 0
 
+    def triple_score(self, t, t_prime):
+        """
+        Somme des similarités des composantes de t_prime par rapport à t,
+        mémorisée par couple de triplets. La mémoire est vidée si les
+        statistiques du graphe ont changé depuis.
+        """
+        if self.catalog.version != self._catalog_version:
+            self.memo.clear()
+            self._catalog_version = self.catalog.version
+        return self.memo.get((tuple(t), tuple(t_prime)), lambda: sum(
+            self.sim_element(orig, relax, etype)
+            for orig, relax, etype in zip(t, t_prime, ELEMENT_TYPES)
+        ))
+
     def sim_triple(self, t, t_prime):
         """
         Calcule la similarité globale entre deux triplets en utilisant une approche
         générique qui détermine pour chaque composante la fonction de similarité à appliquer.
         """
-        element_types = ['subject', 'predicate', 'object']
-        sim_values = [
-            self.sim_element(orig, relax, etype)
-            for orig, relax, etype in zip(t, t_prime, element_types)
-        ]
-        print(f"sim_values: {sim_values}")
-        return sum(sim_values) / len(sim_values)
+        return self.triple_score(t, t_prime) / len(ELEMENT_TYPES)
     
     def query_similarity(self, query, relaxed_query):
         """
@@ -86,13 +116,11 @@ class SimilarityCalculator:
         :param relaxed_query: La requête relaxée, sous forme d'une liste de triplets correspondants.
         :return: La similarité globale (une valeur entre 0 et 1) entre les deux requêtes.
         """
-        list_match=[]
         if len(query) != len(relaxed_query):
             raise ValueError("Les requêtes doivent contenir le même nombre de patrons de triplet.")
-        for i in query:
-            for j in relaxed_query:
-                if i.label in j.label:
-                    list_match.append((i,j))
+        # Chaque clause relaxée est associée à la clause initiale dont elle provient
+        originals = set(query)
+        list_match = [(j.origin, j) for j in relaxed_query if j.origin in originals]
         # print(list_match)
         sim_values = [
             self.sim_triple(t.triple, t_prime.triple)
@@ -100,6 +128,20 @@ class SimilarityCalculator:
         ]
         return sum(sim_values) / len(sim_values) if sim_values else 0
         
+    def batch_query_similarity(self, query, relaxed_queries):
+        """
+        Similarité de 'query' avec chaque requête de 'relaxed_queries' (listes
+        de clauses), calculée en lot ; même résultat que query_similarity.
+        """
+        return batch_query_similarity(self, query, relaxed_queries)
+
+    def child_similarity(self, query, parent_score, parent, child):
+        """
+        Similarité de la requête 'child' (liste de clauses) obtenue à partir de
+        celle de 'parent' : seules les clauses modifiées sont réévaluées.
+        """
+        return delta_similarity(self, query, parent_score, parent, child)
+
     def query_similarity2(self, query, relaxed_query):
         """
         Calcule la similarité globale entre deux requêtes conjonctives.
@@ -0,0 +1,73 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+from rdflib import Graph
+
+class LocalEndpoint:
+    """
+    Endpoint SPARQL local servant un graphe rdflib (requêtes GET ou POST,
+    résultats SPARQL JSON), pour les tests du mode endpoint sans serveur
+    externe. Les 'failures' premières requêtes reçoivent le code 'status'
+    (429, 503...), pour vérifier les nouvelles tentatives des clients ;
+    chaque réponse peut être retardée de 'delay' secondes (délais dépassés).
+
+        with LocalEndpoint(graph) as endpoint:
+            SimilarityCalculator(endpoint.url)
+    """
+
+    def __init__(self, graph: Graph, failures: int = 0, status: int = 503, delay: float = 0.0):
+        self.graph = graph
+        self.failures = failures
+        self.status = status
+        self.delay = delay
+        self.requests = 0  # Requêtes reçues, échecs simulés compris
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/sparql"
+
+    def __enter__(self) -> "LocalEndpoint":
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.answer(parse_qs(urlparse(self.path).query))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+                self.answer(parse_qs(body))
+
+            def answer(self, params):
+                with endpoint.lock:
+                    endpoint.requests += 1
+                    failed = endpoint.requests <= endpoint.failures
+                time.sleep(endpoint.delay)
+                if failed:
+                    self.send_response(endpoint.status)
+                    self.end_headers()
+                    return
+                try:
+                    payload = endpoint.graph.query(params["query"][0]).serialize(format="json")
+                except Exception as e:
+                    self.send_error(400, str(e))
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/sparql-results+json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
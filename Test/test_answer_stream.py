@@ -0,0 +1,48 @@
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.AnswerSet import AnswerSet, binding_key
+from Relaxation.ParallelXBS import ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy
+
+# 1️⃣ Clés canoniques : ordre des variables indifférent, restreintes aux variables projetées
+EX = Namespace("http://example.org/")
+rdflib_binding = {Variable("p"): EX.s0, Variable("c"): EX.Person}
+assert binding_key(rdflib_binding) == binding_key({Variable("c"): EX.Person, Variable("p"): EX.s0})
+assert binding_key(rdflib_binding, {"p"}) == binding_key({Variable("p"): EX.s0}, {"p"})
+json_binding = {"p": {"type": "uri", "value": str(EX.s0)}, "c": {"type": "uri", "value": str(EX.Person)}}
+assert binding_key(json_binding, {"p"}) == binding_key({"p": {"value": str(EX.s0), "type": "uri"}}, {"p"})
+print(f"Clé : {binding_key(json_binding, {'p'})}")
+
+# 2️⃣ Dédoublonnage haché et limite k
+answers = AnswerSet(2, {"p"})
+query = ConjunctiveQuery()
+added = answers.extend([rdflib_binding, {Variable("p"): EX.s0, Variable("c"): EX.Faculty},
+                        {Variable("p"): EX.s1}, {Variable("p"): EX.s2}], query, 0.9)
+print(f"Réponses : {answers.bindings}")
+assert added == 2 and answers.full and [b[Variable("p")] for b in answers.bindings] == [EX.s0, EX.s1]
+
+# 3️⃣ Graphe avec une hiérarchie Lecturer ⊂ Faculty ⊂ Person
+g = Graph()
+g.add((EX.Lecturer, RDFS.subClassOf, EX.Faculty))
+g.add((EX.Faculty, RDFS.subClassOf, EX.Person))
+for i in range(3):
+    g.add((EX[f"s{i}"], RDF.type, EX.Person))
+    g.add((EX[f"s{i}"], EX.teacherOf, Literal("SW")))
+g.add((EX.x, RDF.type, EX.Lecturer))
+
+query = ConjunctiveQuery()
+query.add_clause(SimpleLiteral((Variable("p"), RDF.type, EX.Lecturer)))
+query.add_clause(SimpleLiteral((Variable("p"), EX.teacherOf, Literal("SW"))))
+query.selected_vars = {"p"}
+
+# 4️⃣ Flux : chaque réponse arrive avec sa requête réparée et sa similarité, comme dans Res et Req
+for cls in (ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy):
+    received = []
+    strategy = cls(query, g, 2, on_answer=received.append)
+    streamed = list(strategy.stream())
+    for answer in streamed:
+        print(f"{cls.__name__} : {answer.binding} ({answer.similarity:.3f})")
+    assert [a.binding for a in streamed] == strategy.Res and received == streamed
+    assert all((a.query, a.similarity) in strategy.Req for a in streamed)
+    assert len(streamed) == 2
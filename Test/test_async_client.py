@@ -0,0 +1,65 @@
+import asyncio
+import json
+import time
+from rdflib import Graph
+from Relaxation.EndpointMode.AsyncSparqlClient import AsyncSparqlClient, AsyncEndpointEvaluator
+from Test.local_endpoint import LocalEndpoint
+
+# Endpoint SPARQL local servant graph.ttl
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+queries = [
+    f"SELECT ?s ?p ?o WHERE {{ ?s ?p ?o }} ORDER BY ?s ?p ?o OFFSET {i}"
+    for i in range(len(g))
+]
+expected = [
+    json.loads(g.query(f"{q}\nLIMIT 1").serialize(format="json"))["results"]["bindings"]
+    for q in queries
+]
+
+async def run(url, **options):
+    async with AsyncSparqlClient(url, max_concurrency=4, timeout=10, **options) as client:
+        rows = await client.bindings_many(queries, limit=1)
+        return rows, client.requests
+
+# 1️⃣ Client asyncio : les requêtes en vol sur au plus 4 connexions persistantes
+with LocalEndpoint(g) as endpoint:
+    start = time.time()
+    rows, sent = asyncio.run(run(endpoint.url, retries=2))
+print(f"{len(rows)} requêtes, {sent} envois HTTP en {time.time() - start:.2f}s")
+print(f"Première solution : {rows[0]}")
+assert rows == expected and all(len(r) == 1 for r in rows)
+assert sent == len(queries)
+
+# 2️⃣ Réponses 429 puis 503 : nouvelles tentatives, mêmes solutions
+for status in (429, 503):
+    with LocalEndpoint(g, failures=3, status=status) as endpoint:
+        rows, sent = asyncio.run(run(endpoint.url, retries=3, backoff=0.01))
+    print(f"Code {status} : {sent} envois HTTP pour {len(queries)} requêtes")
+    assert rows == expected
+    assert sent == len(queries) + 3 == endpoint.requests
+
+# 3️⃣ Tentatives épuisées : la requête en erreur a une liste vide
+with LocalEndpoint(g, failures=len(queries) * 2, status=503) as endpoint:
+    rows, sent = asyncio.run(run(endpoint.url, retries=1, backoff=0.01))
+assert rows == [[] for _ in queries]
+assert sent == len(queries) * 2
+
+# 4️⃣ Évaluateur synchrone adossé au client (utilisable par les stratégies)
+with LocalEndpoint(g) as endpoint:
+    evaluator = AsyncEndpointEvaluator(endpoint.url, max_concurrency=4)
+    exists = evaluator.exists(queries[0])
+    not_k = evaluator.not_k_completed_many(queries[:5] + ["SELECT ?s WHERE { ?s <http://example.org/none> ?o }"])
+    count = evaluator.count(queries[0], limit=3)
+    evaluator.close()
+print(f"Existe : {exists}")
+print(f"Au plus 0 solution : {not_k}")
+print(f"Nombre (plafonné à 3) : {count}")
+assert exists and not_k == [False] * 5 + [True] and count == 3
+
+# 5️⃣ Un endpoint injoignable : erreurs affichées après les nouvelles tentatives
+async def unreachable():
+    async with AsyncSparqlClient("http://127.0.0.1:9/sparql", timeout=1, retries=1, backoff=0.1) as client:
+        return await client.bindings_many(queries[:2])
+
+print(f"Endpoint injoignable : {asyncio.run(unreachable())}")
@@ -0,0 +1,48 @@
+from rdflib import Graph, Literal, URIRef
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.EndpointMode.FindMFS import QueryFailureAnalyzer
+from Relaxation.SubqueryLattice import SubqueryLattice
+
+# 1️⃣ Initialisation du graphe RDF
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+
+# 2️⃣ Définition de la requête conjonctive
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+t4 = SimpleLiteral((Variable("p"), URIRef("http://example.org/age"), Literal(46)))
+query = ConjunctiveQuery()
+query.add_clause(t1)
+query.add_clause(t2)
+query.add_clause(t3)
+query.add_clause(t4)
+query.selected_vars = {"p", "n"}
+
+# 3️⃣ Requête groupée : une branche UNION par sous-requête, comptée par ?_branch
+subs = [ConjunctiveQuery() for _ in range(3)]
+subs[0].clauses = [t1]
+subs[1].clauses = [t2, t3]
+subs[2].clauses = [t1, t4]
+for sub in subs:
+    sub.selected_vars = query.selected_vars.copy()
+batch = QueryFailureAnalyzer.batch_query([sub.to_sparql() for sub in subs], k=1)
+print(batch)
+counts = [0] * len(subs)
+for row in g.query(batch):
+    counts[int(row[0])] = int(row[1])
+print(f"\nSolutions par branche (plafonnées à k+1) : {counts}")
+for sub, count in zip(subs, counts):
+    assert count == min(len(list(sub.execute(g))), 2)
+
+# 4️⃣ Le treillis teste chaque niveau en un seul appel
+def fails_batch(subs):
+    return [len(list(sub.execute(g))) == 0 for sub in subs]
+
+lattice = SubqueryLattice(query, lambda sub: len(list(sub.execute(g))) == 0, fails_batch=fails_batch)
+mfs_list = lattice.minimal_failing_subqueries()
+for i, mfs in enumerate(mfs_list, 1):
+    print(f"MFS {i}: {[j.label for j in mfs.clauses]}")
+print(f"Évaluations : {lattice.evaluations} en {lattice.batches} appels, évitées : {lattice.skipped}")
@@ -0,0 +1,63 @@
+import contextlib
+import io
+import math
+import time
+from rdflib import Graph, Literal, URIRef
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.relaxtools import ConjunctiveQueryRelaxation
+from Relaxation.similarite import SimilarityCalculator
+
+# 1️⃣ Initialisation du graphe RDF et de la requête
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+t4 = SimpleLiteral((Variable("p"), URIRef("http://example.org/age"), Literal(46)))
+query = ConjunctiveQuery()
+query.add_clause(t1)
+query.add_clause(t2)
+query.add_clause(t3)
+query.add_clause(t4)
+
+# 2️⃣ Toutes les requêtes relaxées de la requête
+candidates = ConjunctiveQueryRelaxation(query, g, order=1).relax_query()
+print(f"Requêtes relaxées : {len(candidates)}")
+sim = SimilarityCalculator(g)
+
+# 3️⃣ Similarité en lot comparée au calcul requête par requête
+start = time.time()
+batch = sim.batch_query_similarity(query.clauses, [c.clauses for c in candidates])
+batch_time = time.time() - start
+start = time.time()
+with contextlib.redirect_stdout(io.StringIO()):  # query_similarity affiche chaque triplet
+    single = [sim.query_similarity(query.clauses, c.clauses) for c in candidates]
+single_time = time.time() - start
+print(f"En lot : {batch_time * 1000:.1f} ms, une à une : {single_time * 1000:.1f} ms")
+print(f"Similarités (5 premières) : {[round(v, 3) for v in batch[:5]]}")
+assert all(math.isclose(a, b) for a, b in zip(batch, single))
+
+# 4️⃣ Similarité incrémentale : chaque candidate est déduite de la requête initiale (similarité 1)
+delta = [sim.child_similarity(query.clauses, 1.0, query.clauses, c.clauses) for c in candidates]
+print(f"Scores de triplets mémorisés : {len(sim.memo)} (succès : {sim.memo.hits}, calculs : {sim.memo.misses})")
+assert all(math.isclose(a, b) for a, b in zip(delta, single))
+
+# 5️⃣ Mode endpoint : même calcul en lot, moyenne sur toutes les clauses de la requête
+from Relaxation.EndpointMode.SimilarityEndpoint import SimilarityCalculator as EndpointSimilarityCalculator
+from Test.local_endpoint import LocalEndpoint
+
+shorter = ConjunctiveQuery()  # Une candidate privée d'une clause : longueurs différentes
+for clause in candidates[1].clauses[:-1]:
+    shorter.add_clause(clause)
+endpoint_candidates = candidates[:6] + [shorter]
+with LocalEndpoint(g) as endpoint:
+    remote = EndpointSimilarityCalculator(endpoint.url)
+    with contextlib.redirect_stdout(io.StringIO()):
+        remote_batch = remote.batch_query_similarity(query.clauses, [c.clauses for c in endpoint_candidates])
+        remote_single = [remote.query_similarity(query.clauses, c.clauses) for c in endpoint_candidates]
+print(f"Endpoint, en lot : {[round(v, 3) for v in remote_batch]}")
+print(f"Endpoint, une à une : {[round(v, 3) for v in remote_single]}")
+assert len(remote_batch) == len(endpoint_candidates)
+assert all(math.isclose(a, b) for a, b in zip(remote_batch, remote_single))
@@ -0,0 +1,43 @@
+import threading
+import time
+from Relaxation.CandidateFrontier import CandidateFrontier
+
+# 1️⃣ Frontière bornée : le producteur attend que le consommateur prenne un candidat
+frontier = CandidateFrontier(maxsize=2)
+produced = []
+
+def produce():
+    for i in range(5):
+        if not frontier.offer((-i / 10, i, f"candidat {i}")):
+            break
+        produced.append(i)
+    frontier.close()
+
+producer = threading.Thread(target=produce)
+producer.start()
+time.sleep(0.1)
+print(f"Candidats en attente : {frontier.qsize()}, produits : {len(produced)}")
+assert frontier.qsize() == 2 and len(produced) == 2
+
+# 2️⃣ Le consommateur prend le meilleur candidat disponible, jusqu'à la fermeture
+taken = []
+while True:
+    item = frontier.take()
+    if item is None:
+        break
+    taken.append(item[1])
+producer.join()
+print(f"Candidats consommés : {taken}")
+assert sorted(taken) == list(range(5))
+
+# 3️⃣ Annulation : le producteur bloqué sur une frontière pleine rend la main
+frontier = CandidateFrontier(maxsize=1)
+produced = []
+producer = threading.Thread(target=produce)
+producer.start()
+time.sleep(0.1)
+frontier.cancel()
+producer.join(timeout=1)
+print(f"Après annulation : produits {len(produced)}, producteur actif : {producer.is_alive()}")
+assert not producer.is_alive() and len(produced) == 1
+assert frontier.take() is None
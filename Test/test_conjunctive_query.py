@@ -36,3 +36,61 @@ results = query.execute(graph)
 # Affichage des résultats
 for row in results:
     print(row.bindings)
+
+# Égalité canonique : même requête à l'ordre des clauses et aux variables fraîches près
+a = ConjunctiveQuery()
+a.add_clause(SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Variable("R3"))))
+a.add_clause(t2)
+b = ConjunctiveQuery()
+b.add_clause(t2)
+b.add_clause(SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Variable("R7"))))
+print("\n🔹 Forme canonique :", a.canonical_key())
+assert a.canonical_key() == b.canonical_key() and len({a.canonical_key(), b.canonical_key()}) == 1
+# Égalité et hachage restent ceux de l'objet : une requête modifiée après son
+# ajout à un ensemble y est toujours retrouvée
+queries = {a, b}
+b.add_clause(t4)
+assert a.canonical_key() != b.canonical_key() and a != b and b in queries
+# Clé recalculée quand une clause est remplacée par un autre objet de même triplet
+c = a.clone()
+assert c.canonical_key() == a.canonical_key()
+c.clauses[0] = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Variable("R3")))
+assert c.canonical_key() == a.canonical_key()
+c.clauses[0] = t4
+assert c.canonical_key() != a.canonical_key()
+
+# Masques de clauses : inclusion, union et différence sur des entiers
+from Query.ClauseUniverse import ClauseUniverse
+from Relaxation.ConjunctiveQueryTools import ConjunctiveQueryTools
+universe = ClauseUniverse(query.clauses)
+sub = ConjunctiveQuery()
+sub.add_clause(t2)
+print("🔹 Masques :", bin(query.mask(universe)), bin(sub.mask(universe)))
+assert ClauseUniverse.is_subset(sub.mask(universe), query.mask(universe)) == sub.is_subquery(query)
+assert not ClauseUniverse.is_subset(b.mask(universe), query.mask(universe))
+assert ConjunctiveQueryTools.query_contains_in_list([query], sub)
+# Univers et masques déjà calculés par l'appelant (ceux de la stratégie)
+assert ConjunctiveQueryTools.query_contains_in_list([query], sub, universe, [query.mask(universe)])
+other = ConjunctiveQuery()
+other.add_clause(t1)
+assert not ConjunctiveQueryTools.query_contains_in_list([sub], other, universe, [sub.mask(universe)])
+
+# Les variables projetées gardent leur nom : {?x ?P1 ?R1 . ?y a L} et {?x a L . ?y ?P2 ?R2}
+# donnent des réponses différentes pour SELECT ?x ?y
+lecturer = URIRef("http://example.org/Lecturer")
+def projected(triples, variables):
+    q = ConjunctiveQuery()
+    for triple in triples:
+        q.add_clause(SimpleLiteral(triple))
+    q.selected_vars = set(variables)
+    return q
+x, y = Variable("x"), Variable("y")
+a = projected([(x, Variable("P1"), Variable("R1")), (y, RDF.type, lecturer)], {"x", "y"})
+b = projected([(x, RDF.type, lecturer), (y, Variable("P2"), Variable("R2"))], {"x", "y"})
+print("🔹 Formes projetées :", a.canonical_key(), "|", b.canonical_key())
+assert a.canonical_key() != b.canonical_key()
+key = lambda triples, variables: projected(triples, variables).canonical_key()
+assert key([(x, RDF.type, lecturer)], {"x"}) != key([(y, RDF.type, lecturer)], {"y"})
+assert key([(x, RDF.type, lecturer)], {"x"}) != key([(x, RDF.type, lecturer)], ())
+# Sans projection (SELECT *), toutes les variables restent renommables
+assert key([(x, RDF.type, lecturer)], ()) == key([(y, RDF.type, lecturer)], ())
@@ -0,0 +1,42 @@
+from rdflib import Graph, RDF, URIRef
+from rdflib.term import Variable
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.HierarchyIndex import HierarchyIndex
+from Relaxation.relaxtools import TripleRelaxation
+
+UB = "http://swat.cse.lehigh.edu/onto/univ-bench.owl#"
+
+# 1️⃣ Fermeture des hiérarchies de l'ontologie univ-bench
+hierarchy = HierarchyIndex.from_file("Experimentation/univ-bench.owl")
+print(hierarchy)
+ancestors = hierarchy.super_classes(URIRef(UB + "FullProfessor"))
+print("FullProfessor :", {a.split("#")[-1]: d for a, d in ancestors.items()})
+assert ancestors == {URIRef(UB + "Professor"): 1, URIRef(UB + "Faculty"): 2, URIRef(UB + "Employee"): 3}
+assert hierarchy.super_properties(URIRef(UB + "headOf"))[URIRef(UB + "memberOf")] == 2
+
+# 2️⃣ Relaxation d'une clause : chaque ancêtre avec sa distance pour niveau
+clause = SimpleLiteral((Variable("x"), RDF.type, URIRef(UB + "FullProfessor")))
+relax = TripleRelaxation(clause, Graph(), hierarchy=hierarchy)
+levels = {n.node_3: n.relaxation_levels[2] for n in relax.relaxed_object}
+print("Niveaux de relaxation de l'objet :", {str(o).split("#")[-1]: l for o, l in levels.items()})
+assert levels[URIRef(UB + "Employee")] == 3
+
+# 3️⃣ Index partagé : la hiérarchie d'un graphe n'est lue qu'une fois
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+assert HierarchyIndex.for_graph(g) is HierarchyIndex.for_graph(g)
+
+# 4️⃣ Endpoint : une requête par endpoint, échec gardé quelques secondes puis retenté
+from Relaxation.EndpointMode import relaxation
+from Test.local_endpoint import LocalEndpoint
+
+ontology = Graph()
+ontology.parse("Experimentation/univ-bench.owl")
+with LocalEndpoint(ontology, failures=1) as endpoint:
+    failed = relaxation.load_hierarchy(endpoint.url)
+    assert relaxation.load_hierarchy(endpoint.url) is failed and endpoint.requests == 1
+    relaxation.HIERARCHY_RETRY_DELAY = 0
+    loaded = relaxation.load_hierarchy(endpoint.url)
+    assert relaxation.load_hierarchy(endpoint.url) is loaded and endpoint.requests == 2
+print(f"Hiérarchie du endpoint : {loaded}")
+assert loaded.super_classes(URIRef(UB + "FullProfessor")) == ancestors
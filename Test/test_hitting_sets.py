@@ -0,0 +1,43 @@
+from rdflib import Graph, Literal, URIRef
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Relaxation.XSSGenerator import XSSGenerator
+from Relaxation.HittingSets import minimal_hitting_sets
+from Query.SimpleLiteral import SimpleLiteral
+from rdflib.term import Variable
+
+# 1️⃣ Ensembles intersectants minimaux sur des masques de bits
+# {0,1}, {1,2}, {0,2} -> {0,1}, {0,2}, {1,2}
+sets = [0b011, 0b110, 0b101]
+hitting = list(minimal_hitting_sets(sets))
+print("Ensembles minimaux :", [bin(h) for h in hitting])
+assert sorted(hitting) == [0b011, 0b101, 0b110]
+
+# 2️⃣ Initialisation du graphe RDF et de la requête
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+t4 = SimpleLiteral((Variable("p"), URIRef("http://example.org/age"), Literal(46)))
+
+query = ConjunctiveQuery()
+query.add_clause(t1)
+query.add_clause(t2)
+query.add_clause(t3)
+query.add_clause(t4)
+query.selected_vars = {"p", "n"}
+
+# 3️⃣ XSS produites une à une à partir des MFS
+mfs_list = QueryFailureAnalyzer.find_all_failing_causes(query, g)
+print("\nMFS :", [[j.label for j in mfs.clauses] for mfs in mfs_list])
+xss_list = []
+for i, xss in enumerate(XSSGenerator.iter_xss(query, mfs_list), 1):
+    print(f"XSS {i}: {[j.label for j in xss.clauses]}")
+    xss_list.append(frozenset(xss.clauses))
+
+# 4️⃣ Mêmes XSS que l'algorithme LBA, sans doublon
+_, lba_xss = QueryFailureAnalyzer.find_mfs_and_xss(query, g)
+assert len(xss_list) == len(set(xss_list))
+assert set(xss_list) == {frozenset(x.clauses) for x in lba_xss}
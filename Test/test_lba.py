@@ -0,0 +1,54 @@
+from rdflib import Graph, Literal, URIRef
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Query.SimpleLiteral import SimpleLiteral
+from rdflib.term import Variable
+
+# 1️⃣ Initialisation du graphe RDF
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+
+# 2️⃣ Définition des clauses de la requête
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+t4 = SimpleLiteral((Variable("p"), URIRef("http://example.org/age"), Literal(46)))
+
+# 3️⃣ Construction de la requête conjonctive
+query = ConjunctiveQuery()
+query.add_clause(t1)
+query.add_clause(t2)
+query.add_clause(t3)
+query.add_clause(t4)
+query.selected_vars = {"p", "n"}
+print(query.to_sparql())
+
+# 4️⃣ Une seule MFS en O(n) évaluations
+mfs = QueryFailureAnalyzer.find_a_failing_cause(query, g)
+print(f"\nUne MFS : {[j.label for j in mfs.clauses]}")
+
+# 5️⃣ Toutes les MFS et XSS avec LBA
+lattice = QueryFailureAnalyzer.lattice(query, g)
+mfs_list, xss_list = QueryFailureAnalyzer.find_mfs_and_xss(query, g, lattice)
+print("\n🔎 MFS (LBA)")
+for i, mfs in enumerate(mfs_list, 1):
+    print(f"MFS {i}: {[j.label for j in mfs.clauses]}")
+print("\n🔎 XSS (LBA)")
+for i, xss in enumerate(xss_list, 1):
+    print(f"XSS {i}: {[j.label for j in xss.clauses]}")
+print(f"\nÉvaluations : {lattice.evaluations}, évitées : {lattice.skipped}")
+
+# 6️⃣ Comparaison avec le parcours exhaustif du treillis
+exhaustive = QueryFailureAnalyzer.find_all_failing_causes(query, g)
+assert {frozenset(m.clauses) for m in exhaustive} == {frozenset(m.clauses) for m in mfs_list}
+
+# 7️⃣ XSS produites au fil de l'analyse : la première avant la fin, mêmes XSS et MFS
+streaming = QueryFailureAnalyzer.lattice(query, g)
+xss_stream = streaming.iter_xss()
+first = next(xss_stream)
+evaluations_first = streaming.evaluations
+rest = list(xss_stream)
+print(f"Première XSS après {evaluations_first} évaluations sur {streaming.evaluations}")
+assert evaluations_first < streaming.evaluations
+assert {frozenset(x.clauses) for x in [first] + rest} == {frozenset(x.clauses) for x in xss_list}
+assert len(streaming.mfs) == len(mfs_list)
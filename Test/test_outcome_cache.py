@@ -0,0 +1,58 @@
+import os
+import tempfile
+from rdflib import Graph, Literal, URIRef
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.CanonicalForm import canonical_form
+from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Relaxation.OutcomeCache import OutcomeCache
+from Query.SimpleLiteral import SimpleLiteral
+from rdflib.term import Variable
+
+RDF_TYPE = URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+
+# 1️⃣ La forme canonique ignore l'ordre des triplets et le nom des variables
+a = [(Variable("x"), RDF_TYPE, URIRef("http://example.org/Lecturer")),
+     (Variable("x"), URIRef("http://example.org/teacherOf"), Variable("c"))]
+b = [(Variable("p"), URIRef("http://example.org/teacherOf"), Variable("z")),
+     (Variable("p"), RDF_TYPE, URIRef("http://example.org/Lecturer"))]
+print(canonical_form(a))
+assert canonical_form(a) == canonical_form(b)
+assert canonical_form(a, {"x"}) != canonical_form(b, {"p"})
+
+# 2️⃣ Initialisation du graphe RDF
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+
+def build_query(var):
+    t1 = SimpleLiteral((Variable(var), RDF_TYPE, URIRef("http://example.org/Lecturer")))
+    t2 = SimpleLiteral((Variable(var), URIRef("http://example.org/nationality"), Variable("n")))
+    t3 = SimpleLiteral((Variable(var), URIRef("http://example.org/teacherOf"), Literal("SW")))
+    t4 = SimpleLiteral((Variable(var), URIRef("http://example.org/age"), Literal(46)))
+    query = ConjunctiveQuery()
+    for t in (t1, t2, t3, t4):
+        query.add_clause(t)
+    query.selected_vars = {var, "n"}
+    return query
+
+# 3️⃣ Premier passage : cache froid
+path = os.path.join(tempfile.mkdtemp(), "outcomes.sqlite")
+cache = OutcomeCache(path, "graph.ttl")
+cold = QueryFailureAnalyzer.lattice(build_query("p"), g, cache=cache)
+mfs_cold, xss_cold = QueryFailureAnalyzer.find_mfs_and_xss(cold.query, g, cold)
+print(f"Cache froid : {cold.stats()}")
+cache.close()
+
+# 4️⃣ Second passage avec une autre requête (variables renommées) : cache chaud
+cache = OutcomeCache(path, "graph.ttl")
+warm = QueryFailureAnalyzer.lattice(build_query("s"), g, cache=cache)
+mfs_warm, xss_warm = QueryFailureAnalyzer.find_mfs_and_xss(warm.query, g, warm)
+print(f"Cache chaud : {warm.stats()}")
+print(cache)
+assert warm.evaluations == 0
+assert len(mfs_warm) == len(mfs_cold) and len(xss_warm) == len(xss_cold)
+cache.close()
+
+# 5️⃣ La clé du cache ignore la projection (le nombre de solutions n'en dépend pas),
+# contrairement à l'égalité des requêtes
+assert OutcomeCache.key(build_query("p")) == OutcomeCache.key(build_query("s"))
+assert build_query("p") != build_query("s")
@@ -0,0 +1,76 @@
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.GraphProcessPool import GraphProcessPool
+from Relaxation.ParallelXBS import ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy
+from Relaxation.relaxtools import ConjunctiveQueryRelaxation
+
+# 1️⃣ Graphe avec une hiérarchie Lecturer ⊂ Faculty ⊂ Person
+EX = Namespace("http://example.org/")
+g = Graph()
+g.add((EX.Lecturer, RDFS.subClassOf, EX.Faculty))
+g.add((EX.Faculty, RDFS.subClassOf, EX.Person))
+for i in range(3):
+    g.add((EX[f"s{i}"], RDF.type, EX.Person))
+    g.add((EX[f"s{i}"], EX.teacherOf, Literal("SW")))
+g.add((EX.x, RDF.type, EX.Lecturer))
+
+query = ConjunctiveQuery()
+query.add_clause(SimpleLiteral((Variable("p"), RDF.type, EX.Lecturer)))
+query.add_clause(SimpleLiteral((Variable("p"), EX.teacherOf, Literal("SW"))))
+query.selected_vars = {"p"}
+print(f"fork disponible : {GraphProcessPool.available()}")
+
+# 2️⃣ Relaxation dans un processus : mêmes versions qu'en local, provenance recréée
+pool = GraphProcessPool(g, 2)
+pool.start()
+remote = pool.relax(query)
+local = ConjunctiveQueryRelaxation(query, g, order=1).relax_query()[1:]
+pool.shutdown()
+print(f"Versions relaxées : {len(remote)} (processus), {len(local)} (local)")
+assert len(remote) == len(local)
+assert all(c.origin is o for q in remote for c, o in zip(q.clauses, query.clauses))
+assert [[c.label for c in q.clauses] for q in remote] == [[c.label for c in q.clauses] for q in local]
+
+# 3️⃣ Stratégies avec processus : mêmes réponses et même similarité qu'avec les threads
+for cls in (ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy):
+    runs = []
+    for processes in (None, 2):
+        strategy = cls(query, g, 2, processes=processes)
+        (strategy.parallelxbs if cls is ParallelRelaxationStrategy else strategy.parallelxbsv2)()
+        runs.append((sorted(map(str, strategy.Res)), max(sim for _, sim in strategy.Req)))
+    print(f"{cls.__name__} : {runs[1]}")
+    assert runs[0] == runs[1]
+
+# 4️⃣ not_k_completed_many : pool du graphe créé avant les threads, appels concurrents sans conflit
+from concurrent.futures import ThreadPoolExecutor
+from Relaxation.QueryEvaluator import GraphEvaluator
+
+evaluator = GraphEvaluator(g)
+subqueries = [ConjunctiveQuery() for _ in query.clauses]
+for sub, clause in zip(subqueries, query.clauses):
+    sub.add_clause(clause)
+expected = [evaluator.not_k_completed(sub, 1) for sub in subqueries]
+shared = GraphProcessPool.for_graph(g, 2)
+with ThreadPoolExecutor(max_workers=4) as threads:
+    results = list(threads.map(lambda _: evaluator.not_k_completed_many(subqueries, 1, workers=2), range(8)))
+    # Hors du thread principal, aucun pool n'est démarré (pas de fork depuis un thread)
+    other = threads.submit(GraphProcessPool.for_graph, g, 3).result()
+print(f"Au plus 1 solution : {expected}, pool partagé : {shared}")
+assert all(result == expected for result in results)
+assert GraphProcessPool.for_graph(g, 2) is shared and GraphEvaluator(g).process_pool is None
+assert other is None or not GraphProcessPool.available()
+
+# 5️⃣ Pool partagé remplacé quand le nombre de processus ou le graphe change
+if GraphProcessPool.available():
+    resized = GraphProcessPool.for_graph(g, 3)
+    assert resized is not shared and resized.processes == 3 and shared.pool is None
+    g.add((EX.y, RDF.type, EX.Lecturer))
+    assert evaluator.not_k_completed_many(subqueries, 1, workers=3) == [False, expected[1]]
+    assert GraphProcessPool.for_graph(g, 3) is not resized and resized.pool is None
+
+# 6️⃣ Pool privé : arrêté en sortie du bloc with
+with GraphProcessPool(g, 2) as private:
+    assert private.pool is not None
+assert private.pool is None
@@ -0,0 +1,48 @@
+from rdflib import Graph, Literal, URIRef
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.QueryEvaluator import GraphEvaluator
+
+# 1️⃣ Initialisation du graphe RDF et de l'évaluateur
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+evaluator = GraphEvaluator(g)
+
+# 2️⃣ Requêtes de test
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+lecturers = ConjunctiveQuery()
+lecturers.add_clause(t1)
+lecturers.selected_vars = {"p"}
+failing = ConjunctiveQuery()
+failing.add_clause(t2)
+failing.add_clause(t3)
+failing.selected_vars = {"p"}
+
+# 3️⃣ Opérations de l'évaluateur (arrêt dès que la limite est atteinte)
+total = evaluator.count(lecturers)
+print(f"Nombre de Lecturer : {total}")
+print(f"Au plus 1 solution lue : {evaluator.count(lecturers, limit=1)}")
+print(f"Existe : {evaluator.exists(lecturers)}, au moins {total} : {evaluator.at_least_k(lecturers, total)}")
+print(f"Solutions (limite 1) : {evaluator.bindings(lecturers, limit=1)}")
+print(f"Requête en échec : existe = {evaluator.exists(failing)}, au plus 0 solution = {evaluator.not_k_completed(failing)}")
+print(f"Requêtes évaluées : {evaluator.evaluations}")
+assert evaluator.count(lecturers, limit=1) == 1
+assert not evaluator.at_least_k(lecturers, total + 1)
+assert not evaluator.exists(failing)
+
+# 4️⃣ Endpoint : COUNT(*) borné par un délai, le dépassement est compté
+from Relaxation.EndpointMode.EndpointEvaluator import EndpointEvaluator
+from Test.local_endpoint import LocalEndpoint
+
+with LocalEndpoint(g) as endpoint:
+    remote = EndpointEvaluator(endpoint.url)
+    assert remote.count(lecturers) == total and remote.count(lecturers, limit=1, timeout=5) == 1
+with LocalEndpoint(g, delay=1.0) as endpoint:
+    remote = EndpointEvaluator(endpoint.url)
+    late = remote.count(lecturers, timeout=0.2)
+    print(f"Comptage après le délai : {late}, délais dépassés : {remote.timeouts}")
+    assert late == 0 and remote.timeouts == 1
+    assert not remote.exists(lecturers, timeout=0.2) and remote.timeouts == 2
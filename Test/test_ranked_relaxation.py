@@ -0,0 +1,63 @@
+import itertools
+import math
+from rdflib import Graph, Literal, URIRef
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.relaxtools import ConjunctiveQueryRelaxation
+from Relaxation.RelaxationCache import RelaxationCache
+from Relaxation.similarite import SimilarityCalculator
+
+# 1️⃣ Initialisation du graphe RDF et de la requête
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+t4 = SimpleLiteral((Variable("p"), URIRef("http://example.org/age"), Literal(46)))
+query = ConjunctiveQuery()
+query.add_clause(t1)
+query.add_clause(t2)
+query.add_clause(t3)
+query.add_clause(t4)
+sim = SimilarityCalculator(g)
+cqr = ConjunctiveQueryRelaxation(query, g, order=1)
+
+# 2️⃣ Les 5 meilleures versions relaxées, sans construire le produit cartésien
+for score, relaxed in itertools.islice(cqr.iter_relaxed_queries(sim), 5):
+    print(f"{score:.3f}", [c.label for c in relaxed.clauses])
+
+# 3️⃣ L'énumération complète couvre relax_query, par similarité décroissante
+ranked = list(cqr.iter_relaxed_queries(sim))
+scores = [score for score, _ in ranked]
+assert len(ranked) == len(cqr.relax_query())
+assert all(a >= b for a, b in zip(scores, scores[1:]))
+assert all(math.isclose(score, sim.query_similarity(query.clauses, q.clauses)) for score, q in ranked)
+
+# 4️⃣ Filtre des versions produites : toutes les clauses relaxées
+valid = list(cqr.iter_relaxed_queries(sim, accept=cqr.is_relaxed_version_valid))
+print(f"Versions relaxées : {len(ranked)}, dont toutes clauses relaxées : {len(valid)}")
+assert len(valid) == sum(1 for q in cqr.relax_query() if cqr.is_relaxed_version_valid(q))
+
+# 5️⃣ Cache partagé : les triplets déjà relaxés ne sont que recombinés
+relaxations = RelaxationCache()
+first = ConjunctiveQueryRelaxation(query, g, order=1, cache=relaxations).relaxed_clauses()
+second = ConjunctiveQueryRelaxation(query, g, order=1, cache=relaxations).relaxed_clauses()
+print(relaxations)
+assert relaxations.misses == len(query.clauses) and relaxations.hits == len(query.clauses)
+assert [[c.triple for c in clauses] for clauses in first] == [[c.triple for c in clauses] for clauses in second]
+assert all(a is not b and a.origin is b.origin for x, y in zip(first, second) for a, b in zip(x, y))
+
+# 6️⃣ Sans calculateur : celui du graphe, construit une seule fois
+default = [score for score, _ in cqr.iter_relaxed_queries()]
+assert default == [score for score, _ in cqr.iter_relaxed_queries()] and all(math.isclose(a, b) for a, b in zip(default, scores))
+assert SimilarityCalculator.for_graph(g) is SimilarityCalculator.for_graph(g)
+print(f"Calculateur partagé : {len(SimilarityCalculator.for_graph(g).memo)} scores de triplets mémorisés")
+
+# 7️⃣ Énumération démarrée (relax_task des stratégies) : clauses relaxées tout de suite,
+# combinaisons construites à la lecture, mêmes versions dans le même ordre
+from Relaxation.RankedProduct import started
+pulled = started(ConjunctiveQueryRelaxation(query, g, order=1, cache=relaxations).iter_relaxed_queries(sim))
+assert relaxations.hits == 2 * len(query.clauses)
+assert [score for score, _ in pulled] == scores
+assert list(started(iter(()))) == []
@@ -0,0 +1,62 @@
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.ParallelXBS import ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy
+from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Relaxation.RoundBudget import RoundBudget
+
+# 1️⃣ Graphe avec une hiérarchie Lecturer ⊂ Faculty ⊂ Person : seules des Person enseignent SW
+EX = Namespace("http://example.org/")
+g = Graph()
+g.add((EX.Lecturer, RDFS.subClassOf, EX.Faculty))
+g.add((EX.Faculty, RDFS.subClassOf, EX.Person))
+for i in range(3):
+    g.add((EX[f"s{i}"], RDF.type, EX.Person))
+    g.add((EX[f"s{i}"], EX.teacherOf, Literal("SW")))
+g.add((EX.x, RDF.type, EX.Lecturer))
+
+query = ConjunctiveQuery()
+query.add_clause(SimpleLiteral((Variable("p"), RDF.type, EX.Lecturer)))
+query.add_clause(SimpleLiteral((Variable("p"), EX.teacherOf, Literal("SW"))))
+query.selected_vars = {"p"}
+
+def classes(strategy):
+    return {o for request, _ in strategy.Req for _, p, o in (c.triple for c in request.clauses) if p == RDF.type}
+
+# 2️⃣ Un seul tour sur un niveau : Person (deux niveaux au-dessus) n'est jamais atteinte
+single = ParallelRelaxationStrategy(query, g, 2, budget=RoundBudget(max_rounds=1, depth_step=1))
+single.parallelxbs()
+print(f"Un tour : {len(single.Res)} réponse(s), {single.query_exec_count} exécutions")
+assert single.round == 1 and EX.Person not in classes(single)
+
+# 3️⃣ Approfondissement : les candidats en échec sont relaxés d'un niveau de plus au tour suivant
+deepening = RoundBudget(depth_step=1)
+for strategy in (ParallelRelaxationStrategy(query, g, 2, budget=deepening),
+                 ParallelRelaxationSmartStrategy(query, g, 2, budget=deepening)):
+    (strategy.parallelxbs if isinstance(strategy, ParallelRelaxationStrategy) else strategy.parallelxbsv2)()
+    print(f"{type(strategy).__name__} : {strategy.round} tours, {len(strategy.Res)} réponses, "
+          f"{strategy.query_exec_count} exécutions")
+    assert strategy.round >= 2 and len(strategy.Res) == 2 and EX.Person in classes(strategy)
+
+# 4️⃣ Budget par tour : au plus une évaluation par tour, après l'analyse MFS/XSS (comptée à part)
+analysis = QueryFailureAnalyzer.lattice(query, g)
+analysis.mfs_and_xss()
+budgeted = ParallelRelaxationSmartStrategy(query, g, 2, budget=RoundBudget(max_executions=1, depth_step=1))
+budgeted.parallelxbsv2()
+print(f"Budget d'une exécution par tour : {budgeted.round} tours, {budgeted.query_exec_count} exécutions")
+assert budgeted.query_exec_count - analysis.evaluations <= budgeted.round and len(budgeted.Res) == 2
+
+# 5️⃣ Au plus un candidat ajouté par tour : les relaxations non proposées ne sont pas perdues
+for strategy in (ParallelRelaxationStrategy(query, g, 2, budget=RoundBudget(max_candidates=1, depth_step=1)),
+                 ParallelRelaxationSmartStrategy(query, g, 2, budget=RoundBudget(max_candidates=1, depth_step=1))):
+    (strategy.parallelxbs if isinstance(strategy, ParallelRelaxationStrategy) else strategy.parallelxbsv2)()
+    print(f"Un candidat par tour ({type(strategy).__name__}) : {strategy.round} tours, "
+          f"{len(strategy.Res)} réponses, {len(strategy.seen)} candidats")
+    assert len(strategy.seen) <= strategy.round and len(strategy.Res) == 2
+
+# 6️⃣ Par défaut, tous les niveaux dès le premier tour : Person est atteinte sans approfondissement
+default = ParallelRelaxationStrategy(query, g, 2)
+default.parallelxbs()
+print(f"Sans approfondissement : {default.round} tour(s), {default.query_exec_count} exécutions")
+assert default.round == 1 and EX.Person in classes(default) and len(default.Res) == 2
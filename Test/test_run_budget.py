@@ -0,0 +1,67 @@
+from rdflib import Graph, Literal, Namespace, RDF, RDFS
+from rdflib.term import Variable
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Query.SimpleLiteral import SimpleLiteral
+from Relaxation.CandidateFrontier import CandidateFrontier
+from Relaxation.ParallelXBS import ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy
+from Relaxation.QueryEvaluator import GraphEvaluator
+from Relaxation.RoundBudget import RoundBudget
+from Relaxation.RunBudget import RunBudget
+
+# 1️⃣ Graphe avec une hiérarchie Lecturer ⊂ Faculty ⊂ Person : seules des Person enseignent SW
+EX = Namespace("http://example.org/")
+g = Graph()
+g.add((EX.Lecturer, RDFS.subClassOf, EX.Faculty))
+g.add((EX.Faculty, RDFS.subClassOf, EX.Person))
+for i in range(3):
+    g.add((EX[f"s{i}"], RDF.type, EX.Person))
+    g.add((EX[f"s{i}"], EX.teacherOf, Literal("SW")))
+g.add((EX.x, RDF.type, EX.Lecturer))
+
+query = ConjunctiveQuery()
+query.add_clause(SimpleLiteral((Variable("p"), RDF.type, EX.Lecturer)))
+query.add_clause(SimpleLiteral((Variable("p"), EX.teacherOf, Literal("SW"))))
+query.selected_vars = {"p"}
+
+def run(strategy):
+    (strategy.parallelxbs if type(strategy) is ParallelRelaxationStrategy else strategy.parallelxbsv2)()
+    print(f"{type(strategy).__name__} {strategy.run_budget} : {len(strategy.Res)} réponse(s), "
+          f"{strategy.query_exec_count} exécutions, partiel : {strategy.partial}")
+    return strategy
+
+# 2️⃣ Sans budget : toutes les réponses, résultat complet (approfondissement niveau par niveau,
+# les deux réponses sont trouvées à des tours différents)
+deepening = RoundBudget(depth_step=1)
+for cls in (ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy):
+    complete = run(cls(query, g, 2, budget=deepening))
+    assert len(complete.Res) == 2 and not complete.partial
+
+# 3️⃣ Budget d'exécutions épuisé avant les k réponses : celles trouvées sont gardées, le résultat est partiel
+for cls in (ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy):
+    budgeted = run(cls(query, g, 2, budget=deepening,
+                       run_budget=RunBudget(max_executions=complete.query_exec_count - 1)))
+    assert budgeted.query_exec_count < complete.query_exec_count and budgeted.partial
+    assert len(budgeted.Res) == len(budgeted.Req) == 1
+
+# 4️⃣ Délai déjà écoulé : aucune évaluation de candidat
+expired = run(ParallelRelaxationStrategy(query, g, 2, run_budget=RunBudget(max_seconds=0)))
+assert expired.query_exec_count == 0 and expired.partial
+
+# 5️⃣ Délai par requête : l'évaluation s'arrête, les solutions déjà produites sont gardées
+evaluator = GraphEvaluator(g)
+rows = evaluator.bindings("SELECT ?s WHERE { ?s ?p ?o }", timeout=0)
+print(f"Délai nul : {rows}, {evaluator.timeouts} dépassement(s)")
+assert len(rows) == 1 and evaluator.timeouts == 1
+
+# 6️⃣ Un candidat interrompu garde ses réponses : il n'est pas relaxé davantage, le résultat est partiel
+hurried = run(ParallelRelaxationStrategy(query, g, 2, budget=deepening, run_budget=RunBudget(query_timeout=0)))
+assert hurried.partial and len(hurried.Res) == len(hurried.Req) >= 1
+assert RunBudget(max_seconds=10, query_timeout=2).timeout() == 2
+
+# 7️⃣ Frontière vide : take() rend la main à l'échéance
+assert CandidateFrontier().take(timeout=0.05) is None
+
+# 8️⃣ Budget épuisé pendant l'analyse MFS/XSS : ses exécutions sont comptées, le résultat est partiel
+for cls in (ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy):
+    cut = run(cls(query, g, 2, run_budget=RunBudget(max_executions=2)))
+    assert cut.query_exec_count == 2 and cut.partial and not cut.Res
@@ -0,0 +1,48 @@
+import math
+import os
+import tempfile
+from rdflib import Graph, URIRef
+from Relaxation.EndpointMode.SimilarityEndpoint import SimilarityCalculator
+from Test.local_endpoint import LocalEndpoint
+
+classes = [URIRef("http://example.org/Lecturer"), URIRef("http://www.lehigh.edu/~zhp2/2004/0401/univ-bench.owl#GraduateStudent")]
+properties = [URIRef("http://example.org/teacherOf"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")]
+
+def main(endpoint_url: str):
+    # 1️⃣ Calculateur sans préchargement : deux requêtes HTTP par probabilité
+    direct = SimilarityCalculator(endpoint_url)
+
+    # 2️⃣ Préchargement en trois requêtes GROUP BY, conservé dans un instantané
+    snapshot = os.path.join(tempfile.mkdtemp(), "statistics.json")
+    cold = SimilarityCalculator(endpoint_url, prefetch=True, snapshot=snapshot, ttl=3600)
+    print(cold.catalog)
+    for cls in classes:
+        print(f"IC({cls}) = {cold.ic_class(cls):.3f}")
+        assert math.isclose(cold.pr_class(cls), direct.pr_class(cls))
+    for prop in properties:
+        print(f"IC({prop}) = {cold.ic_property(prop):.3f}")
+        assert math.isclose(cold.pr_property(prop), direct.pr_property(prop))
+
+    # 3️⃣ Démarrage à chaud : l'instantané est relu, il n'est ni recalculé ni réécrit
+    written = os.path.getmtime(snapshot)
+    warm = SimilarityCalculator(endpoint_url, prefetch=True, snapshot=snapshot, ttl=3600)
+    print(f"Instantané relu : {warm.catalog}")
+    assert os.path.getmtime(snapshot) == written
+    assert warm.catalog.predicate_counts == cold.catalog.predicate_counts
+
+    # 4️⃣ Stratégies du mode endpoint : préchargement activé par défaut
+    from Query.ConjunctiveQueryClause import ConjunctiveQuery
+    from Relaxation.EndpointMode.ParallelXBs import ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy
+    for cls in (ParallelRelaxationStrategy, ParallelRelaxationSmartStrategy):
+        assert cls(ConjunctiveQuery(), endpoint_url, 1).similarity.catalog is not None
+        assert cls(ConjunctiveQuery(), endpoint_url, 1, prefetch=False).similarity.catalog is None
+
+    # 5️⃣ Endpoint injoignable : erreur affichée, fréquences demandées terme par terme
+    assert SimilarityCalculator("http://127.0.0.1:9/sparql", prefetch=True).catalog is None
+
+if __name__ == "__main__":
+    # Endpoint SPARQL local servant graph.ttl
+    g = Graph()
+    g.parse("graph.ttl", format="turtle")
+    with LocalEndpoint(g) as endpoint:
+        main(endpoint.url)
@@ -45,5 +45,16 @@ def main():
     for row in results:
         print(f"Subject: {row.s}, Name: {row.name}")
 
+    # 7. Provenance d'une clause relaxée : son origine, pas son label
+    relaxed = SimpleLiteral((Variable("s"), URIRef("http://example.org/hasName"), Variable("o")))
+    relaxed.set_origin(clause, 3)
+    print(f"Clause relaxée : {relaxed.label}, origine : {relaxed.origin.label}, variante : {relaxed.variant}")
+    assert relaxed.is_relaxed and relaxed.origin is clause and not clause.is_relaxed
+
+    # 8. Triplets internés : deux clauses identiques partagent triplet et variables
+    twin = SimpleLiteral(triple)
+    print(f"Code du triplet : {twin.code}")
+    assert twin is not clause and twin.triple is clause.triple and twin.code == clause.code
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
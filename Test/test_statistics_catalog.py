@@ -0,0 +1,36 @@
+import math
+from rdflib import RDF, Graph, URIRef
+from Relaxation.StatisticsCatalog import StatisticsCatalog
+
+# 1️⃣ Catalogue construit en un seul parcours du graphe
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+catalog = StatisticsCatalog(g)
+print(catalog)
+
+lecturer = URIRef("http://example.org/Lecturer")
+teacher_of = URIRef("http://example.org/teacherOf")
+
+def expected_pr_class(cls):
+    total = len(set(g.subjects(predicate=RDF.type)))
+    return len(list(g.subjects(predicate=RDF.type, object=cls))) / total if total else 0
+
+def expected_pr_property(prop):
+    return len(list(g.triples((None, prop, None)))) / len(g) if len(g) else 0
+
+# 2️⃣ Mêmes probabilités que le parcours complet du graphe
+print(f"Pr(Lecturer) = {catalog.pr_class(lecturer):.3f}, IC = {catalog.ic_class(lecturer):.3f}")
+print(f"Pr(teacherOf) = {catalog.pr_property(teacher_of):.3f}, IC = {catalog.ic_property(teacher_of):.3f}")
+assert math.isclose(catalog.pr_class(lecturer), expected_pr_class(lecturer))
+assert math.isclose(catalog.pr_property(teacher_of), expected_pr_property(teacher_of))
+
+# 3️⃣ Mise à jour incrémentale : ajout puis suppression d'une instance
+new = (URIRef("http://example.org/s99"), RDF.type, URIRef("http://example.org/Student"))
+catalog.add(new)
+print(f"Après ajout : Pr(Lecturer) = {catalog.pr_class(lecturer):.3f}")
+assert math.isclose(catalog.pr_class(lecturer), expected_pr_class(lecturer))
+assert math.isclose(catalog.pr_property(teacher_of), expected_pr_property(teacher_of))
+catalog.remove(new)
+print(f"Après suppression : Pr(Lecturer) = {catalog.pr_class(lecturer):.3f}")
+assert math.isclose(catalog.pr_class(lecturer), expected_pr_class(lecturer))
+assert catalog.total_triples == len(g)
@@ -0,0 +1,43 @@
+from rdflib import Graph, Literal, URIRef
+from Query.ConjunctiveQueryClause import ConjunctiveQuery
+from Relaxation.QueryFailureAnalyzer import QueryFailureAnalyzer
+from Query.SimpleLiteral import SimpleLiteral
+from rdflib.term import Variable
+
+# 1️⃣ Initialisation du graphe RDF
+g = Graph()
+g.parse("graph.ttl", format="turtle")
+
+# 2️⃣ Définition des clauses de la requête
+t1 = SimpleLiteral((Variable("p"), URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), URIRef("http://example.org/Lecturer")))
+t2 = SimpleLiteral((Variable("p"), URIRef("http://example.org/nationality"), Variable("n")))
+t3 = SimpleLiteral((Variable("p"), URIRef("http://example.org/teacherOf"), Literal("SW")))
+t4 = SimpleLiteral((Variable("p"), URIRef("http://example.org/age"), Literal(46)))
+
+# 3️⃣ Construction de la requête conjonctive
+query = ConjunctiveQuery()
+query.add_clause(t1)
+query.add_clause(t2)
+query.add_clause(t3)
+query.add_clause(t4)
+query.selected_vars = {"p", "n"}
+print(query.to_sparql())
+
+# 4️⃣ Recherche des MFS avec le treillis mémoïsé
+lattice = QueryFailureAnalyzer.lattice(query, g)
+mfs_list = QueryFailureAnalyzer.find_all_failing_causes(query, g, lattice)
+
+print("\n🔎 Résultat : Minimal Failing Subqueries (MFS)\n")
+for i, mfs in enumerate(mfs_list, 1):
+    print(f"MFS {i}: {[j.label for j in mfs.clauses]}")
+
+# 5️⃣ Statistiques du treillis : chaque sous-requête est exécutée au plus une fois
+print(f"\nÉvaluations : {lattice.evaluations}, évitées : {lattice.skipped}")
+assert lattice.evaluations <= 2 ** len(query.clauses)
+assert [c.label for c in query.clauses] == [t1.label, t2.label, t3.label, t4.label]
+
+# 6️⃣ Mode parallèle : chaque niveau est réparti sur 4 processus, même résultat
+parallel = QueryFailureAnalyzer.lattice(query, g, workers=4)
+parallel_mfs = QueryFailureAnalyzer.find_all_failing_causes(query, g, parallel)
+print(f"Mode parallèle : {parallel.evaluations} évaluations en {parallel.batches} appels")
+assert [m.clauses for m in parallel_mfs] == [m.clauses for m in mfs_list]